@@ -30,6 +30,7 @@ from app.models.AcountActivation import Acount_Activation
 from app.models.ChangePasword import ChangePasword
 from app.models.error import Error
 from app.models.EmailChangeToken import EmailChangeToken    
+from app.models.EmailOutbox import EmailOutbox
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,60 @@
+"""index tokens and foreign keys
+
+Revision ID: c7e4b91f2d58
+Revises: a41c7d2e9b13
+Create Date: 2026-10-17 14:02:17.730145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e4b91f2d58'
+down_revision: Union[str, None] = 'a41c7d2e9b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_acount_activation_token'), 'acount_activation', ['token'], unique=False)
+    op.create_index(op.f('ix_acount_activation_Employee_id'), 'acount_activation', ['Employee_id'], unique=False)
+    op.create_index('ix_acount_activation_status_created_on', 'acount_activation', ['token_status_id', 'created_on'], unique=False)
+
+    # expired_date now holds the exact expiry instead of its day
+    op.alter_column('change_password', 'expired_date',
+               existing_type=sa.Date(),
+               type_=sa.DateTime(),
+               existing_nullable=True,
+               postgresql_using='expired_date::timestamp')
+    op.create_index(op.f('ix_change_password_token'), 'change_password', ['token'], unique=False)
+    op.create_index(op.f('ix_change_password_Employee_id'), 'change_password', ['Employee_id'], unique=False)
+    op.create_index('ix_change_password_status_expired_date', 'change_password', ['token_status_id', 'expired_date'], unique=False)
+
+    op.create_index(op.f('ix_email_change_tokens_Employee_id'), 'email_change_tokens', ['Employee_id'], unique=False)
+    op.create_index(op.f('ix_email_change_tokens_created_at'), 'email_change_tokens', ['created_at'], unique=False)
+
+    op.create_index(op.f('ix_employee_role_Employee_id'), 'employee_role', ['Employee_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_employee_role_Employee_id'), table_name='employee_role')
+
+    op.drop_index(op.f('ix_email_change_tokens_created_at'), table_name='email_change_tokens')
+    op.drop_index(op.f('ix_email_change_tokens_Employee_id'), table_name='email_change_tokens')
+
+    op.drop_index('ix_change_password_status_expired_date', table_name='change_password')
+    op.drop_index(op.f('ix_change_password_Employee_id'), table_name='change_password')
+    op.drop_index(op.f('ix_change_password_token'), table_name='change_password')
+    op.alter_column('change_password', 'expired_date',
+               existing_type=sa.DateTime(),
+               type_=sa.Date(),
+               existing_nullable=True)
+
+    op.drop_index('ix_acount_activation_status_created_on', table_name='acount_activation')
+    op.drop_index(op.f('ix_acount_activation_Employee_id'), table_name='acount_activation')
+    op.drop_index(op.f('ix_acount_activation_token'), table_name='acount_activation')
@@ -0,0 +1,48 @@
+"""error fingerprints and occurrences
+
+Revision ID: e2a9d4c61f07
+Revises: c7e4b91f2d58
+Create Date: 2026-10-17 16:40:03.118472
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9d4c61f07'
+down_revision: Union[str, None] = 'c7e4b91f2d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows get an empty fingerprint and a single occurrence
+    op.add_column('error', sa.Column('fingerprint', sa.String(length=40), server_default='', nullable=False))
+    op.add_column('error', sa.Column('occurrences', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('error', sa.Column('last_seen_at', sa.DateTime(), nullable=True))
+    op.alter_column('error', 'fingerprint', server_default=None)
+    op.alter_column('error', 'occurrences', server_default=None)
+    op.alter_column('error', 'created_at',
+               existing_type=sa.Date(),
+               type_=sa.DateTime(),
+               existing_nullable=False,
+               existing_server_default=sa.text('now()'),
+               postgresql_using='created_at::timestamp')
+    op.create_index(op.f('ix_error_fingerprint'), 'error', ['fingerprint'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_error_fingerprint'), table_name='error')
+    op.alter_column('error', 'created_at',
+               existing_type=sa.DateTime(),
+               type_=sa.Date(),
+               existing_nullable=False,
+               existing_server_default=sa.text('now()'))
+    op.drop_column('error', 'last_seen_at')
+    op.drop_column('error', 'occurrences')
+    op.drop_column('error', 'fingerprint')
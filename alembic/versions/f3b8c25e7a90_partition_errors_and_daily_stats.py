@@ -0,0 +1,118 @@
+"""partition errors by month and add error daily stats
+
+Revision ID: f3b8c25e7a90
+Revises: e2a9d4c61f07
+Create Date: 2026-10-17 18:21:44.902361
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8c25e7a90'
+down_revision: Union[str, None] = 'e2a9d4c61f07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    return day.replace(year=day.year + month // 12, month=month % 12 + 1, day=1)
+
+
+def _partition_error_table():
+    """Rebuild error as a table partitioned by month of created_at, keeping its rows and id sequence."""
+    bind = op.get_bind()
+    op.execute("ALTER TABLE error RENAME TO error_unpartitioned")
+    op.execute("ALTER TABLE error_unpartitioned RENAME CONSTRAINT error_pkey TO error_unpartitioned_pkey")
+    op.execute("ALTER INDEX ix_error_id RENAME TO ix_error_unpartitioned_id")
+    op.execute("ALTER INDEX ix_error_fingerprint RENAME TO ix_error_unpartitioned_fingerprint")
+    op.execute("""
+        CREATE TABLE error (
+            id INTEGER NOT NULL DEFAULT nextval('error_id_seq'),
+            error_message VARCHAR(255) NOT NULL,
+            fingerprint VARCHAR(40) NOT NULL,
+            occurrences INTEGER NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            last_seen_at TIMESTAMP WITHOUT TIME ZONE,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("CREATE TABLE error_default PARTITION OF error DEFAULT")
+
+    # One partition per month from the oldest row to two months ahead
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM error_unpartitioned")).scalar()
+    today = date.today()
+    month = (oldest.date() if oldest else today).replace(day=1)
+    last = _add_months(today, 2)
+    while month <= last:
+        end = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE error_{month:%Y_%m} PARTITION OF error "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        month = end
+
+    op.execute("""
+        INSERT INTO error (id, error_message, fingerprint, occurrences, created_at, last_seen_at)
+        SELECT id, error_message, fingerprint, occurrences, created_at, last_seen_at FROM error_unpartitioned
+    """)
+    op.execute("ALTER SEQUENCE error_id_seq OWNED BY error.id")
+    op.execute("DROP TABLE error_unpartitioned")
+    op.create_index(op.f('ix_error_id'), 'error', ['id'], unique=False)
+    op.create_index(op.f('ix_error_fingerprint'), 'error', ['fingerprint'], unique=False)
+
+
+def _unpartition_error_table():
+    op.drop_index(op.f('ix_error_fingerprint'), table_name='error')
+    op.drop_index(op.f('ix_error_id'), table_name='error')
+    op.execute("ALTER TABLE error RENAME TO error_partitioned")
+    op.execute("""
+        CREATE TABLE error (
+            id INTEGER NOT NULL DEFAULT nextval('error_id_seq'),
+            error_message VARCHAR(255) NOT NULL,
+            fingerprint VARCHAR(40) NOT NULL,
+            occurrences INTEGER NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            last_seen_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT error_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("INSERT INTO error SELECT id, error_message, fingerprint, occurrences, created_at, last_seen_at FROM error_partitioned")
+    op.execute("ALTER SEQUENCE error_id_seq OWNED BY error.id")
+    op.execute("DROP TABLE error_partitioned")
+    op.create_index(op.f('ix_error_id'), 'error', ['id'], unique=False)
+    op.create_index(op.f('ix_error_fingerprint'), 'error', ['fingerprint'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        _partition_error_table()
+    op.create_index(op.f('ix_error_created_at'), 'error', ['created_at'], unique=False)
+
+    op.create_table('error_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('fingerprint', sa.String(length=40), nullable=False),
+    sa.Column('error_message', sa.String(length=255), nullable=False),
+    sa.Column('occurrences', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'fingerprint')
+    )
+    # Rollup of the rows already logged
+    op.execute("""
+        INSERT INTO error_daily_stats (day, fingerprint, error_message, occurrences)
+        SELECT date(created_at), fingerprint, min(error_message), sum(occurrences)
+        FROM error GROUP BY date(created_at), fingerprint
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('error_daily_stats')
+    op.drop_index(op.f('ix_error_created_at'), table_name='error')
+    if op.get_bind().dialect.name == 'postgresql':
+        _unpartition_error_table()
@@ -7,10 +7,66 @@ load_dotenv()
 
 class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    # Derived from DATABASE_URL (asyncpg / aiosqlite) when not set
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+    # Pool per engine and per uvicorn worker: size the database's max_connections accordingly
+    DB_POOL_SIZE: int = os.getenv("DB_POOL_SIZE", 5)
+    DB_MAX_OVERFLOW: int = os.getenv("DB_MAX_OVERFLOW", 10)
+    DB_POOL_TIMEOUT: float = os.getenv("DB_POOL_TIMEOUT", 30)
+    DB_POOL_RECYCLE: int = os.getenv("DB_POOL_RECYCLE", 1800)
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+    # Logs every SQL statement; for local debugging only
+    DB_ECHO: bool = os.getenv("DB_ECHO", "False").lower() == "true"
     SECRET_KEY: str = os.getenv("SECRET_KEY", "supersecretkey")
     DEBUG: bool = os.getenv("DEBUG", "True").lower() == "true"
     ALGORITHM : str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES :int =os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES",30)
+    CSV_IMPORT_CHUNK_SIZE: int = os.getenv("CSV_IMPORT_CHUNK_SIZE", 1000)
+    IMPORT_JOB_WORKERS: int = os.getenv("IMPORT_JOB_WORKERS", 2)
+    IMPORT_JOB_QUEUE_SIZE: int = os.getenv("IMPORT_JOB_QUEUE_SIZE", 8)
+    IMPORT_JOB_RETENTION: int = os.getenv("IMPORT_JOB_RETENTION", 100)
+    # Validated uploads kept for a later commit: seconds, and rows across all sessions
+    IMPORT_SESSION_TTL: float = os.getenv("IMPORT_SESSION_TTL", 900)
+    IMPORT_SESSION_MAX_ROWS: int = os.getenv("IMPORT_SESSION_MAX_ROWS", 100000)
+    OUTBOX_WORKER_ENABLED: bool = os.getenv("OUTBOX_WORKER_ENABLED", "True").lower() == "true"
+    OUTBOX_CONCURRENCY: int = os.getenv("OUTBOX_CONCURRENCY", 10)
+    OUTBOX_BATCH_SIZE: int = os.getenv("OUTBOX_BATCH_SIZE", 100)
+    OUTBOX_POLL_INTERVAL: float = os.getenv("OUTBOX_POLL_INTERVAL", 5)
+    OUTBOX_MAX_ATTEMPTS: int = os.getenv("OUTBOX_MAX_ATTEMPTS", 5)
+    OUTBOX_RETRY_BACKOFF: float = os.getenv("OUTBOX_RETRY_BACKOFF", 30)
+    MAIL_POOL_SIZE: int = os.getenv("MAIL_POOL_SIZE", 4)
+    MAIL_MAX_MESSAGES_PER_CONNECTION: int = os.getenv("MAIL_MAX_MESSAGES_PER_CONNECTION", 100)
+    MAIL_POOL_IDLE_TIMEOUT: float = os.getenv("MAIL_POOL_IDLE_TIMEOUT", 60)
+    # Half the cores by default, the other half keeps serving requests
+    PASSWORD_HASH_WORKERS: int = os.getenv("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+    PASSWORD_HASH_MAX_QUEUE: int = os.getenv("PASSWORD_HASH_MAX_QUEUE", 256)
+    # Row validation of large uploads is spread over processes, 1 keeps it in the request thread
+    VALIDATION_WORKERS: int = os.getenv("VALIDATION_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+    VALIDATION_CHUNK_SIZE: int = os.getenv("VALIDATION_CHUNK_SIZE", 5000)
+    VALIDATION_PARALLEL_MIN_ROWS: int = os.getenv("VALIDATION_PARALLEL_MIN_ROWS", 10000)
+    # Authenticated principals are reused for this long (seconds), 0 disables the cache
+    PRINCIPAL_CACHE_TTL: float = os.getenv("PRINCIPAL_CACHE_TTL", 60)
+    PRINCIPAL_CACHE_SIZE: int = os.getenv("PRINCIPAL_CACHE_SIZE", 10000)
+    # Lifetime of the emailed links
+    RESET_TOKEN_TTL_MINUTES: int = os.getenv("RESET_TOKEN_TTL_MINUTES", 60)
+    ACTIVATION_TOKEN_TTL_DAYS: int = os.getenv("ACTIVATION_TOKEN_TTL_DAYS", 30)
+    EMAIL_CHANGE_TOKEN_TTL_HOURS: int = os.getenv("EMAIL_CHANGE_TOKEN_TTL_HOURS", 24)
+    # Expired and used tokens are deleted this many days after they stop being valid
+    TOKEN_RETENTION_DAYS: int = os.getenv("TOKEN_RETENTION_DAYS", 30)
+    # Emailed links carry a signed token instead of a database row (app/service/action_tokens.py)
+    SIGNED_ACTION_TOKENS: bool = os.getenv("SIGNED_ACTION_TOKENS", "False").lower() == "true"
+    TOKEN_SWEEPER_ENABLED: bool = os.getenv("TOKEN_SWEEPER_ENABLED", "True").lower() == "true"
+    TOKEN_SWEEP_INTERVAL: float = os.getenv("TOKEN_SWEEP_INTERVAL", 3600)
+    TOKEN_SWEEP_BATCH_SIZE: int = os.getenv("TOKEN_SWEEP_BATCH_SIZE", 1000)
+    # Error log buffer: flushed every interval or as soon as this many distinct errors are pending
+    ERROR_SINK_FLUSH_INTERVAL: float = os.getenv("ERROR_SINK_FLUSH_INTERVAL", 5)
+    ERROR_SINK_BATCH_SIZE: int = os.getenv("ERROR_SINK_BATCH_SIZE", 100)
+    ERROR_SINK_MAX_PENDING: int = os.getenv("ERROR_SINK_MAX_PENDING", 1000)
+    # Error rows are dropped a month at a time once older than this; the daily stats are kept longer
+    ERROR_RETENTION_DAYS: int = os.getenv("ERROR_RETENTION_DAYS", 90)
+    ERROR_STATS_RETENTION_DAYS: int = os.getenv("ERROR_STATS_RETENTION_DAYS", 365)
+    ERROR_RETENTION_ENABLED: bool = os.getenv("ERROR_RETENTION_ENABLED", "True").lower() == "true"
+    ERROR_RETENTION_INTERVAL: float = os.getenv("ERROR_RETENTION_INTERVAL", 86400)
     
 
 settings = Settings()
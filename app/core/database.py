@@ -1,14 +1,61 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings  # Importation correcte de la configuration
+from app.core.metrics import instrument_engine, registry
+from app.core.pool import PoolStats, instrumented_pool_class, listen_pool_events, register_pool_metrics
 
-# Créer le moteur SQLAlchemy
-engine = create_engine(settings.DATABASE_URL, echo=True)
+# Pilotes asynchrones utilisés pour chaque base
+async_drivers = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """ Remplace le pilote synchrone de l'URL par son équivalent asynchrone. """
+    url = make_url(url)
+    driver = async_drivers.get(url.get_backend_name())
+    if driver is None:
+        return url.render_as_string(hide_password=False)
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def pool_options(url: str, stats: PoolStats, is_async: bool = False) -> dict:
+    """ Réglages du pool depuis Settings ; SQLite en mémoire garde son pool par défaut. """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": instrumented_pool_class(stats, is_async),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+# Statistiques des pools, exposées par /api/db/pool
+pool_stats = {"sync": PoolStats("sync"), "async": PoolStats("async")}
+
+# Créer le moteur SQLAlchemy (imports CSV, exports, tâches de fond)
+engine = create_engine(settings.DATABASE_URL, echo=settings.DB_ECHO, **pool_options(settings.DATABASE_URL, pool_stats["sync"]))
+listen_pool_events(engine, pool_stats["sync"])
+instrument_engine(engine)
 
 # Session pour interagir avec la base de données
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Moteur asynchrone pour les routes de l'API : les requêtes ne bloquent plus la boucle
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=settings.DB_ECHO, **pool_options(ASYNC_DATABASE_URL, pool_stats["async"], is_async=True))
+listen_pool_events(async_engine.sync_engine, pool_stats["async"])
+instrument_engine(async_engine.sync_engine)
+register_pool_metrics(pool_stats.values())
+
+# expire_on_commit=False : les objets restent lisibles après commit sans nouvelle requête
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base pour les modèles SQLAlchemy
 Base = declarative_base()
 
@@ -20,4 +67,7 @@ def get_db():
     finally:
         db.close()
 
-
+# Équivalent asynchrone de get_db
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,114 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.metrics import Counter, Gauge, register_stats_collector
+
+
+class PoolStats:
+    """Counters for one connection pool, shared by every worker thread."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self):
+        pool = self.pool
+        with self._lock:
+            stats = {
+                "name": self.name,
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                "checkouts": self.checkouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "avg_wait_seconds": self.wait_seconds_total / self.checkouts if self.checkouts else 0.0,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+            }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return stats
+
+
+class _TimedCheckout:
+    """Measures how long a checkout waits for a free connection (or for a new one)."""
+
+    stats: PoolStats = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats.pool = self
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.increment("timeouts")
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return connection
+
+
+def instrumented_pool_class(stats: PoolStats, is_async: bool = False):
+    # One subclass per engine: pool.recreate() keeps the class, hence the stats
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+    return type(f"Instrumented{base.__name__}", (_TimedCheckout, base), {"stats": stats})
+
+
+def listen_pool_events(engine, stats: PoolStats):
+    """Counts connection churn: new connections, closed ones and invalidations."""
+    if stats.pool is None:
+        stats.pool = engine.pool
+    event.listen(engine, "connect", lambda *args: stats.increment("connects"))
+    event.listen(engine, "close", lambda *args: stats.increment("closes"))
+    event.listen(engine, "close_detached", lambda *args: stats.increment("closes"))
+    event.listen(engine, "invalidate", lambda *args: stats.increment("invalidations"))
+
+
+# Snapshot fields exported to /metrics as db_pool_*, one series per engine
+exported_pool_fields = {
+    "checked_out": ("checked_out", Gauge, "Connections currently checked out"),
+    "checked_in": ("checked_in", Gauge, "Idle connections in the pool"),
+    "overflow": ("overflow", Gauge, "Connections opened beyond pool_size"),
+    "checkouts": ("checkouts_total", Counter, "Connection checkouts"),
+    "wait_seconds_total": ("wait_seconds_total", Counter, "Time spent waiting for a connection"),
+    "timeouts": ("timeouts_total", Counter, "Checkouts that timed out"),
+    "connects": ("connects_total", Counter, "New DBAPI connections"),
+    "closes": ("closes_total", Counter, "Closed DBAPI connections"),
+    "invalidations": ("invalidations_total", Counter, "Invalidated connections"),
+}
+
+
+def register_pool_metrics(all_stats):
+    register_stats_collector(
+        "db_pool", lambda: {stats.name: stats.snapshot() for stats in all_stats}, exported_pool_fields, label="engine"
+    )
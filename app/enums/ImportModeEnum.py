@@ -0,0 +1,12 @@
+from app.enums.basicenum import BasicEnum
+
+
+class ImportModeEnum(BasicEnum):
+    insert = "insert"
+    # Rows matching an existing employee update it instead of failing
+    upsert = "upsert"
+
+
+class ImportMatchKeyEnum(BasicEnum):
+    number = "number"
+    email = "email"
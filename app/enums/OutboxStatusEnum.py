@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class OutboxStatusEnum(Enum):
+    Pending = "Pending"
+    Sent = "Sent"
+    Failed = "Failed"
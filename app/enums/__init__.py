@@ -8,4 +8,5 @@ from .TokenStatusEnum import TokenStatusEnum
 from .StatusCodeEnum import StatusCodeEnum    
 from .ProgramTypeEnum import ProgramTypeEnum
 from .SessionStatusEnum import SessionStatusEnum
-
+from .OutboxStatusEnum import OutboxStatusEnum
+from .ImportModeEnum import ImportModeEnum, ImportMatchKeyEnum
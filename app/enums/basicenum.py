@@ -1,5 +1,8 @@
 from enum import Enum
 
+# Tables {VALUE.upper(): member} construites une seule fois par enum
+_lookup_tables = {}
+
 class BasicEnum(str, Enum):
     """
     Enum de base pour les autres enums.
@@ -17,7 +20,17 @@ class BasicEnum(str, Enum):
         """
         Vérifie si une valeur donnée est valide pour cet enum.
         """
-        for val in cls:
-            if val.value.upper() == value.upper():
-                return val
-        return None
+        return cls.lookup_table().get(value.upper())
+
+    @classmethod
+    def lookup_table(cls):
+        """
+        Retourne la table {valeur en majuscules: membre} utilisée par is_valid.
+        """
+        table = _lookup_tables.get(cls)
+        if table is None:
+            table = {}
+            for val in cls:
+                table.setdefault(val.value.upper(), val)
+            _lookup_tables[cls] = table
+        return table
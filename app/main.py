@@ -1,13 +1,46 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.config import settings
+from app.core.database import async_engine
+from app.core.metrics import MetricsMiddleware
+from app.service.email_outbox import outbox_worker
+from app.service.Sending_email import transport
+from app.service.token_sweeper import token_sweeper
+from app.service.error_sink import error_sink
+from app.service.error_retention import error_retention_job
+from app.repositories.uploadcsv import shutdown_validation_pool
+
 
 from app.routes import employee
 from app.routes import auth
+from app.routes import monitoring
+
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.OUTBOX_WORKER_ENABLED:
+        outbox_worker.start()
+    if settings.TOKEN_SWEEPER_ENABLED:
+        token_sweeper.start()
+    error_sink.start()
+    if settings.ERROR_RETENTION_ENABLED:
+        error_retention_job.start()
+    yield
+    await error_retention_job.stop()
+    await error_sink.stop()
+    await token_sweeper.stop()
+    await outbox_worker.stop()
+    # QUIT the pooled SMTP sessions rather than dropping them
+    await transport.close()
+    await async_engine.dispose()
+    shutdown_validation_pool()
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 
 
@@ -18,7 +51,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so latency includes CORS handling
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(employee.router, prefix="/api")
 app.include_router(auth.router, prefix="/api")
+app.include_router(monitoring.router, prefix="/api")
+app.include_router(monitoring.metrics_router)
 
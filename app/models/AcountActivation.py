@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, Date, Enum , ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Enum , ForeignKey, Index
 
 from sqlalchemy.orm import relationship
 
@@ -13,10 +13,15 @@ class Acount_Activation(Base):
     __tablename__ = "acount_activation"
 
     id = Column(Integer, primary_key=True, index=True)
-    Employee_id = Column(Integer, ForeignKey("employee.id"), nullable=False) 
+    Employee_id = Column(Integer, ForeignKey("employee.id"), nullable=False, index=True)
     Employee = relationship("Employee", foreign_keys=[Employee_id], lazy="joined")
     Email = Column(String(100), nullable=False)
-    token = Column(String(100), nullable=False)
+    token = Column(String(100), nullable=False, index=True)
     created_on = Column(Date, nullable=False)
-    token_status_id = Column(Enum(TokenStatusEnum), nullable=False)    
+    token_status_id = Column(Enum(TokenStatusEnum), nullable=False)
+
+    __table_args__ = (
+        # Sweep of the tokens to expire or purge
+        Index("ix_acount_activation_status_created_on", "token_status_id", "created_on"),
+    )
 
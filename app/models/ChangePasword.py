@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, Date, Enum , ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Enum , ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 # Ajouter le chemin du dossier parent pour résoudre les imports
@@ -12,8 +12,14 @@ class ChangePasword(Base):
     __tablename__ = "change_password"
 
     id = Column(Integer, primary_key=True, index=True)
-    Employee_id = Column(Integer , ForeignKey("employee.id") , nullable=False)
-    expired_date = Column(Date, nullable=True)
-    token = Column(String(100), nullable=False)
+    Employee_id = Column(Integer , ForeignKey("employee.id") , nullable=False, index=True)
+    # UTC, naive
+    expired_date = Column(DateTime, nullable=True)
+    token = Column(String(100), nullable=False, index=True)
     token_status_id = Column(Enum(TokenStatusEnum), nullable=False)
-    Employee = relationship("Employee", foreign_keys=[Employee_id], lazy="joined")
\ No newline at end of file
+    Employee = relationship("Employee", foreign_keys=[Employee_id], lazy="joined")
+
+    __table_args__ = (
+        # Sweep of the tokens to expire or purge
+        Index("ix_change_password_status_expired_date", "token_status_id", "expired_date"),
+    )
\ No newline at end of file
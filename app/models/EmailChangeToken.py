@@ -8,7 +8,7 @@ class EmailChangeToken(Base):
     __tablename__ = "email_change_tokens"
 
     id = Column(Integer, primary_key=True, index=True)
-    Employee_id = Column(Integer , ForeignKey("employee.id") , nullable=False)
+    Employee_id = Column(Integer , ForeignKey("employee.id") , nullable=False, index=True)
     new_email = Column(String, nullable=False)
     token = Column(String, unique=True, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum, JSON, Index
+from datetime import datetime
+
+from ..core.database import Base
+from ..enums import OutboxStatusEnum
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String(100), nullable=False)
+    subject = Column(String(255), nullable=False)
+    template_name = Column(String(100), nullable=False)
+    body = Column(JSON, nullable=False)
+    status = Column(Enum(OutboxStatusEnum), nullable=False, default=OutboxStatusEnum.Pending)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String(255), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Lookup of the messages due for delivery
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
@@ -19,7 +19,7 @@ class Employee(Base):
     contract_type = Column(Enum(ContractTypeEnum), nullable=True)
     status_account = Column(Enum(StatusAccountEnum), nullable=False, default=StatusAccountEnum.Inactive)
     cnss_number = Column(String(11), nullable=True, unique=True)  # Format attendu : 8 chiffres - 2 chiffres (total 11 caractères)
-    created_at = Column(Date, nullable=False, server_default=func.now())
+    created_at = Column(Date, nullable=False, server_default=func.current_date())
     disabled = Column(Boolean, default=False)
 
     __table_args__ = (
@@ -27,5 +27,5 @@ class Employee(Base):
             "((contract_type::text IN ('CDI', 'CDD') AND cnss_number IS NOT NULL AND cnss_number ~ '^[0-9]{8}-[0-9]{2}$') "
             "OR (contract_type::text IN ('SIVP', 'APPRENTI') AND cnss_number IS NULL))",
             name="cnss_required_for_cdi_cdd"
-        ),
+        ).ddl_if(dialect="postgresql"),  # PostgreSQL syntax, skipped on SQLite test databases
     )
@@ -14,6 +14,6 @@ class Employee_role(Base):
     __tablename__ = "employee_role"
 
     id = Column(Integer, primary_key=True, index=True)
-    Employee_id = Column(Integer , ForeignKey("employee.id") , nullable=False)
+    Employee_id = Column(Integer , ForeignKey("employee.id") , nullable=False, index=True)
     Employee = relationship("Employee", foreign_keys=[Employee_id], lazy="joined") 
     role = Column(Enum(RoleEnum), nullable=False)
\ No newline at end of file
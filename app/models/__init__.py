@@ -4,3 +4,5 @@ from .AcountActivation import Acount_Activation
 from .ChangePasword import ChangePasword
 from .Employee import Employee
 from .EmployeeRole import Employee_role
+from .EmailChangeToken import EmailChangeToken
+from .EmailOutbox import EmailOutbox
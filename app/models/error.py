@@ -1,5 +1,5 @@
-
-from sqlalchemy import Column, Integer, String, Date
+from sqlalchemy import Column, Integer, String, Date, DateTime, PrimaryKeyConstraint, Sequence
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.sql import func
 
 
@@ -7,8 +7,34 @@ from ..core.database import Base
 
 
 class Error(Base):
+    # On PostgreSQL the table is partitioned by month of created_at (app/service/error_retention.py),
+    # so created_at is part of the primary key, as in migration f3b8c25e7a90
     __tablename__ = "error"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, Sequence("error_id_seq"), primary_key=True, index=True)
+    error_message = Column(String(255), nullable=False)
+    # Same error, whatever ids or values its message contains (app/service/error_sink.py)
+    fingerprint = Column(String(40), nullable=False, index=True)
+    # Times the error was raised between created_at and last_seen_at
+    occurrences = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime, primary_key=True, server_default=func.now(), index=True)
+    last_seen_at = Column(DateTime, nullable=True)
+
+
+@compiles(PrimaryKeyConstraint, "sqlite")
+def _sqlite_primary_key(constraint, compiler, **kw):
+    """SQLite only numbers a lone INTEGER PRIMARY KEY: the error table keeps PRIMARY KEY (id) there."""
+    if constraint.table.name == Error.__tablename__:
+        return "PRIMARY KEY (id)"
+    return compiler.visit_primary_key_constraint(constraint, **kw)
+
+
+class ErrorDailyStats(Base):
+    """Occurrences per error and day, kept up to date by each error sink flush."""
+    __tablename__ = "error_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    fingerprint = Column(String(40), primary_key=True)
+    # Message of the first occurrence that day
     error_message = Column(String(255), nullable=False)
-    created_at = Column(Date, nullable=False, server_default=func.now())
+    occurrences = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,165 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select
+
+from app.enums.RoleEnum import RoleEnum
+from app.enums.TokenStatusEnum import TokenStatusEnum
+from app.models.Employee import Employee
+from app.models.EmployeeRole import Employee_role
+from app.models.AcountActivation import Acount_Activation
+from app.models.EmailOutbox import EmailOutbox
+from app.core.config import settings
+from app.service.action_tokens import ACTIVATION, issue_token
+from app.service.email_outbox import outbox_row, enqueue_emails
+from app.schemas.csvschema import options
+from app.utils.timing import PhaseTimer
+
+
+# Columns an upload may set; every validated row carries all of them
+employee_columns = [opt.value for opt in options if opt.value in Employee.__table__.columns]
+role_by_position = {member.value.lower(): member for member in RoleEnum}
+
+
+def normalize_position(raw_position: str):
+    if not raw_position:
+        return None
+    return role_by_position.get(raw_position.strip().lower())
+
+
+def _employee_row(emp_data: dict):
+    row = {key: emp_data.get(key) for key in employee_columns}
+    birth_date = row.get("birth_date")
+    if isinstance(birth_date, str):
+        row["birth_date"] = datetime.strptime(birth_date, "%Y-%m-%d").date()
+    return row
+
+
+def _uses_copy(db):
+    dialect = db.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver == "psycopg2"
+
+
+def copy_rows(db, table, columns: list, rows):
+    """Stream rows into `table` with PostgreSQL COPY, inside the session's transaction."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+    buffer.seek(0)
+
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f'COPY "{table}" ({column_list}) FROM STDIN WITH (FORMAT csv)', buffer)
+    finally:
+        cursor.close()
+
+
+def insert_employee_rows(db, employees_to_add: list, timer: PhaseTimer = None):
+    """Insert employees with multi-row INSERT ... RETURNING and return {email: id}."""
+    timer = timer or PhaseTimer()
+    rows = [_employee_row(emp_data) for emp_data in employees_to_add]
+    if not rows:
+        return {}
+
+    table = Employee.__table__
+    if db.get_bind().dialect.insert_executemany_returning:
+        with timer.span("insert_employees", rows=len(rows)):
+            result = db.execute(insert(table).returning(table.c.id, table.c.email), rows)
+            return {email: id for id, email in result}
+
+    # Drivers without executemany RETURNING: insert, then read the ids back
+    with timer.span("insert_employees", rows=len(rows)):
+        db.execute(insert(table), rows)
+    with timer.span("select_employee_ids", rows=len(rows)):
+        emails = [row["email"] for row in rows]
+        result = db.execute(select(table.c.id, table.c.email).where(table.c.email.in_(emails)))
+        return {email: id for id, email in result}
+
+
+def bulk_load_employees(db, employees_to_add: list, roles_anchor: dict, timer: PhaseTimer = None, extra_roles: list = ()):
+    """Write employees, their roles, activation tokens and activation emails in a few round trips, without committing.
+
+    On PostgreSQL (psycopg2) roles, activations and outbox messages go through
+    COPY; other databases, SQLite included, use executemany INSERTs. Each
+    statement is timed as a phase of `timer`. `extra_roles` ({"Employee_id",
+    "role"} rows of existing employees) are written with the same statement.
+    Returns the number of activation emails queued in the outbox.
+    """
+    timer = timer or PhaseTimer()
+    ids_by_email = insert_employee_rows(db, employees_to_add, timer)
+
+    roles_to_insert = list(extra_roles)
+    for email, raw_positions in roles_anchor.items():
+        employee_id = ids_by_email.get(email)
+        if employee_id is None:
+            continue
+        for raw_pos in raw_positions:
+            proper_role = normalize_position(raw_pos)
+            if proper_role:
+                roles_to_insert.append({"Employee_id": employee_id, "role": proper_role})
+
+    if settings.SIGNED_ACTION_TOKENS:
+        # Signed links need no activation rows; imported employees have no password yet
+        activations = []
+        tokens = {email: issue_token(employee_id, ACTIVATION) for email, employee_id in ids_by_email.items()}
+    else:
+        created_on = datetime.now(timezone.utc).date()
+        activations = [
+            {
+                "Employee_id": employee_id,
+                "Email": email,
+                "token": str(uuid.uuid4()),
+                "created_on": created_on,
+                "token_status_id": TokenStatusEnum.Valid,
+            }
+            for email, employee_id in ids_by_email.items()
+        ]
+        tokens = {a["Email"]: a["token"] for a in activations}
+    outbox = [
+        outbox_row(email, "Set Your Password", "set_password.html", {"token": token})
+        for email, token in tokens.items()
+    ]
+
+    if _uses_copy(db):
+        with timer.span("insert_roles", rows=len(roles_to_insert)):
+            copy_rows(
+                db, Employee_role.__tablename__, ["Employee_id", "role"],
+                ((role["Employee_id"], role["role"].name) for role in roles_to_insert)
+            )
+        if activations:
+            with timer.span("insert_activations", rows=len(activations)):
+                copy_rows(
+                    db, Acount_Activation.__tablename__, ["Employee_id", "Email", "token", "created_on", "token_status_id"],
+                    (
+                        (a["Employee_id"], a["Email"], a["token"], a["created_on"].isoformat(), a["token_status_id"].name)
+                        for a in activations
+                    )
+                )
+        with timer.span("enqueue_emails", rows=len(outbox)):
+            copy_rows(
+                db, EmailOutbox.__tablename__,
+                ["recipient", "subject", "template_name", "body", "status", "attempts", "next_attempt_at", "created_at"],
+                (
+                    (
+                        m["recipient"], m["subject"], m["template_name"], json.dumps(m["body"]), m["status"].name,
+                        m["attempts"], m["next_attempt_at"].isoformat(), m["created_at"].isoformat()
+                    )
+                    for m in outbox
+                )
+            )
+    else:
+        if roles_to_insert:
+            with timer.span("insert_roles", rows=len(roles_to_insert)):
+                db.execute(insert(Employee_role.__table__), roles_to_insert)
+        if activations:
+            with timer.span("insert_activations", rows=len(activations)):
+                db.execute(insert(Acount_Activation.__table__), activations)
+        with timer.span("enqueue_emails", rows=len(outbox)):
+            enqueue_emails(db, outbox)
+
+    return len(outbox)
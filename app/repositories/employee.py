@@ -1,74 +1,180 @@
 from os import error
-from sqlalchemy.orm import Session
+import base64
+import binascii
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.Employee import Employee
 from app.models.EmployeeRole import Employee_role
 from app.models.AcountActivation import Acount_Activation  # Correction
 from app.models.ChangePasword import ChangePasword  # Correction
-from app.models.error import Error
 
 
 
 from app.enums.TokenStatusEnum import TokenStatusEnum
 from app.schemas.employee import EmployeeCreate
-from app.service.Sending_email import send_email_with_template
+from app.service.email_outbox import enqueue_email, wake_outbox
+from app.service.error_sink import record_error
 from app.utils.helpers import get_error_message
 from fastapi.responses import JSONResponse 
 from fastapi import HTTPException
 import uuid
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 import logging
 
-
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.service.password_hashing import password_hasher
+from app.service.token_sweeper import reset_token_expiry
+from app.service.action_tokens import ACTIVATION, RESET, fingerprint_matches, issue_token, read_token, token_expired
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-def get_all_employee(db: Session):
+async def get_all_employee(db: AsyncSession):
     """ Récupère tous les employés de la base de données. """
-    return db.query(Employee).all()
+    return (await db.scalars(select(Employee))).all()
+
+
+# ------------------------------------------------------
+# 📌 Liste paginée des employés (pagination par curseur sur l'id)
+# ------------------------------------------------------
+EMPLOYEE_PAGE_DEFAULT_LIMIT = 50
+EMPLOYEE_PAGE_MAX_LIMIT = 500
+
+# Champs sélectionnables, dans l'ordre de EmployeeOut ; "role" vient de employee_role
+employee_list_fields = [
+    "id", "first_name", "last_name", "gender", "birth_date", "number", "phone_number", "address",
+    "email", "contract_type", "cnss_number", "created_at", "role",
+]
 
 
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
 
-def get_employee_id(db: Session, id: int):
+
+def decode_cursor(cursor: str) -> int:
+    """ Décode un curseur opaque ; lève ValueError s'il est invalide. """
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def get_employee_roles_by_id(db: AsyncSession, ids):
+    """ Récupère les rôles de plusieurs employés en une seule requête. """
+    roles = {id: [] for id in ids}
+    if ids:
+        rows = await db.execute(select(Employee_role.Employee_id, Employee_role.role).where(Employee_role.Employee_id.in_(ids)))
+        for employee_id, role in rows:
+            roles[employee_id].append(role)
+    return roles
+
+
+async def get_employees_page(
+    db: AsyncSession,
+    limit: int = EMPLOYEE_PAGE_DEFAULT_LIMIT,
+    after_id: int = None,
+    contract_type=None,
+    status_account=None,
+    role=None,
+    disabled: bool = None,
+    created_from=None,
+    created_to=None,
+    fields=None,
+):
+    """
+    Récupère une page d'employés triés par id, après `after_id`.
+
+    Chaque page coûte une requête indexée (id > curseur) plus une pour les rôles,
+    quelle que soit sa position dans la liste. Retourne (items, next_after_id),
+    next_after_id valant None sur la dernière page.
+    """
+    fields = fields or employee_list_fields
+    columns = [getattr(Employee, field) for field in fields if field not in ("id", "role")]
+    query = select(Employee.id, *columns)
+
+    if after_id is not None:
+        query = query.filter(Employee.id > after_id)
+    if contract_type:
+        query = query.filter(Employee.contract_type.in_(contract_type))
+    if status_account:
+        query = query.filter(Employee.status_account.in_(status_account))
+    if role:
+        query = query.filter(Employee.id.in_(
+            select(Employee_role.Employee_id).where(Employee_role.role.in_(role))
+        ))
+    if disabled is not None:
+        # Les employés créés sans valeur explicite ne sont pas désactivés
+        query = query.filter(Employee.disabled.is_(True) if disabled else or_(Employee.disabled.is_(False), Employee.disabled.is_(None)))
+    if created_from is not None:
+        query = query.filter(Employee.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(Employee.created_at <= created_to)
+
+    rows = (await db.execute(query.order_by(Employee.id).limit(limit + 1))).all()
+    next_after_id = rows[limit - 1].id if len(rows) > limit else None
+    rows = rows[:limit]
+
+    items = [{field: row._mapping[field] for field in fields if field != "role"} for row in rows]
+    if "role" in fields:
+        roles = await get_employee_roles_by_id(db, [row.id for row in rows])
+        for item, row in zip(items, rows):
+            item["role"] = roles[row.id]
+    return items, next_after_id
+
+
+
+async def get_employee_id(db: AsyncSession, id: int):
     """ Récupère un employé par son ID. """
-    return db.query(Employee).filter(Employee.id == id).first()
+    return await db.scalar(select(Employee).where(Employee.id == id))
 
-def get_employee_email(db: Session, email: str):
+async def get_employee_email(db: AsyncSession, email: str):
     """ Récupère un employé par son adresse email. """
-    return db.query(Employee).filter(Employee.email == email).first()
+    return await db.scalar(select(Employee).where(Employee.email == email))
+
+async def get_employee_role(db: AsyncSession, id:int):
+    return await db.scalar(select(Employee_role).where(Employee_role.Employee_id == id))
 
-def get_employee_role(db: Session, id:int):
-    return db.query(Employee_role).filter(Employee_role.Employee_id == id).first()
+async def get_employee_roles(db: AsyncSession, id: int):
+    """ Récupère tous les rôles d'un employé. """
+    return (await db.scalars(select(Employee_role.role).where(Employee_role.Employee_id == id))).all()
 
-def get_confirmation_code(db: Session, code: str):
+async def get_confirmation_code(db: AsyncSession, code: str):
     """ Récupère un code de confirmation par son code. """
-    return db.query(Acount_Activation).filter(Acount_Activation.token == code).first()
+    return await db.scalar(select(Acount_Activation).where(Acount_Activation.token == code))
 
-def get_confirmation_code_change_password(db: Session, code: str):
+async def get_confirmation_code_change_password(db: AsyncSession, code: str):
     """ Récupère un code de confirmation pour réinitialiser le mot de passe par son code. """
-    return db.query(ChangePasword).filter(ChangePasword.token == code).first()
-
-
-def add_error_log(error_message, db: Session):
-    try : 
-        error = Error(
-            error_message=error_message,
-            created_at=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-        )    
-        db.add(error)
-        db.commit()
-        db.refresh(error)
-        return error
-    except Exception as e:
-        logger.error(f"Failed to log error: {str(e)}")
-        return None
-
+    return await db.scalar(select(ChangePasword).where(ChangePasword.token == code))
+
+
+def read_signed_token(token: str, purpose: str):
+    """ Lit un token signé ; mêmes erreurs HTTP qu'un token enregistré en base. """
+    claims = read_token(token, purpose)
+    if claims is None:
+        raise HTTPException(status_code=404, detail="Confirmation code not found")
+    if token_expired(claims):
+        raise HTTPException(status_code=400, detail="Confirmation code expired")
+    return claims
+
+
+async def consume_signed_token(db: AsyncSession, claims: dict, *conditions, **values):
+    """ Applique `values` à l'employé en un seul UPDATE conditionnel.
+
+    L'UPDATE ne touche la ligne que si le mot de passe n'a pas changé depuis
+    l'émission du token (et si `conditions` sont vraies) : un token déjà
+    utilisé ne correspond plus.
+    """
+    result = await db.execute(
+        update(Employee)
+        .where(Employee.id == claims["sub"], fingerprint_matches(Employee.password, claims["fp"]), *conditions)
+        .values(**values)
+    )
+    if result.rowcount != 1:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Confirmation code expired")
 
 
-async def add_employee(db: Session, employee_data: EmployeeCreate):
+async def add_employee(db: AsyncSession, employee_data: EmployeeCreate):
     
 
     try:
@@ -78,82 +184,86 @@ async def add_employee(db: Session, employee_data: EmployeeCreate):
 
         # Hashage du mot de passe
         if employee_data.password:
-            employee_dict["password"] = pwd_context.hash(employee_data.password)
+            employee_dict["password"] = await password_hasher.hash(employee_data.password)
 
         # Création de l'employé sans commit immédiat
         new_employee = Employee(**employee_dict)
         db.add(new_employee)
-        db.flush()  # Permet d'obtenir l'ID sans commit
-        db.refresh(new_employee)
+        await db.flush()  # Permet d'obtenir l'ID sans commit
 
         # Assignation des rôles (si présents)
         if roles:
-            db.add_all([
-                Employee_role(Employee_id=new_employee.id, role=role)
-                for role in roles
-            ])
-
-        # Création et ajout du token d'activation
-        token = str(uuid.uuid4())
-        activation = Acount_Activation(
-            Employee_id=new_employee.id,
-            Email=new_employee.email,
-            token=token,
-            created_on=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
-            token_status_id=TokenStatusEnum.Valid
-        )
-        db.add(activation)
-        db.commit()
-
-        # Envoi d'email en tâche de fond
-        await  send_email_with_template(emails=[new_employee.email], body={"token": token},subject="Set Your Password",template_name="set_password.html") 
+            # Un seul INSERT multi-lignes plutôt qu'un INSERT ... RETURNING par rôle
+            await db.execute(
+                insert(Employee_role),
+                [{"Employee_id": new_employee.id, "role": role} for role in roles],
+            )
+
+        # Création du token d'activation : signé (aucune ligne) ou enregistré en base
+        if settings.SIGNED_ACTION_TOKENS:
+            token = issue_token(new_employee.id, ACTIVATION, new_employee.password)
+        else:
+            token = str(uuid.uuid4())
+            activation = Acount_Activation(
+                Employee_id=new_employee.id,
+                Email=new_employee.email,
+                token=token,
+                created_on=datetime.now(timezone.utc).date(),
+                token_status_id=TokenStatusEnum.Valid
+            )
+            db.add(activation)
+
+        # Email d'activation écrit dans l'outbox, dans la même transaction
+        enqueue_email(db, new_employee.email, "Set Your Password", "set_password.html", {"token": token})
+        await db.commit()
+        wake_outbox()
         return JSONResponse(
-        status_code=200,
+        status_code=201,
         content={"message": "Employee added", "employee_id": new_employee.id}
        )
 
     except Exception as e:
-        db.rollback()  # Annulation en cas d'erreur
-        add_error_log(str(e), db)  # Enregistrement de l'erreur dans la base de données
+        await db.rollback()  # Annulation en cas d'erreur
+        record_error(str(e))  # Journalisée en différé, hors de cette session
         raise HTTPException(status_code=500, detail=get_error_message(str(e)))
     
     
 
 
 
-async def confirmation_change_password(db: Session, employee: Employee):
+async def confirmation_change_password(db: AsyncSession, employee: Employee):
     """ Confirme le changement de mot de passe d'un employé en générant un token. """
     
-    # Génération d'un token unique pour le changement de mot de passe
-    token = str(uuid.uuid4())
-    expired_date = datetime.now(timezone.utc) + timedelta(hours=1)  # Expiration dans 1 heure
-    
-    # Enregistrement du changement de mot de passe dans la base
-    employee_change_password = ChangePasword(
-        Employee_id=employee.id,  
-        expired_date=expired_date,
-        token=token,
-        token_status_id=TokenStatusEnum.Valid  # Statut du token valide
-    )
+    if settings.SIGNED_ACTION_TOKENS:
+        # Token signé, lié au mot de passe actuel : rien n'est écrit en base
+        token = issue_token(employee.id, RESET, employee.password)
+    else:
+        # Génération d'un token unique pour le changement de mot de passe
+        token = str(uuid.uuid4())
+        expired_date = reset_token_expiry()  # Expiration après RESET_TOKEN_TTL_MINUTES
 
-    db.add(employee_change_password)
-    db.commit()
-    db.refresh(employee_change_password)  # Rafraîchir pour récupérer les valeurs générées
+        # Enregistrement du changement de mot de passe dans la base
+        employee_change_password = ChangePasword(
+            Employee_id=employee.id,
+            expired_date=expired_date,
+            token=token,
+            token_status_id=TokenStatusEnum.Valid  # Statut du token valide
+        )
 
-    # Envoi de l'email de réinitialisation du mot de passe avec gestion des erreurs
-    try:
-        await send_email_with_template(emails=[employee.email], body={"token": token},subject="Reset Your Password",template_name="reset_password.html")
-    except Exception as e:
-        return JSONResponse(status_code=500, content={"message": " email failed", "error": str(e)})
+        db.add(employee_change_password)
+    # L'email de réinitialisation part de l'outbox une fois la transaction validée
+    enqueue_email(db, employee.email, "Reset Your Password", "reset_password.html", {"token": token})
+    await db.commit()
+    wake_outbox()
 
     return JSONResponse(status_code=200, content={"message": "email sent check your mail :)", "employee_id": employee.id})
 
 # ------------------------------------------------------
 # 📌 Mise à jour des informations d'un employé
 # ------------------------------------------------------
-def update_employee(db: Session, id: int, employee_data: EmployeeCreate):
+async def update_employee(db: AsyncSession, id: int, employee_data: EmployeeCreate):
     """ Met à jour un employé existant. """
-    employee = get_employee_id(db, id)
+    employee = await get_employee_id(db, id)
     if employee:
         # Extraire les données à mettre à jour
         update_data = employee_data.model_dump(exclude_unset=True)
@@ -164,19 +274,19 @@ def update_employee(db: Session, id: int, employee_data: EmployeeCreate):
         for attr, new_val in update_data.items():
             setattr(employee, attr, new_val)
 
-        db.commit()  # Appliquer les changements dans la base de données
-        db.refresh(employee)  # Rafraîchir les données
+        await db.commit()  # Appliquer les changements dans la base de données
+        await db.refresh(employee)  # Rafraîchir les données
         return employee
     return None
 
 # ------------------------------------------------------
 # 📌 Suppression d'un employé
 # ------------------------------------------------------
-def delete_employee(db: Session, id: int):
+async def delete_employee(db: AsyncSession, id: int):
     """ Supprime un employé de la base de données. """
-    employee = get_employee_id(db, id)
+    employee = await get_employee_id(db, id)
     if employee:
-        db.delete(employee)  # Supprimer l'employé
-        db.commit()  # Appliquer les changements
+        await db.delete(employee)  # Supprimer l'employé
+        await db.commit()  # Appliquer les changements
         return True
     return False
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+from itertools import groupby
+
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.models.Employee import Employee
+from app.models.EmployeeRole import Employee_role
+from app.schemas.csvschema import options
+
+
+EXPORT_BATCH_SIZE = 1000
+
+# Same columns and headers as the import schema. An employee with several roles
+# exports job_position as "Vendor, admin", which the import (one position per
+# row) rejects: only single-role rows can be uploaded again as is
+export_fields = [opt.value for opt in options]
+export_headers = [opt.display_value for opt in options]
+export_columns = [getattr(Employee, field) for field in export_fields if field in Employee.__table__.columns]
+
+
+def _cell(value):
+    if value is None:
+        return None
+    if hasattr(value, "value"):  # enums
+        return value.value
+    if hasattr(value, "isoformat"):  # dates
+        return value.isoformat()
+    return value
+
+
+def iter_employee_records(db, batch_size: int = EXPORT_BATCH_SIZE):
+    """Yields one dict per employee, roles folded into job_position.
+
+    A single query joins the roles; rows are fetched `batch_size` at a time
+    from a server-side cursor, so memory does not grow with the roster.
+    """
+    stmt = (
+        select(Employee.id, *export_columns, Employee_role.role)
+        .outerjoin(Employee_role, Employee_role.Employee_id == Employee.id)
+        .order_by(Employee.id, Employee_role.id)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    rows = db.execute(stmt)
+    for _, employee_rows in groupby(rows, key=lambda row: row.id):
+        employee_rows = list(employee_rows)
+        first = employee_rows[0]._mapping
+        record = {field: _cell(first[field]) for field in export_fields if field in first}
+        record["job_position"] = [row.role.value for row in employee_rows if row.role is not None]
+        yield {field: record.get(field) for field in export_fields}
+
+
+def _with_session(generate):
+    # The response is streamed after the route returns, so the export owns its session
+    def stream(*args):
+        db = SessionLocal()
+        try:
+            yield from generate(db, *args)
+        finally:
+            db.close()
+    return stream
+
+
+@_with_session
+def stream_employees_csv(db, batch_size: int = EXPORT_BATCH_SIZE):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(export_headers)
+    for count, record in enumerate(iter_employee_records(db, batch_size), start=1):
+        writer.writerow([
+            ", ".join(value) if field == "job_position" else ("" if value is None else value)
+            for field, value in record.items()
+        ])
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+@_with_session
+def stream_employees_ndjson(db, batch_size: int = EXPORT_BATCH_SIZE):
+    lines = []
+    for record in iter_employee_records(db, batch_size):
+        lines.append(json.dumps(record, ensure_ascii=False))
+        if len(lines) == batch_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
@@ -1,22 +1,30 @@
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from sqlalchemy import select
-from datetime import datetime, timezone
-from passlib.context import CryptContext
-import uuid
-import time
-import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing
+from datetime import date
+from typing import NamedTuple
+import json
+import logging
+import multiprocessing
+import re
+import threading
+
+from app.core.config import settings
 
 # Enums and Models
 from app.enums.RoleEnum import RoleEnum
 from app.enums.ContractTypeEnum import ContractTypeEnum
 from app.enums.GenderEnum import GenderEnum
-from app.enums.TokenStatusEnum import TokenStatusEnum
+from app.enums.ImportModeEnum import ImportModeEnum, ImportMatchKeyEnum
 from app.models.Employee import Employee
-from app.models.EmployeeRole import Employee_role
-from app.models.AcountActivation import Acount_Activation
 from app.schemas.csvschema import Matchyworngcell,options
-from app.service.Sending_email import send_email_with_template
+from app.service.email_outbox import wake_outbox
+from app.service.error_sink import record_error
+from app.service.import_sessions import ImportSession, import_sessions, import_token
 from app.utils.helpers import (
     is_positive_int,
     is_valid_date,
@@ -24,13 +32,17 @@ from app.utils.helpers import (
     is_valid_phone_number,
     are_roles_valid,
     is_valid_email,
-    
+    EMAIL_REGEX,
+    PHONE_NUMBER_REGEX,
+    CNSS_REGEX,
     get_error_message
 )
+from app.utils.csvreader import iter_csv_chunks
+from app.repositories.bulkload import bulk_load_employees
+from app.repositories.upsert import upsert_employees
+from app.utils.timing import PhaseTimer
 
-
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
 
 
 
@@ -85,7 +97,12 @@ mandatory_with_conditions = {
     )
 }
 
-possible_fields = {**mandatory_fields, **optional_fields, **mandatory_with_conditions}
+# Field -> display name, used in "Missing mandatory field" messages
+possible_fields = {
+    **mandatory_fields,
+    **optional_fields,
+    **{field: optional_fields.get(field, field) for field in mandatory_with_conditions},
+}
 unique_fields = {
     "email": Employee.email,
     "number": Employee.number,
@@ -93,12 +110,49 @@ unique_fields = {
     "cnss_number": Employee.cnss_number
 }
 
+# Values per IN (...) lookup when checking unique fields against the database
+UNIQUE_CHECK_BATCH_SIZE = 1000
+
+
+def find_existing_values(db, column, values, batch_size: int = UNIQUE_CHECK_BATCH_SIZE):
+    """Return the subset of `values` already stored in `column`, with batched IN lookups."""
+    values = list(values)
+    existing = set()
+    for start in range(0, len(values), batch_size):
+        stmt = select(column).where(column.in_(values[start:start + batch_size]))
+        existing.update(db.execute(stmt).scalars())
+    return existing
+
+
+def find_existing_owners(db, column, values, batch_size: int = UNIQUE_CHECK_BATCH_SIZE):
+    """Return {value: employee id} for the `values` already stored in `column`."""
+    values = list(values)
+    owners = {}
+    for start in range(0, len(values), batch_size):
+        stmt = select(column, Employee.id).where(column.in_(values[start:start + batch_size]))
+        owners.update((value, id) for value, id in db.execute(stmt))
+    return owners
+
+
 def is_field_mandatory(employee, field):
     return field in mandatory_fields or (
         field in mandatory_with_conditions and mandatory_with_conditions[field][1](employee)
     )
 
 
+def _missing_field_cell(employee, field):
+    """Cell a missing `field` is reported on: the last one before it, else the first of the row."""
+    last_cell = None
+    for previous in possible_fields:
+        if previous == field:
+            break
+        if previous in employee:
+            last_cell = employee[previous]
+    if last_cell is None:
+        last_cell = next(iter(employee.values()), None)
+    return last_cell
+
+
 def validate_employee_data(employee):
     errors, warnings, wrong_cells = [], [], []
     # Build cleaned dict first
@@ -113,7 +167,9 @@ def validate_employee_data(employee):
             if is_field_mandatory(employee_to_add, field):
                 msg = f"Missing mandatory field: {possible_fields[field]}"
                 errors.append(msg)
-                wrong_cells.append(Matchyworngcell(errorMessage=msg, rowIndex=cell.rowIndex,  colIndex=cell.columnIndex))
+                missing_cell = _missing_field_cell(employee, field)
+                if missing_cell is not None:
+                    wrong_cells.append(Matchyworngcell(errorMessage=msg, rowIndex=missing_cell.rowIndex,  colIndex=missing_cell.columnIndex))
 
             employee_to_add[field] = None
             continue
@@ -139,6 +195,8 @@ def validate_employee_data(employee):
                     errors.append(msg)
                 else:
                     warnings.append(msg)
+                    # A forced upload stores the row without the invalid optional value
+                    employee_to_add[field] = None
                 wrong_cells.append(Matchyworngcell(errorMessage=msg, rowIndex=cell.rowIndex,  colIndex=cell.columnIndex))
             else:
                 employee_to_add[field] = valid
@@ -146,142 +204,641 @@ def validate_employee_data(employee):
     return employee_to_add, errors, warnings, wrong_cells
 
 
-# ------------------- MAIN VALIDATE & UPLOAD -------------------
-async def valid_employees_data_and_upload(employees: list, force_upload: bool, db):
-    errors, warnings, wrong_cells = [], [], []
-    employees_to_add = []
-    roles_anchor = {}
-
-    for line_index, employee in enumerate(employees):
-      
-        emp_data, emp_errors, emp_warnings, emp_wrong_cells = validate_employee_data(employee)
-
-        if emp_errors:
-            errors.append(f"Line {line_index + 1}: " + "; ".join(emp_errors))
-        if emp_warnings:
-            warnings.append(f"Line {line_index + 1}: " + "; ".join(emp_warnings))
-        if emp_wrong_cells:
-            wrong_cells.extend(emp_wrong_cells)
-
-    
-        email = emp_data.get("email")
-        if email and "job_position" in emp_data:
-            raw_positions = emp_data.pop("job_position")
-            if raw_positions:
-                roles_anchor[email] = [pos.strip() for pos in raw_positions.split(",")]
-
-        employees_to_add.append(emp_data)
-
-   
-    for field in unique_fields:
-        seen_values = set()
-        for line_index, employee in enumerate(employees):
-            cell = employee.get(field)
-            if not cell:
+# ------------------- COLUMNAR BATCH VALIDATION -------------------
+date_shape = re.compile(r"^[0-9]{4}-[0-9]{2}-[0-9]{2}$")
+_unchecked = object()
+cnss_forbidden_contracts = {ContractTypeEnum.SIVP.value, ContractTypeEnum.APPRNTI.value}
+
+
+def _check_regex_column(regex):
+    match = regex.match
+
+    def check(values, rows):
+        return [v if isinstance(v, str) and match(v) else None for v in values]
+    return check
+
+
+def _check_enum_column(enum):
+    table = enum.lookup_table()
+
+    def check(values, rows):
+        get = table.get
+        return [get(v.upper()) for v in values]
+    return check
+
+
+def _check_number_column(values, rows):
+    return [
+        int(v) if isinstance(v, str) and v.isascii() and v.isdigit() else is_positive_int(v)
+        for v in values
+    ]
+
+
+def _check_date_column(values, rows):
+    # Birth dates repeat a lot: each distinct value is parsed once
+    known = {}
+    results = []
+    for v in values:
+        valid = known.get(v, _unchecked)
+        if valid is _unchecked:
+            valid = None
+            if isinstance(v, str) and date_shape.match(v):
+                try:
+                    date(int(v[:4]), int(v[5:7]), int(v[8:]))
+                    valid = v
+                except ValueError:
+                    pass
+            else:
+                valid = is_valid_date(v)
+            known[v] = valid
+        results.append(valid)
+    return results
+
+
+def _check_cnss_column(values, rows):
+    results = []
+    for v, row in zip(values, rows):
+        if not isinstance(v, str):
+            results.append(check_cnss_contract_consistency(row, v))
+        elif row.get("contract_type") in cnss_forbidden_contracts:
+            results.append(None)
+        else:
+            results.append(v if CNSS_REGEX.match(v) else None)
+    return results
+
+
+# Same rules as fields_check, applied to a whole column at once
+column_checks = {
+    "email": _check_regex_column(EMAIL_REGEX),
+    "gender": _check_enum_column(GenderEnum),
+    "contract_type": _check_enum_column(ContractTypeEnum),
+    "number": _check_number_column,
+    "birth_date": _check_date_column,
+    "cnss_number": _check_cnss_column,
+    "phone_number": _check_regex_column(PHONE_NUMBER_REGEX),
+    "job_position": _check_enum_column(RoleEnum),
+}
+
+
+def _is_mandatory_column(field):
+    if field in mandatory_fields:
+        return lambda row: True
+    if field in mandatory_with_conditions:
+        return mandatory_with_conditions[field][1]
+    return lambda row: False
+
+
+def validate_employees_batch(employees: list):
+    """Columnar equivalent of validate_employee_data over a list of rows.
+
+    Each field of possible_fields is checked for the whole batch before moving
+    to the next one, with precompiled matchers and enum lookup tables.
+    Returns one (employee_to_add, errors, warnings, wrong_cells) tuple per row,
+    identical to what validate_employee_data returns for that row.
+    """
+    count = len(employees)
+    rows = [
+        {field: (cell.value.strip() if isinstance(cell.value, str) else cell.value) for field, cell in employee.items()}
+        for employee in employees
+    ]
+    errors = [[] for _ in range(count)]
+    warnings = [[] for _ in range(count)]
+    wrong_cells = [[] for _ in range(count)]
+
+    for field in possible_fields:
+        is_mandatory = _is_mandatory_column(field)
+        values = [row.get(field, _unchecked) for row in rows]
+        # Clean columns (the common case) skip the per-row branching entirely
+        has_blanks = _unchecked in values or '' in values
+
+        if has_blanks:
+            for i in [i for i, value in enumerate(values) if value is _unchecked or value == '']:
+                row = rows[i]
+                cell = employees[i][field] if values[i] is not _unchecked else _missing_field_cell(employees[i], field)
+                if is_mandatory(row):
+                    msg = f"Missing mandatory field: {possible_fields[field]}"
+                    errors[i].append(msg)
+                    if cell is not None:
+                        wrong_cells[i].append(Matchyworngcell(errorMessage=msg, rowIndex=cell.rowIndex, colIndex=cell.columnIndex))
+                    if values[i] is _unchecked:
+                        row[field] = None
+                else:
+                    row[field] = None
+
+        if field not in column_checks:
+            continue
+        if has_blanks:
+            checked = [i for i, value in enumerate(values) if value is not _unchecked and value != '']
+            results = column_checks[field]([values[i] for i in checked], [rows[i] for i in checked])
+        else:
+            checked = range(count)
+            results = column_checks[field](values, rows)
+
+        if None not in results:
+            for i, valid in zip(checked, results):
+                rows[i][field] = valid
+            continue
+
+        msg = fields_check[field][1]
+        for i, valid in zip(checked, results):
+            if valid is None:
+                if is_mandatory(rows[i]):
+                    errors[i].append(msg)
+                else:
+                    warnings[i].append(msg)
+                    rows[i][field] = None
+                cell = employees[i][field]
+                wrong_cells[i].append(Matchyworngcell(errorMessage=msg, rowIndex=cell.rowIndex, colIndex=cell.columnIndex))
+            else:
+                rows[i][field] = valid
+
+    return list(zip(rows, errors, warnings, wrong_cells))
+
+
+# ------------------- PARALLEL VALIDATION -------------------
+class Cell(NamedTuple):
+    """Matchycell stand-in sent to validation processes: a tuple pickles much faster than a model."""
+    value: str
+    rowIndex: int
+    columnIndex: int
+
+
+_validation_pool = None
+_validation_pool_lock = threading.Lock()
+
+
+def _validate_packed(packed: list):
+    """Run in a validation process: rows arrive as {field: (value, rowIndex, columnIndex)}."""
+    return validate_employees_batch([{field: Cell(*cell) for field, cell in row.items()} for row in packed])
+
+
+def _pack(employees: list):
+    return [
+        {field: (cell.value, cell.rowIndex, cell.columnIndex) for field, cell in employee.items()}
+        for employee in employees
+    ]
+
+
+def get_validation_pool():
+    global _validation_pool
+    with _validation_pool_lock:
+        if _validation_pool is None:
+            # spawn: forking a process that runs threads (event loop, pools) can deadlock the child
+            _validation_pool = ProcessPoolExecutor(
+                max_workers=settings.VALIDATION_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _validation_pool
+
+
+def shutdown_validation_pool():
+    global _validation_pool
+    with _validation_pool_lock:
+        pool, _validation_pool = _validation_pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def validate_rows(
+    employees: list,
+    chunk_size: int = settings.VALIDATION_CHUNK_SIZE,
+    min_rows: int = settings.VALIDATION_PARALLEL_MIN_ROWS,
+):
+    """validate_employees_batch over `employees`, split across processes for large uploads.
+
+    Chunks are validated independently (row validation never looks at other
+    rows) and merged back in input order, so the result is the one of a
+    single validate_employees_batch call. Duplicate and database checks
+    need every row and stay with the caller.
+    """
+    if settings.VALIDATION_WORKERS <= 1 or len(employees) < max(min_rows, 2):
+        return validate_employees_batch(employees)
+
+    chunks = [_pack(employees[start:start + chunk_size]) for start in range(0, len(employees), chunk_size)]
+    try:
+        results = []
+        for chunk_results in get_validation_pool().map(_validate_packed, chunks):
+            results.extend(chunk_results)
+        return results
+    except BrokenProcessPool:
+        logger.exception("Validation process pool broke, validating %d rows in process", len(employees))
+        shutdown_validation_pool()
+        return validate_employees_batch(employees)
+
+
+# ------------------- CHUNKED VALIDATION -------------------
+class UploadValidation:
+    """Validation report of one upload.
+
+    Rows can be fed in successive chunks: line numbers and duplicate detection
+    carry over from one chunk to the next, and the final report is identical
+    to the one produced by validating every row at once.
+    In upsert mode a row may reuse the unique values of the employee it
+    matches on `match_by`; only values owned by another employee conflict.
+    """
+
+    def __init__(self, mode: ImportModeEnum = ImportModeEnum.insert, match_by: ImportMatchKeyEnum = ImportMatchKeyEnum.number):
+        self.mode = ImportModeEnum(mode)
+        self.match_by = ImportMatchKeyEnum(match_by)
+        # Uploaded columns, from the first row; an upsert leaves the others untouched
+        self.columns = None
+        self.counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        self.errors, self.warnings, self.wrong_cells = [], [], []
+        self.duplicate_errors = {field: [] for field in unique_fields}
+        self.duplicate_cells = {field: [] for field in unique_fields}
+        self.seen_values = {field: set() for field in unique_fields}
+        self.conflict_errors = {field: [] for field in unique_fields}
+        self.conflict_cells = {field: [] for field in unique_fields}
+        self.lines = 0
+        self.timer = PhaseTimer()
+
+    def validate_chunk(self, employees: list, db=None):
+        """Validate the next rows of the upload and return (employees_to_add, roles_anchor).
+
+        When `db` is given, unique fields are also checked against existing employees.
+        """
+        employees_to_add = []
+        roles_anchor = {}
+        if self.columns is None and employees:
+            self.columns = set(employees[0])
+
+        with self.timer.span("validate", rows=len(employees)):
+            for offset, result in enumerate(validate_rows(employees)):
+                line = self.lines + offset + 1
+                emp_data, emp_errors, emp_warnings, emp_wrong_cells = result
+
+                if emp_errors:
+                    self.errors.append(f"Line {line}: " + "; ".join(emp_errors))
+                if emp_warnings:
+                    self.warnings.append(f"Line {line}: " + "; ".join(emp_warnings))
+                if emp_wrong_cells:
+                    self.wrong_cells.extend(emp_wrong_cells)
+
+                email = emp_data.get("email")
+                if email and "job_position" in emp_data:
+                    raw_positions = emp_data.pop("job_position")
+                    if raw_positions:
+                        roles_anchor[email] = [pos.strip() for pos in raw_positions.split(",")]
+
+                employees_to_add.append(emp_data)
+
+        with self.timer.span("duplicates", rows=len(employees)):
+            for field in unique_fields:
+                seen_values = self.seen_values[field]
+                for offset, employee in enumerate(employees):
+                    cell = employee.get(field)
+                    if not cell:
+                        continue
+                    value = cell.value.strip()
+                    if value == "":
+                        continue
+                    if value in seen_values:
+                        msg = f"{field.capitalize()} '{value}' is duplicated"
+                        self.duplicate_errors[field].append(f"Line {self.lines + offset + 1}: {msg}")
+                        self.duplicate_cells[field].append(
+                            Matchyworngcell(
+                                errorMessage=msg,
+                                rowIndex=cell.rowIndex,
+                                colIndex=cell.columnIndex
+                            )
+                        )
+                    else:
+                        seen_values.add(value)
+
+        if db is not None:
+            with self.timer.span("existing_check", rows=len(employees)):
+                self.check_existing_values(db, employees, employees_to_add)
+
+        self.lines += len(employees)
+        return employees_to_add, roles_anchor
+
+    @property
+    def upsert(self):
+        return self.mode == ImportModeEnum.upsert
+
+    def check_existing_values(self, db, employees: list, employees_to_add: list, first_line: int = None):
+        """Report cleaned unique values of the chunk that already belong to an employee.
+
+        `first_line` is the line number before the chunk, the rows validated so far by default.
+        """
+        first_line = self.lines if first_line is None else first_line
+        matched_ids = None
+        if self.upsert:
+            key = self.match_by.value
+            keys = [str(emp_data.get(key)) for emp_data in employees_to_add]
+            owners = find_existing_owners(db, unique_fields[key], set(keys))
+            matched_ids = [owners.get(value) for value in keys]
+
+        for field, column in unique_fields.items():
+            if self.upsert and field == self.match_by.value:
                 continue
-            value = cell.value.strip()
-            if value == "":
+            offsets_by_value = {}
+            for offset, emp_data in enumerate(employees_to_add):
+                value = emp_data.get(field)
+                if value is None or value == "":
+                    continue
+                offsets_by_value.setdefault(str(value), []).append(offset)
+            if not offsets_by_value:
                 continue
-            if value in seen_values:
-                msg = f"{field.capitalize()} '{value}' is duplicated"
-                errors.append(f"Line {line_index + 1}: {msg}")
-                wrong_cells.append(
+
+            if matched_ids is None:
+                existing = find_existing_values(db, column, offsets_by_value.keys())
+                conflicts = sorted(
+                    (offset, value) for value in existing for offset in offsets_by_value[value]
+                )
+            else:
+                owners = find_existing_owners(db, column, offsets_by_value.keys())
+                conflicts = sorted(
+                    (offset, value) for value, owner in owners.items()
+                    for offset in offsets_by_value[value] if owner != matched_ids[offset]
+                )
+            for offset, value in conflicts:
+                cell = employees[offset][field]
+                msg = f"{field.capitalize()} '{value}' already exists"
+                self.conflict_errors[field].append(f"Line {first_line + offset + 1}: {msg}")
+                self.conflict_cells[field].append(
                     Matchyworngcell(
                         errorMessage=msg,
                         rowIndex=cell.rowIndex,
                         colIndex=cell.columnIndex
                     )
                 )
-            else:
-                seen_values.add(value)
+
+    @property
+    def has_errors(self):
+        return (
+            bool(self.errors)
+            or any(self.duplicate_errors.values())
+            or any(self.conflict_errors.values())
+        )
+
+    def accepts(self, force_upload: bool):
+        """True while the rows seen so far can still be inserted."""
+        return not self.has_errors and (force_upload or not self.warnings)
+
+    @property
+    def error_count(self):
+        return (
+            len(self.errors)
+            + sum(len(msgs) for msgs in self.duplicate_errors.values())
+            + sum(len(msgs) for msgs in self.conflict_errors.values())
+        )
+
+    def report(self):
+        errors = (
+            self.errors
+            + [msg for field in unique_fields for msg in self.duplicate_errors[field]]
+            + [msg for field in unique_fields for msg in self.conflict_errors[field]]
+        )
+        wrong_cells = (
+            self.wrong_cells
+            + [cell for field in unique_fields for cell in self.duplicate_cells[field]]
+            + [cell for field in unique_fields for cell in self.conflict_cells[field]]
+        )
+        return {
+            "errors": "\n".join(errors),
+            "warnings": "\n".join(self.warnings),
+            "wrongCells": [c.model_dump() for c in wrong_cells],
+            "details": "CSV file is not valid"
+        }
+
+    def error_response(self, diagnostics: dict = None, token: str = None):
+        content = self.report()
+        if token is not None:
+            content["importToken"] = token
+        if diagnostics is not None:
+            content["diagnostics"] = diagnostics
+        return JSONResponse(status_code=400, content=content)
+
+    def outcome(self):
+        """Body of a successful import: row count, plus the sync counts of an upsert."""
+        if self.upsert:
+            return {"message": "Employees synchronized", "count": self.lines, **self.counts}
+        return {"message": "Employees added", "count": self.lines}
+
+    def diagnostics(self, queued_emails: int = 0):
+        """Time and row count of each import phase, plus overall counts."""
+        return {
+            "rows": self.lines,
+            "errors": self.error_count,
+            "warnings": len(self.warnings),
+            "queued_emails": queued_emails,
+            **self.timer.to_dict(),
+        }
+
+    def log_diagnostics(self, outcome: str, queued_emails: int = 0):
+        diagnostics = self.diagnostics(queued_emails)
+        logger.info(
+            "CSV import %s: %s", outcome, json.dumps(diagnostics),
+            extra={"csv_import": {"outcome": outcome, **diagnostics}},
+        )
+        return diagnostics
+
+
+# ------------------- INSERT -------------------
+def insert_employees(db, employees_to_add: list, roles_anchor: dict, timer: PhaseTimer = None):
+    """Insert validated employees with their roles, activation tokens and activation emails, without committing.
+
+    Returns the number of activation emails queued in the outbox.
+    """
+    return bulk_load_employees(db, employees_to_add, roles_anchor, timer)
+
+
+def write_employees(db, validation, employees_to_add: list, roles_anchor: dict):
+    """Insert, or in upsert mode sync, a validated chunk and add it to the validation counts.
+
+    Returns the number of activation emails queued in the outbox.
+    """
+    if not validation.upsert:
+        validation.counts["inserted"] += len(employees_to_add)
+        return insert_employees(db, employees_to_add, roles_anchor, validation.timer)
+    counts, queued_emails = upsert_employees(
+        db, employees_to_add, roles_anchor, validation.match_by.value, validation.columns, validation.timer
+    )
+    for name, count in counts.items():
+        validation.counts[name] += count
+    return queued_emails
+
+
+def employees_added_response(validation, queued_emails: int, diagnostics: bool = False):
+    content = validation.outcome()
+    if diagnostics:
+        content["diagnostics"] = validation.diagnostics(queued_emails)
+    return JSONResponse(status_code=200, content=content)
+
+
+# ------------------- MAIN VALIDATE & UPLOAD -------------------
+async def valid_employees_data_and_upload(
+    employees: list, force_upload: bool, db, diagnostics: bool = False,
+    mode: ImportModeEnum = ImportModeEnum.insert, match_by: ImportMatchKeyEnum = ImportMatchKeyEnum.number,
+):
+    # Validation (and its wait on the process pool) and the DB writes block: keep them off the event loop
+    return await run_in_threadpool(
+        validate_and_upload_employees, employees, force_upload, db, diagnostics, mode, match_by
+    )
+
+
+def validate_and_upload_employees(
+    employees: list, force_upload: bool, db, diagnostics: bool = False,
+    mode: ImportModeEnum = ImportModeEnum.insert, match_by: ImportMatchKeyEnum = ImportMatchKeyEnum.number,
+):
+    token = import_token(employees, ImportModeEnum(mode), ImportMatchKeyEnum(match_by))
+    # Same payload sent again with forceUpload: its validation is reused
+    session = import_sessions.pop(token) if force_upload else None
+    if session is not None:
+        return write_import_session(session, db, diagnostics)
+
+    validation = UploadValidation(mode, match_by)
+    employees_to_add, roles_anchor = validation.validate_chunk(employees, db)
 
     # إذا فما أخطاء أو تحذيرات ومافماش forceUpload
-    if errors or (warnings and not force_upload):
-            return JSONResponse(
-            status_code=400,
-            content={
-                "errors": "\n".join(errors),
-                "warnings": "\n".join(warnings),
-                "wrongCells": [c.model_dump() for c in wrong_cells],
-                "details": "CSV file is not valid"
-            }
+    if not validation.accepts(force_upload):
+        validation.log_diagnostics("rejected")
+        # Warnings only: the cleaned rows wait for POST /uploadCSV/commit
+        kept = validation.accepts(True) and import_sessions.put(
+            token, ImportSession(validation, employees_to_add, roles_anchor, unique_cells(employees))
         )
+        return validation.error_response(validation.diagnostics() if diagnostics else None, token if kept else None)
 
-        
-        
-    
+    return write_validated_employees(db, validation, employees_to_add, roles_anchor, diagnostics)
 
+
+def unique_cells(employees: list):
+    """Positions of the unique cells of each row, all a kept session needs to report conflicts."""
+    return [
+        {field: Cell(cell.value, cell.rowIndex, cell.columnIndex) for field, cell in employee.items() if field in unique_fields}
+        for employee in employees
+    ]
+
+
+def commit_import_session(token: str, db, diagnostics: bool = False):
+    """Write the rows of a validation kept under `token`, without validating them again."""
+    session = import_sessions.pop(token)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Import session not found or expired")
+    return write_import_session(session, db, diagnostics)
+
+
+def write_import_session(session, db, diagnostics: bool = False):
+    """Write a kept session once its database checks pass again.
+
+    Rows are validated once, but employees written since (another import,
+    POST /api/employees) may now own their unique values, and an upsert's
+    matched employees may be gone: conflicts get the usual 400 report.
+    """
+    validation = session.validation
+    with validation.timer.span("existing_recheck", rows=len(session.employees_to_add)):
+        validation.check_existing_values(db, session.cells, session.employees_to_add, first_line=0)
+    if validation.has_errors:
+        validation.log_diagnostics("rejected")
+        return validation.error_response(validation.diagnostics() if diagnostics else None)
+    return write_validated_employees(db, validation, session.employees_to_add, session.roles_anchor, diagnostics)
+
+
+def write_validated_employees(db, validation, employees_to_add: list, roles_anchor: dict, diagnostics: bool = False):
+    """Insert (or upsert) rows that passed validation, commit, and build the success response."""
     #   idha data mrigla nkamlou nda5louha fel db
     try:
-        emails_with_tokens = []  # Initialize the list to store email and token pairs
-        start_time = time.perf_counter()
-        db.bulk_insert_mappings(Employee, employees_to_add)
-        db.flush()
-        elapsed = time.perf_counter() - start_time
-        print(f"✅ Inserted {len(employees_to_add)} employees in {elapsed:.4f} seconds.")
-
-        anchors = list(roles_anchor.keys())
-        stmt = select(Employee).where(Employee.email.in_(anchors))
-        inserted_emps = db.execute(stmt).scalars().all()
-
-        value_map = {member.value.lower(): member.value for member in RoleEnum}
-
-        def normalize_position(raw_position: str):
-            if not raw_position:
-                return None
-            return value_map.get(raw_position.strip().lower())
-
-        roles_to_insert = []
-        for emp in inserted_emps:
-            raw_positions = roles_anchor.get(emp.email, [])
-            for raw_pos in raw_positions:
-                proper_role = normalize_position(raw_pos)
-                if proper_role:
-                    roles_to_insert.append({
-                        "Employee_id": emp.id,
-                        "role": proper_role
-                    })
-
-        if roles_to_insert:
-            db.bulk_insert_mappings(Employee_role, roles_to_insert)
-
-        # Insert account activations
-        for emp in inserted_emps:
-            token = str(uuid.uuid4())
-            activation = Acount_Activation(
-                Employee_id=emp.id,
-                Email=emp.email,
-                token=token,
-                created_on=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
-                token_status_id=TokenStatusEnum.Valid
-            )
-            db.add(activation)
-            emails_with_tokens.append({"email": emp.email, "token": token})
+        queued_emails = write_employees(db, validation, employees_to_add, roles_anchor)
+        with validation.timer.span("commit"):
+            db.commit()
+        wake_outbox()
 
-        db.commit()
+    except Exception as e:
+        db.rollback()
+        validation.log_diagnostics("failed")
+        record_error(str(e))
+        msg = get_error_message(str(e))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=msg)
 
-        async def send_single_email(email, token, subject, template_name):
-            await send_email_with_template(
-                [email],
-                {"token": token},
-                subject=subject,
-                template_name=template_name
-            )
+    validation.log_diagnostics("completed", queued_emails)
+    return employees_added_response(validation, queued_emails, diagnostics)
 
-    # داخل async function
-        tasks = [
-            send_single_email(
-                entry["email"],
-                entry["token"],
-                subject="Set Your Password",
-                template_name="set_password.html"
-            )
-            for entry in emails_with_tokens
-        ]
 
-        await asyncio.gather(*tasks)
+# ------------------- CHUNKED UPLOAD -------------------
+def check_mandatory_fields(first_row: dict):
+    missing_fields = set(mandatory_fields.keys()) - set(first_row.keys())
+    if missing_fields:
+        raise HTTPException(status_code=400, detail=f"Missing mandatory fields: {', '.join(missing_fields)}")
 
+
+def iter_line_chunks(lines: list, chunk_size: int = settings.CSV_IMPORT_CHUNK_SIZE):
+    for start in range(0, len(lines), chunk_size):
+        yield lines[start:start + chunk_size]
+
+
+def validate_and_insert_chunks(
+    chunks, force_upload: bool, db, progress=None,
+    mode: ImportModeEnum = ImportModeEnum.insert, match_by: ImportMatchKeyEnum = ImportMatchKeyEnum.number,
+):
+    """Validate and insert (or upsert, see write_employees) successive chunks of rows inside a single transaction.
+
+    Inserting stops at the first rejected row, but validation goes on so the
+    report covers every row. `progress`, when given, is told the current phase
+    and the number of rows processed (see app.service.import_jobs.ImportJob).
+    Returns (validation, queued_emails); the transaction is committed only
+    if every row was accepted.
+    """
+    validation = UploadValidation(mode, match_by)
+    queued_emails = 0
+    try:
+        for chunk in validation.timer.timed_iter("parse", chunks):
+            if validation.lines == 0:
+                check_mandatory_fields(chunk[0])
+            if progress:
+                progress.set_phase("validating")
+            employees_to_add, roles_anchor = validation.validate_chunk(chunk, db)
+            if validation.accepts(force_upload):
+                if progress:
+                    progress.set_phase("inserting")
+                queued_emails += write_employees(db, validation, employees_to_add, roles_anchor)
+            if progress:
+                progress.update(validation)
+
+        if validation.lines == 0:
+            raise HTTPException(status_code=400, detail="CSV file is empty")
+        if not validation.accepts(force_upload):
+            db.rollback()
+            validation.log_diagnostics("rejected")
+            return validation, 0
+        with validation.timer.span("commit"):
+            db.commit()
+        wake_outbox()
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
+        validation.log_diagnostics("failed")
+        record_error(str(e))
         msg = get_error_message(str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=msg)
+
+    validation.log_diagnostics("completed", queued_emails)
+    return validation, queued_emails
+
+
+# ------------------- STREAMED CSV FILE UPLOAD -------------------
+def validate_and_insert_csv_chunks(
+    file, force_upload: bool, db, progress=None,
+    mode: ImportModeEnum = ImportModeEnum.insert, match_by: ImportMatchKeyEnum = ImportMatchKeyEnum.number,
+):
+    """Validate and insert a raw CSV file chunk by chunk inside a single transaction.
+
+    Only one chunk of parsed rows (CSV_IMPORT_CHUNK_SIZE) is held in memory at a time.
+    """
+    # Closed here, while the upload is still open, even when a chunk is rejected midway
+    with closing(iter_csv_chunks(file, settings.CSV_IMPORT_CHUNK_SIZE)) as chunks:
+        return validate_and_insert_chunks(chunks, force_upload, db, progress, mode, match_by)
+
+
+async def stream_employees_csv_and_upload(
+    file, force_upload: bool, db, diagnostics: bool = False,
+    mode: ImportModeEnum = ImportModeEnum.insert, match_by: ImportMatchKeyEnum = ImportMatchKeyEnum.number,
+):
+    validation, queued_emails = await run_in_threadpool(
+        validate_and_insert_csv_chunks, file, force_upload, db, None, mode, match_by
+    )
+    if not validation.accepts(force_upload):
+        return validation.error_response(validation.diagnostics() if diagnostics else None)
+
+    return employees_added_response(validation, queued_emails, diagnostics)
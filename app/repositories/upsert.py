@@ -0,0 +1,115 @@
+from enum import Enum
+
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.Employee import Employee
+from app.models.EmployeeRole import Employee_role
+from app.repositories.bulkload import bulk_load_employees, employee_columns, normalize_position, _employee_row
+from app.utils.timing import PhaseTimer
+
+# Keys per IN (...) lookup when reading the employees a chunk matches
+LOOKUP_BATCH_SIZE = 1000
+
+
+def _comparable(value):
+    """Stored and uploaded values compare equal once enums, dates and numbers are text."""
+    if value is None:
+        return None
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+def load_employees(db, key_column, keys, columns: list, batch_size: int = LOOKUP_BATCH_SIZE):
+    """Return {key: row} for the employees whose `key_column` is in `keys`; rows hold id and `columns`."""
+    table = Employee.__table__
+    selected = [table.c.id] + [table.c[column] for column in columns if column != key_column.name] + [key_column]
+    keys = list(keys)
+    found = {}
+    for start in range(0, len(keys), batch_size):
+        stmt = select(*selected).where(key_column.in_(keys[start:start + batch_size]))
+        for row in db.execute(stmt).mappings():
+            found[str(row[key_column.name])] = row
+    return found
+
+
+def load_roles(db, employee_ids: list, batch_size: int = LOOKUP_BATCH_SIZE):
+    """Return {employee id: set of RoleEnum}."""
+    roles = {}
+    for start in range(0, len(employee_ids), batch_size):
+        stmt = select(Employee_role.Employee_id, Employee_role.role).where(
+            Employee_role.Employee_id.in_(employee_ids[start:start + batch_size])
+        )
+        for employee_id, role in db.execute(stmt):
+            roles.setdefault(employee_id, set()).add(role)
+    return roles
+
+
+def upsert_employees(db, employees_to_add: list, roles_anchor: dict, match_by: str, columns=None, timer: PhaseTimer = None):
+    """Sync validated employees with the stored ones matched on `match_by`, without committing.
+
+    Unknown employees are inserted like a regular import (roles, activation
+    tokens and emails). Known ones only get the columns that differ, written
+    with one INSERT ... ON CONFLICT (match_by) DO UPDATE per set of changed
+    columns, and their roles are brought to the uploaded positions with one
+    INSERT and one DELETE. `columns` limits the sync to the uploaded columns:
+    the others keep their stored value.
+    Returns ({"inserted", "updated", "unchanged"}, queued activation emails).
+    """
+    timer = timer or PhaseTimer()
+    table = Employee.__table__
+    key_column = table.c[match_by]
+    synced = [column for column in employee_columns if columns is None or column in columns]
+    rows = [_employee_row(emp_data) for emp_data in employees_to_add]
+
+    with timer.span("load_existing", rows=len(rows)):
+        existing = load_employees(db, key_column, (str(row[match_by]) for row in rows), synced)
+        stored_roles = load_roles(db, [current["id"] for current in existing.values()])
+
+    new_employees, updates, roles_to_add, roles_to_remove = [], {}, [], []
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    for emp_data, row in zip(employees_to_add, rows):
+        current = existing.get(str(row[match_by]))
+        if current is None:
+            new_employees.append(emp_data)
+            continue
+
+        changed = tuple(column for column in synced if _comparable(row[column]) != _comparable(current[column]))
+        if changed:
+            updates.setdefault(changed, []).append(row)
+
+        roles_changed = False
+        wanted = {normalize_position(position) for position in roles_anchor.get(row["email"], [])} - {None}
+        # No valid position uploaded: the stored roles are kept
+        if wanted:
+            stored = stored_roles.get(current["id"], set())
+            roles_to_add += [{"Employee_id": current["id"], "role": role} for role in sorted(wanted - stored)]
+            roles_to_remove += [(current["id"], role) for role in sorted(stored - wanted)]
+            roles_changed = wanted != stored
+
+        counts["updated" if changed or roles_changed else "unchanged"] += 1
+
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    with timer.span("update_employees", rows=sum(len(group) for group in updates.values())):
+        for changed, group in updates.items():
+            stmt = dialect.insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[match_by],
+                set_={column: stmt.excluded[column] for column in changed},
+            )
+            db.execute(stmt, group)
+    with timer.span("update_roles", rows=len(roles_to_add) + len(roles_to_remove)):
+        if roles_to_remove:
+            db.execute(delete(Employee_role).where(
+                tuple_(Employee_role.Employee_id, Employee_role.role).in_(roles_to_remove)
+            ))
+        if roles_to_add and not new_employees:
+            db.execute(insert(Employee_role.__table__), roles_to_add)
+
+    queued_emails = 0
+    if new_employees:
+        # The roles of matched employees go with the ones of the new employees
+        queued_emails = bulk_load_employees(db, new_employees, roles_anchor, timer, extra_roles=roles_to_add)
+    counts["inserted"] = len(new_employees)
+    return counts, queued_emails
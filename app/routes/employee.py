@@ -1,66 +1,121 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Response
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, File, Form, Query
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.routes import auth
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_async_db
 from app.models import Employee, EmailChangeToken, Employee_role
 from app.schemas.employee import (
-    EmployeeOut, EmployeeCreate, EmployeeProfile,
+    EmployeeOut, EmployeeCreate, EmployeeProfile, EmployeePage,
     EmailChangeRequest, AdminEmployeeUpdateRequest
 )
-from app.schemas.csvschema import options, CSVSchema, uploadCSV
-from app.repositories.uploadcsv import mandatory_fields,valid_employees_data_and_upload
-from app.enums import  RoleEnum
-from app.service.Sending_email import send_email_with_template
+from app.schemas.csvschema import options, CSVSchema, uploadCSV, uploadCSVCommit, ImportJobOut
+from app.repositories.export import stream_employees_csv, stream_employees_ndjson
+from app.repositories.uploadcsv import check_mandatory_fields,valid_employees_data_and_upload,stream_employees_csv_and_upload,commit_import_session
+from app.enums import  RoleEnum, ContractTypeEnum, StatusAccountEnum, ImportModeEnum, ImportMatchKeyEnum
+from app.service.email_outbox import enqueue_email, wake_outbox
+from app.service.import_jobs import submit_lines_import, submit_file_import, get_import_job
+from app.service.principal_cache import invalidate_principal
+from app.service.token_sweeper import email_change_token_expired
+from app.service.action_tokens import EMAIL_CHANGE, is_signed_token, issue_token, read_token, token_expired
 from app.repositories.employee import (
-    get_employee_id, get_all_employee, add_employee,
-    update_employee, delete_employee,
-    get_employee_role
+    get_employee_id, get_employees_page, add_employee,
+    update_employee as update_employee_record, delete_employee,
+    employee_list_fields, encode_cursor, decode_cursor, consume_signed_token,
+    EMPLOYEE_PAGE_DEFAULT_LIMIT, EMPLOYEE_PAGE_MAX_LIMIT
 )
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# Get all employees
-@router.get("/employees", response_model=List[EmployeeOut])
-def read_employees(db: Session = Depends(get_db)):
-    return get_all_employee(db)
+# List employees, one page at a time (cursor from the previous page's next_cursor)
+@router.get("/employees", response_model=EmployeePage)
+async def read_employees(
+    limit: int = Query(EMPLOYEE_PAGE_DEFAULT_LIMIT, ge=1, le=EMPLOYEE_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    contract_type: Optional[List[ContractTypeEnum]] = Query(None),
+    status_account: Optional[List[StatusAccountEnum]] = Query(None),
+    role: Optional[List[RoleEnum]] = Query(None),
+    disabled: Optional[bool] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated subset of the employee fields"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    after_id = None
+    if cursor:
+        try:
+            after_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    selected = None
+    if fields:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in selected if field not in employee_list_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    items, next_after_id = await get_employees_page(
+        db, limit=limit, after_id=after_id,
+        contract_type=contract_type, status_account=status_account, role=role, disabled=disabled,
+        created_from=created_from, created_to=created_to, fields=selected,
+    )
+    return EmployeePage(
+        items=items,
+        next_cursor=encode_cursor(next_after_id) if next_after_id is not None else None,
+        limit=limit,
+    )
+
+# Export the whole roster, streamed
+@router.get("/employees/export")
+def export_employees(format: str = Query("csv", pattern="^(csv|ndjson)$")):
+    if format == "ndjson":
+        return StreamingResponse(stream_employees_ndjson(), media_type="application/x-ndjson")
+    return StreamingResponse(
+        stream_employees_csv(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="employees.csv"'},
+    )
 
 # Get a single employee by ID
-@router.get("/employees/{employee_id}", response_model=EmployeeOut)
-def read_employee(employee_id: int, db: Session = Depends(get_db)):
-    employee = get_employee_id(db, employee_id)
+@router.get("/employees/{employee_id:int}", response_model=EmployeeOut)
+async def read_employee(employee_id: int, db: AsyncSession = Depends(get_async_db)):
+    employee = await get_employee_id(db, employee_id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     return employee
 
 # Create a new employee
 @router.post("/employees", response_model=EmployeeOut, status_code=201)
-def create_employee(employee_data: EmployeeCreate, db: Session = Depends(get_db)):
+async def create_employee(employee_data: EmployeeCreate, db: AsyncSession = Depends(get_async_db)):
     if employee_data.password != employee_data.confirm_password:
         raise HTTPException(status_code=400, detail="Passwords do not match")
-    return add_employee(db, employee_data)
+    return await add_employee(db, employee_data)
 
 
 # Update full employee info (admin)
-@router.put("/employees/{employee_id}", response_model=EmployeeOut)
-def update_employee(employee_id: int, employee_data: EmployeeCreate, db: Session = Depends(get_db)):
-    employee = update_employee(db, employee_id, employee_data)
+@router.put("/employees/{employee_id:int}", response_model=EmployeeOut)
+async def update_employee(employee_id: int, employee_data: EmployeeCreate, db: AsyncSession = Depends(get_async_db)):
+    employee = await update_employee_record(db, employee_id, employee_data)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
+    invalidate_principal(employee_id)
     return employee
 
 # Employee updates his profile
 @router.put("/employees/profile")
-def update_employee_profile(employee_data: EmployeeProfile, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    employee = auth.get_current_user(token, db)
+async def update_employee_profile(employee_data: EmployeeProfile, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    employee = await auth.get_current_user(token, db)
     if not employee:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
-    target_employee = db.query(Employee).filter(Employee.id == employee.id).first()
+    target_employee = await db.get(Employee, employee.id)
     if not target_employee:
         raise HTTPException(status_code=404, detail="Employee not found")
 
@@ -68,58 +123,72 @@ def update_employee_profile(employee_data: EmployeeProfile, token: str = Depends
     for key, value in update_data.items():
         setattr(target_employee, key, value)
 
-    db.commit()
-    db.refresh(target_employee)
+    await db.commit()
+    invalidate_principal(target_employee.id)
     return {"message": "Profile updated successfully", "updated_fields": update_data}
 
 # Request to change email (confirmation link sent)
 @router.put("/employees/email")
-def request_email_change(data: EmailChangeRequest, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
-    employee = auth.get_current_user(token, db)
-    employee = db.query(Employee).filter(Employee.id == employee.id).first()
+async def request_email_change(data: EmailChangeRequest, db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)):
+    employee = await auth.get_current_user(token, db)
+    employee = await db.get(Employee, employee.id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
-    if not auth.verify_password(data.current_password, employee.password):
+    if not await auth.verify_password(data.current_password, employee.password):
         raise HTTPException(status_code=401, detail="Incorrect password")
 
-    existing_email = db.query(Employee).filter(Employee.email == data.new_email).first()
+    existing_email = await db.scalar(select(Employee).where(Employee.email == data.new_email))
     if existing_email:
         raise HTTPException(status_code=400, detail="Email already in use")
 
-    confirmation_token = auth.generate_token()
-    token_entry = EmailChangeToken(Employee_id=employee.id, new_email=data.new_email, token=confirmation_token)
-    db.add(token_entry)
-    db.commit()
-    send_email_with_template(emails=[data.new_email], body={"token": confirmation_token}, subject="Email Change Confirmation", template_name="reset_password.html")
+    if settings.SIGNED_ACTION_TOKENS:
+        # Valid while the password and the current email are unchanged
+        confirmation_token = issue_token(employee.id, EMAIL_CHANGE, employee.password, email=data.new_email, previous_email=employee.email)
+    else:
+        confirmation_token = auth.generate_token()
+        token_entry = EmailChangeToken(Employee_id=employee.id, new_email=data.new_email, token=confirmation_token)
+        db.add(token_entry)
+    enqueue_email(db, data.new_email, "Email Change Confirmation", "reset_password.html", {"token": confirmation_token})
+    await db.commit()
+    wake_outbox()
     return {"message": "Confirmation email sent to new address."}
 
 # Confirm email change via token
 @router.get("/confirm-email-change")
-def confirm_email_change(token: str, db: Session = Depends(get_db)):
-    token_entry = db.query(EmailChangeToken).filter(EmailChangeToken.token == token).first()
-    if not token_entry:
+async def confirm_email_change(token: str, db: AsyncSession = Depends(get_async_db)):
+    if is_signed_token(token):
+        claims = read_token(token, EMAIL_CHANGE)
+        if not claims or token_expired(claims):
+            raise HTTPException(status_code=404, detail="Invalid or expired token")
+        await consume_signed_token(db, claims, Employee.email == claims["previous_email"], email=claims["email"])
+        await db.commit()
+        invalidate_principal(claims["sub"])
+        return {"message": "Email updated successfully."}
+
+    token_entry = await db.scalar(select(EmailChangeToken).where(EmailChangeToken.token == token))
+    if not token_entry or email_change_token_expired(token_entry):
         raise HTTPException(status_code=404, detail="Invalid or expired token")
-    employee = db.query(Employee).filter(Employee.id == token_entry.Employee_id).first()
+    employee = await db.get(Employee, token_entry.Employee_id)
     if employee:
         employee.email = token_entry.new_email
-        db.commit()
-    db.delete(token_entry)
-    db.commit()
+        await db.commit()
+        invalidate_principal(employee.id)
+    await db.delete(token_entry)
+    await db.commit()
     return {"message": "Email updated successfully."}
 
 
 
 # Admin updates employee fields (role, contract_type, etc.)
-@router.put("/employees/{employee_id}/admin-update")
-def admin_update_employee(employee_id: int, data_entry: AdminEmployeeUpdateRequest, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
-    current_user = auth.get_current_user(token, db)
+@router.put("/employees/{employee_id:int}/admin-update")
+async def admin_update_employee(employee_id: int, data_entry: AdminEmployeeUpdateRequest, db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)):
+    current_user = await auth.get_current_user(token, db)
     if not current_user:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
-    role_record = get_employee_role(db, current_user.id)
-    if not role_record or role_record.role != RoleEnum.admin:
+    if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Access denied. Admin only.")
 
-    target_employee = db.query(Employee).filter(Employee.id == employee_id).first()
+    target_employee = await db.get(Employee, employee_id)
     if not target_employee:
         raise HTTPException(status_code=404, detail="Employee not found.")
 
@@ -130,15 +199,17 @@ def admin_update_employee(employee_id: int, data_entry: AdminEmployeeUpdateReque
             setattr(target_employee, field, update_data[field])
             updated = True
     if "role" in update_data:
-        db.query(Employee_role).filter(Employee_role.Employee_id == employee_id).delete()
-        for role in update_data["role"]:
-            new_role = Employee_role(Employee_id=employee_id, role=role)
-            db.add(new_role)
+        await db.execute(delete(Employee_role).where(Employee_role.Employee_id == employee_id))
+        if update_data["role"]:
+            await db.execute(
+                insert(Employee_role),
+                [{"Employee_id": employee_id, "role": role} for role in update_data["role"]],
+            )
         updated = True
 
     if updated:
-        db.commit()
-        db.refresh(target_employee)
+        await db.commit()
+        invalidate_principal(employee_id)
 
     return {
         "message": f"Employee ID {employee_id} updated successfully.",
@@ -146,10 +217,11 @@ def admin_update_employee(employee_id: int, data_entry: AdminEmployeeUpdateReque
     }
 
 # Delete employee
-@router.delete("/employees/{employee_id}", status_code=204)
-def delete_employee_route(employee_id: int, db: Session = Depends(get_db)):
-    if not delete_employee(db, employee_id):
+@router.delete("/employees/{employee_id:int}", status_code=204)
+async def delete_employee_route(employee_id: int, db: AsyncSession = Depends(get_async_db)):
+    if not await delete_employee(db, employee_id):
         raise HTTPException(status_code=404, detail="Employee not found")
+    invalidate_principal(employee_id)
     return Response(status_code=204)
 
 # Get allowed fields in CSV
@@ -159,12 +231,47 @@ def get_csv_options(db: Session = Depends(get_db)):
 
 # Upload and validate CSV employees
 @router.post("/uploadCSV")
-def upload_csv(entry: uploadCSV, db: Session = Depends(get_db)):
+async def upload_csv(entry: uploadCSV, db: Session = Depends(get_db)):
     employees = entry.lines
     if not employees:
         raise HTTPException(status_code=400, detail="CSV file is empty")
-    first_row_keys = set(employees[0].keys())
-    missing_fields = set(mandatory_fields.keys()) - first_row_keys
-    if missing_fields:
-        raise HTTPException(status_code=400, detail=f"Missing mandatory fields: {', '.join(missing_fields)}")
-    return valid_employees_data_and_upload(employees, entry.forceUpload, db)
+    check_mandatory_fields(employees[0])
+    return await valid_employees_data_and_upload(employees, entry.forceUpload, db, entry.diagnostics, entry.mode, entry.matchBy)
+
+# Insert an upload rejected for its warnings only, from its importToken
+@router.post("/uploadCSV/commit")
+def commit_csv(entry: uploadCSVCommit, db: Session = Depends(get_db)):
+    return commit_import_session(entry.importToken, db, entry.diagnostics)
+
+# Upload a raw CSV file, parsed and inserted chunk by chunk
+@router.post("/uploadCSVFile")
+async def upload_csv_file(
+    file: UploadFile = File(...), forceUpload: bool = Form(False), diagnostics: bool = Form(False),
+    mode: ImportModeEnum = Form(ImportModeEnum.insert), matchBy: ImportMatchKeyEnum = Form(ImportMatchKeyEnum.number),
+    db: Session = Depends(get_db),
+):
+    return await stream_employees_csv_and_upload(file.file, forceUpload, db, diagnostics, mode, matchBy)
+
+
+# Queue a CSV import and return its job id right away
+@router.post("/uploadCSV/jobs", response_model=ImportJobOut, status_code=202)
+def upload_csv_job(entry: uploadCSV):
+    if not entry.lines:
+        raise HTTPException(status_code=400, detail="CSV file is empty")
+    check_mandatory_fields(entry.lines[0])
+    return submit_lines_import(entry.lines, entry.forceUpload, entry.diagnostics, entry.mode, entry.matchBy).to_dict()
+
+@router.post("/uploadCSVFile/jobs", response_model=ImportJobOut, status_code=202)
+def upload_csv_file_job(
+    file: UploadFile = File(...), forceUpload: bool = Form(False), diagnostics: bool = Form(False),
+    mode: ImportModeEnum = Form(ImportModeEnum.insert), matchBy: ImportMatchKeyEnum = Form(ImportMatchKeyEnum.number),
+):
+    return submit_file_import(file.file, forceUpload, diagnostics, mode, matchBy).to_dict()
+
+# Phase, progress and final report of a queued import
+@router.get("/uploadCSV/jobs/{job_id}", response_model=ImportJobOut)
+def read_import_job(job_id: str):
+    job = get_import_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.to_dict()
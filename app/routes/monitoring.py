@@ -0,0 +1,70 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db, pool_stats
+from app.core.metrics import registry
+from app.models.error import ErrorDailyStats
+from app.routes import auth
+
+router = APIRouter()
+# Served at the root, where Prometheus scrapes by default
+metrics_router = APIRouter()
+
+ERROR_STATS_MAX_LIMIT = 1000
+
+
+# Connection pool usage per engine (checked out connections, wait time, churn)
+@router.get("/db/pool")
+def read_pool_stats():
+    return [stats.snapshot() for stats in pool_stats.values()]
+
+
+# Prometheus text exposition of the request, DB and pool metrics of this process
+@metrics_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+# Error counts per fingerprint and day, read from the error_daily_stats rollup (admin only)
+@router.get("/errors/stats")
+async def read_error_stats(
+    date_from: Optional[date] = Query(None, alias="from", description="First day, 30 days ago by default"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last day, today (UTC) by default"),
+    fingerprint: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=ERROR_STATS_MAX_LIMIT),
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(auth.oauth2_scheme),
+):
+    current_user = await auth.get_current_user(token, db)
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Access denied. Admin only.")
+
+    # The error sink keys days on UTC
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or date_to - timedelta(days=30)
+    conditions = [ErrorDailyStats.day.between(date_from, date_to)]
+    if fingerprint:
+        conditions.append(ErrorDailyStats.fingerprint == fingerprint)
+    stmt = (
+        select(ErrorDailyStats)
+        .where(*conditions)
+        .order_by(ErrorDailyStats.day.desc(), ErrorDailyStats.occurrences.desc())
+        .limit(limit)
+    )
+    rows = (await db.scalars(stmt)).all()
+    # Whole period, not only the rows returned under `limit`
+    total = await db.scalar(select(func.coalesce(func.sum(ErrorDailyStats.occurrences), 0)).where(*conditions))
+    return {
+        "from": date_from,
+        "to": date_to,
+        "total": total,
+        "items": [
+            {"day": row.day, "fingerprint": row.fingerprint, "error_message": row.error_message, "occurrences": row.occurrences}
+            for row in rows
+        ],
+    }
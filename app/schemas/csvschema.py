@@ -1,6 +1,7 @@
 
 from pydantic import BaseModel
-from typing import List, Optional, Union, Dict
+from datetime import datetime
+from typing import Any, List, Optional, Union, Dict
 
 # Enums and Models
 from app.enums.ConditionProperty import ConditionProperty
@@ -9,6 +10,7 @@ from app.enums.FieldType import FieldType
 from app.enums.RoleEnum import RoleEnum
 from app.enums.ContractTypeEnum import ContractTypeEnum
 from app.enums.GenderEnum import GenderEnum
+from app.enums.ImportModeEnum import ImportModeEnum, ImportMatchKeyEnum
 
 
 
@@ -52,12 +54,33 @@ class Matchyworngcell(OurBaseModel):
 class uploadCSV(OurBaseModel):
     lines: List[Dict[str, Matchycell]]
     forceUpload: Optional[bool] = False
+    # Adds per-phase timings to the response
+    diagnostics: Optional[bool] = False
+    # upsert: sync an existing roster, matching employees by matchBy
+    mode: Optional[ImportModeEnum] = ImportModeEnum.insert
+    matchBy: Optional[ImportMatchKeyEnum] = ImportMatchKeyEnum.number
+
+class uploadCSVCommit(OurBaseModel):
+    # importToken of a response rejected for its warnings only
+    importToken: str
+    diagnostics: Optional[bool] = False
 
 class uploadCSVResponse(BaseOut):
     wrongCells: List[Matchyworngcell] 
     errors: str
     warnings: str
 
+class ImportJobOut(OurBaseModel):
+    job_id: str
+    phase: str
+    rows_processed: int
+    errors: int
+    warnings: int
+    status_code: Optional[int] = None
+    report: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
 
 # ------------------- OPTIONS DEFINITION -------------------
 options = [
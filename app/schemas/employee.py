@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, EmailStr
 from datetime import date
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 
 from app.enums import ContractTypeEnum, GenderEnum, StatusAccountEnum, RoleEnum
 
@@ -55,6 +55,13 @@ class EmployeeOut(EmployeeBase):
     role: List[RoleEnum] = Field(default_factory=list)
 
 
+# === One page of the employee directory ===
+class EmployeePage(BaseModel):
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+    limit: int
+
+
 # === Admin Update Employee Request ===
 class AdminEmployeeUpdateRequest(BaseModel):
     contract_type: Optional[str] = None
@@ -4,9 +4,11 @@ import asyncio
 from pathlib import Path
 from typing import List
 from dotenv import load_dotenv
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
+from fastapi_mail import ConnectionConfig
 from pydantic import EmailStr
 
+from app.service.mail_transport import MailTransport
+
 # Chargement des variables d'environnement depuis le fichier .env
 load_dotenv()
 
@@ -24,17 +26,13 @@ conf = ConnectionConfig(
     TEMPLATE_FOLDER=Path(__file__).parent.parent / 'template'
 )
 
+# Connexions SMTP authentifiées réutilisées d'un message à l'autre
+transport = MailTransport(conf)
+
 # Fonction asynchrone pour envoyer un email en utilisant un template Jinja2
 async def send_email_with_template(emails: List[EmailStr], body: dict, subject: str, template_name: str):
     try:
-        message = MessageSchema(
-            subject=subject,
-            recipients=emails,
-            subtype=MessageType.html,
-            template_body=body
-        )
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name=template_name)
+        await transport.send_template(emails, body, subject=subject, template_name=template_name)
         return {"message": "Email envoyé avec succès"}
     except Exception as e:
         print(f"❌ Failed to send email to {emails}: {e}")
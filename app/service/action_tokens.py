@@ -0,0 +1,84 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+from datetime import timedelta
+
+from app.core.config import settings
+
+ACTIVATION = "activation"
+RESET = "reset"
+EMAIL_CHANGE = "email_change"
+
+token_ttl = {
+    ACTIVATION: lambda: timedelta(days=settings.ACTIVATION_TOKEN_TTL_DAYS),
+    RESET: lambda: timedelta(minutes=settings.RESET_TOKEN_TTL_MINUTES),
+    EMAIL_CHANGE: lambda: timedelta(hours=settings.EMAIL_CHANGE_TOKEN_TTL_HOURS),
+}
+
+# Own key, so an emailed link can never pass for an access token and vice versa
+_key = hmac.new(settings.SECRET_KEY.encode(), b"action-tokens", hashlib.sha256).digest()
+
+# "$2b$12$" and the 22 character salt: unique per hash, reveals nothing of the password
+FINGERPRINT_LENGTH = 29
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(_key, payload.encode(), hashlib.sha256).digest())
+
+
+def password_fingerprint(password_hash) -> str:
+    """Changes whenever the password is (re)set, which voids every link issued before."""
+    return (password_hash or "")[:FINGERPRINT_LENGTH]
+
+
+def fingerprint_matches(column, fingerprint: str):
+    """SQL condition: `column` still holds the password hash the token was issued for."""
+    if not fingerprint:
+        return column.is_(None)
+    return column.startswith(fingerprint, autoescape=True)
+
+
+def is_signed_token(token: str) -> bool:
+    # Database tokens are UUIDs, which never contain a dot
+    return "." in token
+
+
+def issue_token(employee_id: int, purpose: str, password_hash=None, **claims) -> str:
+    """Signed, expiring token for an emailed link; nothing is written to the database."""
+    payload = {
+        "sub": employee_id,
+        "purpose": purpose,
+        "exp": int(time.time() + token_ttl[purpose]().total_seconds()),
+        "fp": password_fingerprint(password_hash),
+        **claims,
+    }
+    encoded = _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+    return f"{encoded}.{_sign(encoded)}"
+
+
+def read_token(token: str, purpose: str):
+    """Claims of an authentic token issued for `purpose`, else None; expiry is left to token_expired."""
+    encoded, _, signature = token.partition(".")
+    if not hmac.compare_digest(signature.encode(), _sign(encoded).encode()):
+        return None
+    try:
+        payload = json.loads(_b64decode(encoded))
+    except ValueError:
+        return None
+    if not isinstance(payload, dict) or payload.get("purpose") != purpose:
+        return None
+    return payload
+
+
+def token_expired(claims: dict) -> bool:
+    return claims.get("exp", 0) <= time.time()
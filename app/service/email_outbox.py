@@ -0,0 +1,178 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.enums import OutboxStatusEnum
+from app.models.EmailOutbox import EmailOutbox
+from app.service.Sending_email import send_email_with_template
+from app.service.periodic_task import PeriodicTask
+
+
+# ------------------- ENQUEUE -------------------
+def outbox_row(recipient: str, subject: str, template_name: str, body: dict, now: datetime = None):
+    now = now or datetime.utcnow()
+    return {
+        "recipient": recipient,
+        "subject": subject,
+        "template_name": template_name,
+        "body": body,
+        "status": OutboxStatusEnum.Pending,
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+    }
+
+
+def enqueue_email(db: Session, recipient: str, subject: str, template_name: str, body: dict):
+    """Add a message to the outbox in the caller's transaction; it is sent once committed."""
+    message = EmailOutbox(**outbox_row(recipient, subject, template_name, body))
+    db.add(message)
+    return message
+
+
+def enqueue_emails(db: Session, rows: list):
+    """Bulk variant of enqueue_email for rows built with outbox_row."""
+    if rows:
+        db.execute(insert(EmailOutbox.__table__), rows)
+
+
+# ------------------- DELIVERY WORKER -------------------
+class OutboxWorker(PeriodicTask):
+    """Drains the email outbox with bounded concurrency, retries and exponential backoff.
+
+    Due messages are claimed in batches: their next_attempt_at is pushed one
+    lease ahead so other workers (other uvicorn processes) skip them while they
+    are being sent. On PostgreSQL the claim also uses FOR UPDATE SKIP LOCKED.
+    Enqueuers call `wake()` after their commit instead of waiting for the poll.
+    """
+
+    name = "Email outbox drain"
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        concurrency: int = settings.OUTBOX_CONCURRENCY,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        poll_interval: float = settings.OUTBOX_POLL_INTERVAL,
+        max_attempts: int = settings.OUTBOX_MAX_ATTEMPTS,
+        retry_backoff: float = settings.OUTBOX_RETRY_BACKOFF,
+        lease: float = 300,
+    ):
+        super().__init__(poll_interval)
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease = lease
+        self.sent = 0
+        self.failed = 0
+
+    async def tick(self):
+        return await self.drain_once()
+
+    async def drain(self):
+        """Send every due message; used by scripts and benchmarks."""
+        total = 0
+        while True:
+            delivered = await self.drain_once()
+            if not delivered:
+                return total
+            total += delivered
+
+    async def drain_once(self):
+        messages = await asyncio.to_thread(self._claim)
+        if not messages:
+            return 0
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def deliver(message):
+            async with semaphore:
+                result = await send_email_with_template(
+                    [message["recipient"]],
+                    message["body"],
+                    subject=message["subject"],
+                    template_name=message["template_name"]
+                )
+                return message, result.get("error")
+
+        results = await asyncio.gather(*(deliver(message) for message in messages))
+        await asyncio.to_thread(self._record, results)
+        return len(messages)
+
+    # --- database side, run off the event loop ---
+    def _claim(self):
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            stmt = (
+                select(EmailOutbox)
+                .where(EmailOutbox.status == OutboxStatusEnum.Pending, EmailOutbox.next_attempt_at <= now)
+                .order_by(EmailOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            messages = [
+                {
+                    "id": m.id,
+                    "recipient": m.recipient,
+                    "subject": m.subject,
+                    "template_name": m.template_name,
+                    "body": m.body,
+                    "attempts": m.attempts,
+                }
+                for m in db.execute(stmt).scalars()
+            ]
+            if messages:
+                db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id.in_([m["id"] for m in messages]))
+                    .values(next_attempt_at=now + timedelta(seconds=self.lease))
+                )
+            db.commit()
+            return messages
+        finally:
+            db.close()
+
+    def _record(self, results):
+        now = datetime.utcnow()
+        sent_ids = [message["id"] for message, error in results if error is None]
+        db = self.session_factory()
+        try:
+            if sent_ids:
+                db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id.in_(sent_ids))
+                    .values(status=OutboxStatusEnum.Sent, attempts=EmailOutbox.attempts + 1, sent_at=now)
+                )
+            for message, error in results:
+                if error is None:
+                    continue
+                attempts = message["attempts"] + 1
+                delay = self.retry_backoff * 2 ** (attempts - 1)
+                db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id == message["id"])
+                    .values(
+                        attempts=attempts,
+                        last_error=str(error)[:255],
+                        next_attempt_at=now + timedelta(seconds=delay),
+                        status=OutboxStatusEnum.Failed if attempts >= self.max_attempts else OutboxStatusEnum.Pending,
+                    )
+                )
+            db.commit()
+        finally:
+            db.close()
+        self.sent += len(sent_ids)
+        self.failed += len(results) - len(sent_ids)
+
+
+outbox_worker = OutboxWorker()
+
+
+def wake_outbox():
+    outbox_worker.wake()
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, text
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.error import Error, ErrorDailyStats
+from app.service.periodic_task import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+# Monthly partitions of the error table on PostgreSQL: error_2026_10 holds October 2026
+partition_name = re.compile(r"^error_(\d{4})_(\d{2})$")
+PARTITIONS_AHEAD = 2
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return day.replace(year=day.year + month // 12, month=month % 12 + 1, day=1)
+
+
+def is_partitioned(db) -> bool:
+    """True on PostgreSQL once the partitioning migration has run."""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'error'"
+    )).first() is not None
+
+
+def ensure_partitions(db, today: date, ahead: int = PARTITIONS_AHEAD):
+    """Create the partitions of this month and the next `ahead` months."""
+    for offset in range(ahead + 1):
+        start = add_months(today, offset)
+        end = add_months(start, 1)
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS error_{start:%Y_%m} PARTITION OF error "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+
+
+def monthly_partitions(db):
+    """(name, first day) of each monthly partition of the error table."""
+    names = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'error'"
+    )).scalars()
+    partitions = []
+    for name in names:
+        match = partition_name.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def drop_old_errors(db, cutoff: date):
+    """Remove error rows of the months that ended before `cutoff`; return what was dropped.
+
+    Partitioned tables lose whole partitions (no row-by-row DELETE). Elsewhere,
+    SQLite included, the same months go in one range DELETE on created_at.
+    """
+    keep_from = month_start(cutoff)
+    if not is_partitioned(db):
+        deleted = db.execute(delete(Error).where(Error.created_at < keep_from)).rowcount
+        return {"rows_deleted": deleted}
+
+    dropped = []
+    for name, first_day in monthly_partitions(db):
+        if add_months(first_day, 1) <= keep_from:
+            db.execute(text(f'DROP TABLE "{name}"'))
+            dropped.append(name)
+    # Rows that landed in the default partition are few: delete them by range
+    deleted = db.execute(text("DELETE FROM error_default WHERE created_at < :keep_from"), {"keep_from": keep_from}).rowcount
+    return {"partitions_dropped": dropped, "rows_deleted": deleted}
+
+
+def apply_error_retention(db, now: datetime = None):
+    """One retention pass: partitions ahead, old error rows and old daily stats."""
+    today = (now or datetime.utcnow()).date()
+    if is_partitioned(db):
+        ensure_partitions(db, today)
+    result = drop_old_errors(db, today - timedelta(days=settings.ERROR_RETENTION_DAYS))
+    result["stats_deleted"] = db.execute(
+        delete(ErrorDailyStats).where(ErrorDailyStats.day < today - timedelta(days=settings.ERROR_STATS_RETENTION_DAYS))
+    ).rowcount
+    db.commit()
+    return result
+
+
+class ErrorRetentionJob(PeriodicTask):
+    """Runs apply_error_retention at startup, then every `interval` seconds."""
+
+    name = "Error retention"
+
+    def __init__(self, session_factory=SessionLocal, interval: float = settings.ERROR_RETENTION_INTERVAL):
+        super().__init__(interval)
+        self.session_factory = session_factory
+
+    async def tick(self):
+        result = await asyncio.to_thread(self.run_once)
+        logger.info("Error retention: %s", result)
+
+    def run_once(self, now: datetime = None):
+        db = self.session_factory()
+        try:
+            return apply_error_retention(db, now)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+error_retention_job = ErrorRetentionJob()
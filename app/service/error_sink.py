@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import Counter, Gauge, register_stats_collector
+from app.models.error import Error, ErrorDailyStats
+from app.service.periodic_task import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+# Parts of a message that differ between two occurrences of the same error
+_variable_parts = [
+    (re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I), "<uuid>"),
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "<str>"),
+    (re.compile(r"\b0x[0-9a-f]+\b", re.I), "<hex>"),
+    (re.compile(r"\d+(\.\d+)?"), "<n>"),
+    (re.compile(r"\s+"), " "),
+]
+MESSAGE_LENGTH = 255
+
+
+def error_fingerprint(message: str) -> str:
+    """Same fingerprint for messages that only differ by ids, numbers or quoted values."""
+    for pattern, placeholder in _variable_parts:
+        message = pattern.sub(placeholder, message)
+    return hashlib.sha1(message.strip().encode()).hexdigest()
+
+
+def add_daily_stats(db, rows: list):
+    """Add the occurrences of error `rows` to error_daily_stats with one upsert."""
+    totals = {}
+    for row in rows:
+        key = (row["created_at"].date(), row["fingerprint"])
+        if key in totals:
+            totals[key]["occurrences"] += row["occurrences"]
+        else:
+            totals[key] = {
+                "day": key[0], "fingerprint": key[1],
+                "error_message": row["error_message"], "occurrences": row["occurrences"],
+            }
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(ErrorDailyStats.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day", "fingerprint"],
+        set_={"occurrences": ErrorDailyStats.__table__.c.occurrences + stmt.excluded.occurrences},
+    )
+    db.execute(stmt, list(totals.values()))
+
+
+class ErrorSink(PeriodicTask):
+    """Buffers error log rows in memory and writes them in batches.
+
+    Errors with the same fingerprint are merged into one row whose
+    `occurrences` counts them, so an error storm costs one INSERT per distinct
+    error and flush; the same transaction adds them to error_daily_stats.
+    Rows are written on their own connection, outside the
+    request's (usually rolled back) transaction: every `flush_interval`
+    seconds, or as soon as `batch_size` distinct errors are pending. Beyond
+    `max_pending` distinct errors new ones are dropped and counted.
+    `record` is safe to call from any thread.
+    """
+
+    name = "Error log flush"
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        flush_interval: float = settings.ERROR_SINK_FLUSH_INTERVAL,
+        batch_size: int = settings.ERROR_SINK_BATCH_SIZE,
+        max_pending: int = settings.ERROR_SINK_MAX_PENDING,
+    ):
+        super().__init__(flush_interval)
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    async def tick(self):
+        await asyncio.to_thread(self.flush)
+
+    async def stop(self):
+        await super().stop()
+        # Whatever is still buffered is written before shutdown
+        await asyncio.to_thread(self.flush)
+
+    # --- buffering ---
+    def record(self, message: str, now: datetime = None):
+        now = now or datetime.utcnow()
+        message = str(message)
+        fingerprint = error_fingerprint(message)
+        with self._lock:
+            self.recorded += 1
+            row = self._pending.get(fingerprint)
+            if row is not None:
+                row["occurrences"] += 1
+                row["last_seen_at"] = now
+                return
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending[fingerprint] = {
+                "error_message": message[:MESSAGE_LENGTH],
+                "fingerprint": fingerprint,
+                "occurrences": 1,
+                "created_at": now,
+                "last_seen_at": now,
+            }
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.wake()
+
+    def flush(self):
+        """Write the pending rows in one INSERT; return how many were written."""
+        with self._lock:
+            rows, self._pending = list(self._pending.values()), {}
+        if not rows:
+            return 0
+        db = self.session_factory()
+        try:
+            db.execute(insert(Error.__table__), rows)
+            add_daily_stats(db, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Failed to write %d error log rows", len(rows))
+            self._requeue(rows)
+            return 0
+        finally:
+            db.close()
+        self.written += len(rows)
+        return len(rows)
+
+    def _requeue(self, rows):
+        """Merge rows that could not be written back into the buffer, for the next flush."""
+        with self._lock:
+            for row in rows:
+                pending = self._pending.get(row["fingerprint"])
+                if pending is not None:
+                    pending["occurrences"] += row["occurrences"]
+                    pending["created_at"] = min(pending["created_at"], row["created_at"])
+                    pending["last_seen_at"] = max(pending["last_seen_at"], row["last_seen_at"])
+                elif len(self._pending) < self.max_pending:
+                    self._pending[row["fingerprint"]] = row
+                else:
+                    self.dropped += row["occurrences"]
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {"recorded": self.recorded, "written": self.written, "dropped": self.dropped, "pending": pending}
+
+
+error_sink = ErrorSink()
+
+register_stats_collector("error_log", error_sink.stats, {
+    "recorded": ("recorded_total", Counter, "Errors recorded, duplicates included"),
+    "written": ("rows_written_total", Counter, "Rows written to the error table"),
+    "dropped": ("dropped_total", Counter, "Errors dropped because the buffer was full"),
+    "pending": ("pending", Gauge, "Distinct errors waiting for the next flush"),
+})
+
+
+def record_error(message):
+    """Log an error to the `error` table without touching the caller's session."""
+    error_sink.record(message)
@@ -0,0 +1,165 @@
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.enums import ImportModeEnum, ImportMatchKeyEnum
+from app.repositories.uploadcsv import (
+    iter_line_chunks,
+    validate_and_insert_chunks,
+    validate_and_insert_csv_chunks,
+)
+from app.utils.helpers import get_error_message
+
+logger = logging.getLogger(__name__)
+
+# Imports run on a bounded pool so concurrent uploads cannot starve the API workers
+executor = ThreadPoolExecutor(max_workers=settings.IMPORT_JOB_WORKERS, thread_name_prefix="csv-import")
+# Queued + running jobs; further submissions are refused until one finishes
+job_slots = threading.BoundedSemaphore(settings.IMPORT_JOB_QUEUE_SIZE)
+
+jobs = OrderedDict()
+jobs_lock = threading.Lock()
+
+
+class ImportJob:
+    """State of one background CSV import, as reported by the status endpoint."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.phase = "queued"
+        self.rows_processed = 0
+        self.errors = 0
+        self.warnings = 0
+        self.status_code = None
+        self.report = None
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.phase in ("completed", "failed")
+
+    def set_phase(self, phase: str):
+        self.phase = phase
+
+    def update(self, validation):
+        self.rows_processed = validation.lines
+        self.errors = validation.error_count
+        self.warnings = len(validation.warnings)
+
+    def finish(self, status_code: int, report: dict):
+        self.status_code = status_code
+        self.report = report
+        self.finished_at = datetime.now(timezone.utc)
+        self.phase = "completed" if status_code == 200 else "failed"
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "phase": self.phase,
+            "rows_processed": self.rows_processed,
+            "errors": self.errors,
+            "warnings": self.warnings,
+            "status_code": self.status_code,
+            "report": self.report,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def get_import_job(job_id: str):
+    with jobs_lock:
+        return jobs.get(job_id)
+
+
+def _register(job: ImportJob):
+    with jobs_lock:
+        jobs[job.id] = job
+        # Forget the oldest finished jobs beyond the retention limit
+        finished = [job_id for job_id, known in jobs.items() if known.finished]
+        for job_id in finished[:max(0, len(finished) - settings.IMPORT_JOB_RETENTION)]:
+            del jobs[job_id]
+
+
+def _run(job: ImportJob, run_chunks, force_upload: bool, diagnostics: bool = False):
+    db = SessionLocal()
+    try:
+        validation, queued_emails = run_chunks(db, job)
+        job.update(validation)
+        if not validation.accepts(force_upload):
+            report = validation.report()
+        else:
+            report = {**validation.outcome(), "queued_emails": queued_emails}
+        if diagnostics:
+            report["diagnostics"] = validation.diagnostics(queued_emails)
+        job.finish(200 if validation.accepts(force_upload) else 400, report)
+    except HTTPException as e:
+        job.finish(e.status_code, {"detail": e.detail})
+    except Exception as e:
+        logger.exception("CSV import job %s failed", job.id)
+        job.finish(500, {"detail": get_error_message(str(e))})
+    finally:
+        db.close()
+        job_slots.release()
+
+
+def _submit(run_chunks, force_upload: bool, diagnostics: bool = False, cleanup=None):
+    if not job_slots.acquire(blocking=False):
+        if cleanup:
+            cleanup()
+        raise HTTPException(status_code=429, detail="Too many imports in progress, retry later")
+
+    job = ImportJob()
+    _register(job)
+
+    def task():
+        try:
+            _run(job, run_chunks, force_upload, diagnostics)
+        finally:
+            if cleanup:
+                cleanup()
+
+    executor.submit(task)
+    return job
+
+
+def submit_lines_import(
+    lines: list, force_upload: bool, diagnostics: bool = False,
+    mode: ImportModeEnum = ImportModeEnum.insert, match_by: ImportMatchKeyEnum = ImportMatchKeyEnum.number,
+):
+    """Queue the import of `uploadCSV.lines` and return its job."""
+    return _submit(
+        lambda db, job: validate_and_insert_chunks(iter_line_chunks(lines), force_upload, db, job, mode, match_by),
+        force_upload,
+        diagnostics,
+    )
+
+
+def submit_file_import(
+    file, force_upload: bool, diagnostics: bool = False,
+    mode: ImportModeEnum = ImportModeEnum.insert, match_by: ImportMatchKeyEnum = ImportMatchKeyEnum.number,
+):
+    """Queue the import of an uploaded CSV file and return its job.
+
+    The upload is copied to a temporary file first: the request's own file is
+    closed as soon as the response is sent.
+    """
+    spooled = tempfile.NamedTemporaryFile(prefix="csv-import-", suffix=".csv", delete=False)
+    with spooled:
+        shutil.copyfileobj(file, spooled)
+
+    def run_chunks(db, job):
+        with open(spooled.name, "rb") as csv_file:
+            return validate_and_insert_csv_chunks(csv_file, force_upload, db, job, mode, match_by)
+
+    return _submit(run_chunks, force_upload, diagnostics, cleanup=lambda: os.unlink(spooled.name))
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+
+
+def import_token(lines: list, mode, match_by) -> str:
+    """Content hash of an upload: the same rows and options always give the same token."""
+    content = json.dumps(
+        [
+            [[name, cell.value, cell.rowIndex, cell.columnIndex] for name, cell in line.items()]
+            for line in lines
+        ],
+        ensure_ascii=False,
+    )
+    digest = hashlib.sha256(f"{mode.value}:{match_by.value}:".encode())
+    digest.update(content.encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class ImportSession:
+    """Result of a validation rejected for its warnings only, ready to be written as is."""
+    validation: object
+    employees_to_add: list
+    roles_anchor: dict
+    # {field: Cell} of the unique fields of each row, to report conflicts found at commit time
+    cells: list = field(default_factory=list)
+    expires_at: float = field(default=0.0)
+
+    @property
+    def rows(self):
+        return len(self.employees_to_add)
+
+
+class ImportSessionStore:
+    """TTL + LRU store of validated uploads keyed by their import token.
+
+    Sessions live in this process only: a commit reaching another worker
+    finds nothing, and the client falls back to uploading with forceUpload.
+    The store holds at most `max_rows` rows; the least recently stored
+    sessions are evicted first, and larger uploads are not kept at all.
+    """
+
+    def __init__(self, ttl: float = settings.IMPORT_SESSION_TTL, max_rows: int = settings.IMPORT_SESSION_MAX_ROWS):
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._sessions = OrderedDict()  # token -> ImportSession
+        self._rows = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def put(self, token: str, session: ImportSession) -> bool:
+        """Keep `session` under `token`; False when it cannot be kept."""
+        if self.ttl <= 0 or session.rows > self.max_rows:
+            return False
+        now = time.time()
+        session.expires_at = now + self.ttl
+        with self._lock:
+            self._discard(token)
+            # Sessions are stored in expiry order: the expired ones are at the front
+            while self._sessions:
+                oldest, stored = next(iter(self._sessions.items()))
+                if stored.expires_at > now:
+                    break
+                self._discard(oldest)
+            self._sessions[token] = session
+            self._rows += session.rows
+            while self._rows > self.max_rows:
+                oldest = next(iter(self._sessions))
+                self._discard(oldest)
+                self.evicted += 1
+        return True
+
+    def pop(self, token: str):
+        """Take the session of `token` out of the store: a session is committed once."""
+        with self._lock:
+            session = self._discard(token)
+            if session is None or session.expires_at <= time.time():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return session
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._rows = 0
+
+    def _discard(self, token):
+        session = self._sessions.pop(token, None)
+        if session is not None:
+            self._rows -= session.rows
+        return session
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions), "rows": self._rows,
+                "hits": self.hits, "misses": self.misses, "evicted": self.evicted,
+            }
+
+
+import_sessions = ImportSessionStore()
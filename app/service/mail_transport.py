@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import time
+import weakref
+from collections import deque
+from email.message import EmailMessage
+from email.utils import formataddr, formatdate, make_msgid
+
+import aiosmtplib
+from fastapi_mail import ConnectionConfig
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, register_stats_collector
+
+logger = logging.getLogger(__name__)
+
+
+class MailMetrics:
+    """Counters of the SMTP transport, with a sliding window for messages/sec."""
+
+    def __init__(self, window: float = 60.0):
+        self.window = window
+        self.sent = 0
+        self.failed = 0
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.send_seconds = 0.0
+        self._recent = deque()
+
+    def record_sent(self, seconds: float):
+        now = time.monotonic()
+        self.sent += 1
+        self.send_seconds += seconds
+        self._recent.append(now)
+        while self._recent and self._recent[0] < now - self.window:
+            self._recent.popleft()
+
+    def messages_per_second(self):
+        now = time.monotonic()
+        while self._recent and self._recent[0] < now - self.window:
+            self._recent.popleft()
+        return len(self._recent) / self.window
+
+    def snapshot(self):
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "connections_opened": self.connections_opened,
+            "connections_closed": self.connections_closed,
+            "avg_send_seconds": self.send_seconds / self.sent if self.sent else 0.0,
+            "messages_per_second": self.messages_per_second(),
+        }
+
+
+metrics = MailMetrics()
+
+register_stats_collector("mail", metrics.snapshot, {
+    "sent": ("sent_total", Counter, "Messages accepted by the SMTP relay"),
+    "failed": ("failed_total", Counter, "Messages the SMTP relay did not accept"),
+    "connections_opened": ("connections_opened_total", Counter, "SMTP sessions opened"),
+    "connections_closed": ("connections_closed_total", Counter, "SMTP sessions closed"),
+    "avg_send_seconds": ("send_seconds_avg", Gauge, "Average time to send one message"),
+    "messages_per_second": ("messages_per_second", Gauge, "Messages sent per second over the last minute"),
+})
+
+
+class PooledConnection:
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """Small pool of authenticated SMTP sessions reused across messages.
+
+    At most `size` sessions are open at once, each sending one message at a
+    time. A session is closed after `max_messages_per_connection` messages or
+    when it sat idle longer than `idle_timeout` (relays drop idle clients).
+    Pools are bound to the event loop they were created in.
+    """
+
+    def __init__(
+        self,
+        config: ConnectionConfig,
+        size: int = settings.MAIL_POOL_SIZE,
+        max_messages_per_connection: int = settings.MAIL_MAX_MESSAGES_PER_CONNECTION,
+        idle_timeout: float = settings.MAIL_POOL_IDLE_TIMEOUT,
+    ):
+        self.config = config
+        self.max_messages_per_connection = max_messages_per_connection
+        self.idle_timeout = idle_timeout
+        self._slots = asyncio.Semaphore(size)
+        self._idle = []
+
+    async def _open(self):
+        smtp = aiosmtplib.SMTP(
+            hostname=self.config.MAIL_SERVER,
+            port=self.config.MAIL_PORT,
+            timeout=self.config.TIMEOUT,
+            use_tls=self.config.MAIL_SSL_TLS,
+            start_tls=self.config.MAIL_STARTTLS,
+            validate_certs=self.config.VALIDATE_CERTS,
+        )
+        await smtp.connect()
+        if self.config.USE_CREDENTIALS:
+            await smtp.login(self.config.MAIL_USERNAME, self.config.MAIL_PASSWORD.get_secret_value())
+        metrics.connections_opened += 1
+        return PooledConnection(smtp)
+
+    async def _close(self, connection: PooledConnection):
+        metrics.connections_closed += 1
+        try:
+            if connection.smtp.is_connected:
+                await connection.smtp.quit()
+        except aiosmtplib.SMTPException:
+            connection.smtp.close()
+
+    async def _acquire(self):
+        while self._idle:
+            connection = self._idle.pop()
+            if connection.smtp.is_connected and time.monotonic() - connection.last_used < self.idle_timeout:
+                return connection
+            await self._close(connection)
+        return await self._open()
+
+    def _release(self, connection: PooledConnection):
+        connection.last_used = time.monotonic()
+        self._idle.append(connection)
+
+    async def send(self, message):
+        async with self._slots:
+            connection = await self._acquire()
+            start = time.perf_counter()
+            try:
+                await connection.smtp.send_message(message)
+            except (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError):
+                # Stale session: retry once on a fresh one
+                await self._close(connection)
+                connection = await self._open()
+                try:
+                    await connection.smtp.send_message(message)
+                except Exception:
+                    await self._close(connection)
+                    raise
+            except Exception:
+                await self._close(connection)
+                raise
+            metrics.record_sent(time.perf_counter() - start)
+
+            connection.sent += 1
+            if connection.sent >= self.max_messages_per_connection:
+                await self._close(connection)
+            else:
+                self._release(connection)
+
+    async def close(self):
+        while self._idle:
+            await self._close(self._idle.pop())
+
+
+class MailTransport:
+    """Renders templated messages and sends them over a pooled SMTP connection."""
+
+    def __init__(self, config: ConnectionConfig):
+        self.config = config
+        self._templates = config.template_engine() if config.TEMPLATE_FOLDER else None
+        self._pools = weakref.WeakKeyDictionary()
+
+    def pool(self):
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            pool = self._pools[loop] = SMTPConnectionPool(self.config)
+        return pool
+
+    def build_message(self, recipients: list, body: dict, subject: str, template_name: str) -> EmailMessage:
+        """HTML message rendered from `template_name` with `body` as its context."""
+        sender = self.config.MAIL_FROM
+        if self.config.MAIL_FROM_NAME is not None:
+            sender = formataddr((self.config.MAIL_FROM_NAME, self.config.MAIL_FROM))
+        message = EmailMessage()
+        message["From"] = sender
+        message["To"] = ", ".join(recipients)
+        message["Subject"] = subject
+        message["Date"] = formatdate(localtime=True)
+        message["Message-ID"] = make_msgid()
+        message.set_content(self._templates.get_template(template_name).render(**body), subtype="html")
+        return message
+
+    async def send_template(self, recipients: list, body: dict, subject: str, template_name: str):
+        message = self.build_message(recipients, body, subject, template_name)
+        if self.config.SUPPRESS_SEND:
+            return
+        try:
+            await self.pool().send(message)
+        except Exception:
+            metrics.failed += 1
+            raise
+
+    async def close(self):
+        pool = self._pools.get(asyncio.get_running_loop())
+        if pool:
+            await pool.close()
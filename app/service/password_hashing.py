@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, register_stats_collector
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class PasswordHasher:
+    """Runs bcrypt hashing and verification on a bounded thread pool.
+
+    bcrypt releases the GIL, so the pool uses real cores while the event loop
+    and the request threads stay free. At most `max_queue` operations may be
+    queued or running; beyond that callers get a 503 instead of piling up.
+    """
+
+    def __init__(self, workers: int = settings.PASSWORD_HASH_WORKERS, max_queue: int = settings.PASSWORD_HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    def _timed(self, fn, queued_at, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.queue_depth -= 1
+                self.completed += 1
+                self.wait_seconds += started - queued_at
+                self.run_seconds += finished - started
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self.queue_depth >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Server busy, retry later")
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        return self._executor.submit(self._timed, fn, time.perf_counter(), *args)
+
+    # --- from async code ---
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(pwd_context.hash, password))
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self._submit(pwd_context.verify, password, hashed_password))
+
+    # --- from sync routes, already running in a worker thread ---
+    def hash_sync(self, password: str) -> str:
+        return self._submit(pwd_context.hash, password).result()
+
+    def verify_sync(self, password: str, hashed_password: str) -> bool:
+        return self._submit(pwd_context.verify, password, hashed_password).result()
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_seconds": self.wait_seconds / self.completed if self.completed else 0.0,
+                "avg_run_seconds": self.run_seconds / self.completed if self.completed else 0.0,
+            }
+
+
+password_hasher = PasswordHasher()
+
+register_stats_collector("password_hash", password_hasher.metrics, {
+    "workers": ("workers", Gauge, "Threads hashing and verifying passwords"),
+    "queue_depth": ("queue_depth", Gauge, "Password operations queued or running"),
+    "max_queue_depth": ("max_queue_depth", Gauge, "Highest queue depth seen"),
+    "completed": ("completed_total", Counter, "Password operations completed"),
+    "rejected": ("rejected_total", Counter, "Password operations refused with a 503 (queue full)"),
+    "avg_wait_seconds": ("wait_seconds_avg", Gauge, "Average time an operation waited for a thread"),
+    "avg_run_seconds": ("run_seconds_avg", Gauge, "Average time an operation ran"),
+})
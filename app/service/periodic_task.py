@@ -0,0 +1,60 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Background loop of the app process, started and stopped by the lifespan.
+
+    Each round awaits `tick()`, then sleeps `interval` seconds or until
+    `wake()` is called, whichever comes first. A truthy `tick()` result means
+    more work is waiting: the next round starts without sleeping. Exceptions
+    are logged and the loop goes on.
+    """
+
+    name = "Periodic task"
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task = None
+        self._loop = None
+        self._wakeup = None
+
+    async def tick(self):
+        raise NotImplementedError
+
+    # --- lifecycle ---
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def wake(self):
+        """Start the next round now instead of after `interval`; safe from any thread."""
+        if self._loop and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def run(self):
+        while True:
+            try:
+                busy = await self.tick()
+            except Exception:
+                logger.exception("%s failed", self.name)
+                busy = False
+            if busy:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.enums import ContractTypeEnum, GenderEnum, RoleEnum, StatusAccountEnum
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Read-only snapshot of the authenticated employee and its roles.
+
+    The password hash is deliberately left out: routes that need it reload
+    the employee from the database.
+    """
+    id: int
+    first_name: str
+    last_name: str
+    gender: GenderEnum
+    birth_date: Optional[date]
+    number: str
+    phone_number: Optional[str]
+    address: Optional[str]
+    email: str
+    contract_type: Optional[ContractTypeEnum]
+    status_account: StatusAccountEnum
+    cnss_number: Optional[str]
+    created_at: Optional[date]
+    disabled: Optional[bool]
+    roles: Tuple[RoleEnum, ...] = ()
+
+    @classmethod
+    def from_employee(cls, employee, roles):
+        return cls(
+            id=employee.id,
+            first_name=employee.first_name,
+            last_name=employee.last_name,
+            gender=employee.gender,
+            birth_date=employee.birth_date,
+            number=employee.number,
+            phone_number=employee.phone_number,
+            address=employee.address,
+            email=employee.email,
+            contract_type=employee.contract_type,
+            status_account=employee.status_account,
+            cnss_number=employee.cnss_number,
+            created_at=employee.created_at,
+            disabled=employee.disabled,
+            roles=tuple(roles),
+        )
+
+    @property
+    def is_admin(self):
+        return RoleEnum.admin in self.roles
+
+
+class PrincipalCache:
+    """TTL + LRU cache of principals keyed by the raw bearer token.
+
+    An entry never outlives its token (`exp`) nor `ttl` seconds, so a change
+    made by another process is picked up within `ttl` at worst. Changes made
+    here call `invalidate(employee_id)`, which drops every token of that
+    employee at once.
+    """
+
+    def __init__(self, ttl: float = settings.PRINCIPAL_CACHE_TTL, max_size: int = settings.PRINCIPAL_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # token -> (principal, expires_at)
+        self._tokens_by_employee = {}  # employee id -> set of tokens
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Principal]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, expires_at = entry
+            if expires_at <= now:
+                self._discard(token, principal.id)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return principal
+
+    def put(self, token: str, principal: Principal, token_expires_at: Optional[float] = None):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        with self._lock:
+            previous = self._entries.pop(token, None)
+            if previous is not None:
+                self._discard(token, previous[0].id)
+            self._entries[token] = (principal, expires_at)
+            self._tokens_by_employee.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                oldest, (evicted, _) = self._entries.popitem(last=False)
+                self._discard(oldest, evicted.id)
+
+    def invalidate(self, employee_id: int):
+        with self._lock:
+            for token in self._tokens_by_employee.pop(employee_id, ()):
+                self._entries.pop(token, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_employee.clear()
+
+    def _discard(self, token, employee_id):
+        self._entries.pop(token, None)
+        tokens = self._tokens_by_employee.get(employee_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_employee[employee_id]
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+principal_cache = PrincipalCache()
+
+
+def invalidate_principal(employee_id: int):
+    principal_cache.invalidate(employee_id)
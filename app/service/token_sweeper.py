@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, or_, select, update
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.enums.TokenStatusEnum import TokenStatusEnum
+from app.models.AcountActivation import Acount_Activation
+from app.models.ChangePasword import ChangePasword
+from app.models.EmailChangeToken import EmailChangeToken
+from app.service.periodic_task import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------- EXPIRY RULES -------------------
+def reset_token_expiry(now: datetime = None):
+    return (now or datetime.utcnow()) + timedelta(minutes=settings.RESET_TOKEN_TTL_MINUTES)
+
+
+def activation_cutoff(now: datetime = None):
+    """Activation tokens created before this day are expired."""
+    return (now or datetime.utcnow()).date() - timedelta(days=settings.ACTIVATION_TOKEN_TTL_DAYS)
+
+
+def email_change_cutoff(now: datetime = None):
+    """Email change tokens created before this moment are expired."""
+    return (now or datetime.utcnow()) - timedelta(hours=settings.EMAIL_CHANGE_TOKEN_TTL_HOURS)
+
+
+def reset_token_expired(token: ChangePasword, now: datetime = None):
+    if token.token_status_id == TokenStatusEnum.Expired:
+        return True
+    return token.expired_date is not None and token.expired_date <= (now or datetime.utcnow())
+
+
+def activation_token_expired(token: Acount_Activation, now: datetime = None):
+    return token.token_status_id == TokenStatusEnum.Expired or token.created_on < activation_cutoff(now)
+
+
+def email_change_token_expired(token: EmailChangeToken, now: datetime = None):
+    return token.created_at is not None and token.created_at < email_change_cutoff(now)
+
+
+# ------------------- SWEEPER -------------------
+class TokenSweeper(PeriodicTask):
+    """Periodically expires stale activation/reset tokens and deletes old token rows.
+
+    Rows are updated and deleted in batches of `batch_size`, each in its own
+    transaction, so a sweep over millions of rows never holds long locks.
+    Running one sweeper per uvicorn process is safe: every step is idempotent.
+    """
+
+    name = "Token sweep"
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        interval: float = settings.TOKEN_SWEEP_INTERVAL,
+        batch_size: int = settings.TOKEN_SWEEP_BATCH_SIZE,
+        retention_days: int = settings.TOKEN_RETENTION_DAYS,
+    ):
+        super().__init__(interval)
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.retention_days = retention_days
+        self.expired = 0
+        self.purged = 0
+
+    async def tick(self):
+        counts = await asyncio.to_thread(self.sweep)
+        if any(counts.values()):
+            logger.info("Token sweep: %s", counts)
+
+    # --- sweep ---
+    def sweep(self, now: datetime = None):
+        """Run every step once and return the number of rows each one touched."""
+        now = now or datetime.utcnow()
+        retention = timedelta(days=self.retention_days)
+        counts = {
+            "reset_expired": self._in_batches(ChangePasword, (
+                ChangePasword.token_status_id == TokenStatusEnum.Valid,
+                ChangePasword.expired_date <= now,
+            )),
+            "activation_expired": self._in_batches(Acount_Activation, (
+                Acount_Activation.token_status_id == TokenStatusEnum.Valid,
+                Acount_Activation.created_on < activation_cutoff(now),
+            )),
+            "reset_purged": self._in_batches(ChangePasword, (
+                ChangePasword.token_status_id == TokenStatusEnum.Expired,
+                or_(ChangePasword.expired_date.is_(None), ChangePasword.expired_date < now - retention),
+            ), purge=True),
+            "activation_purged": self._in_batches(Acount_Activation, (
+                Acount_Activation.token_status_id == TokenStatusEnum.Expired,
+                # Used tokens have no use date: keep them as long as ones that ran out
+                Acount_Activation.created_on < activation_cutoff(now) - retention,
+            ), purge=True),
+            "email_change_purged": self._in_batches(EmailChangeToken, (
+                EmailChangeToken.created_at < email_change_cutoff(now),
+            ), purge=True),
+        }
+        self.expired += counts["reset_expired"] + counts["activation_expired"]
+        self.purged += counts["reset_purged"] + counts["activation_purged"] + counts["email_change_purged"]
+        return counts
+
+    def _in_batches(self, model, conditions, purge: bool = False):
+        """Expire (or delete, when `purge`) the rows matching `conditions`, one batch per transaction."""
+        total = 0
+        while True:
+            db = self.session_factory()
+            try:
+                ids = db.scalars(select(model.id).where(*conditions).limit(self.batch_size)).all()
+                if not ids:
+                    return total
+                if purge:
+                    db.execute(delete(model).where(model.id.in_(ids)))
+                else:
+                    db.execute(
+                        update(model).where(model.id.in_(ids)).values(token_status_id=TokenStatusEnum.Expired)
+                    )
+                db.commit()
+            finally:
+                db.close()
+            total += len(ids)
+            if len(ids) < self.batch_size:
+                return total
+
+
+token_sweeper = TokenSweeper()
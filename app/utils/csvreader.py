@@ -0,0 +1,67 @@
+import csv
+import io
+from typing import BinaryIO, Dict, Iterator, List
+
+from app.schemas.csvschema import Matchycell, options
+
+# Header labels accepted for each CSV column: the field value or its display name
+header_aliases = {
+    label.strip().lower(): opt.value
+    for opt in options
+    for label in (opt.value, opt.display_value)
+}
+
+csv_delimiters = ",;\t"
+
+
+def map_header(header: List[str]) -> Dict[int, str]:
+    """Map column positions to field names, ignoring unknown columns."""
+    return {
+        index: header_aliases[label.strip().lower()]
+        for index, label in enumerate(header)
+        if label.strip().lower() in header_aliases
+    }
+
+
+def iter_csv_chunks(file: BinaryIO, chunk_size: int, encoding: str = "utf-8-sig") -> Iterator[List[Dict[str, Matchycell]]]:
+    """Parse an uploaded CSV file incrementally.
+
+    Yields lists of at most `chunk_size` rows shaped like `uploadCSV.lines`,
+    so only one chunk of parsed rows is ever held in memory. `rowIndex` is the
+    0-based index of the data row (header excluded), `columnIndex` the 0-based
+    position of the column in the file.
+    """
+    text = io.TextIOWrapper(file, encoding=encoding, newline="")
+    try:
+        first_line = text.readline()
+        if not first_line.strip():
+            return
+        try:
+            dialect = csv.Sniffer().sniff(first_line, delimiters=csv_delimiters)
+        except csv.Error:
+            dialect = csv.excel
+
+        columns = map_header(next(csv.reader([first_line], dialect)))
+        reader = csv.reader(text, dialect)
+
+        chunk = []
+        row_index = 0
+        for row in reader:
+            if not any(value.strip() for value in row):
+                continue
+            chunk.append({
+                field: Matchycell(
+                    value=row[col] if col < len(row) else "",
+                    rowIndex=row_index,
+                    columnIndex=col
+                )
+                for col, field in columns.items()
+            })
+            row_index += 1
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        text.detach()
@@ -6,7 +6,13 @@ from app import enums
 
 # --- Regex-based field matchers ------------------------------------------------
 
-def is_regex_matched(pattern: str, field: Any) -> Optional[str]:
+EMAIL_REGEX = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+# Tunisian phone numbers: +216 followed by 8 digits starting with 2,4,5,7,9
+PHONE_NUMBER_REGEX = re.compile(r"^\+216[24579]\d{7}$")
+CNSS_REGEX = re.compile(r"^[0-9]{8}-[0-9]{2}$")
+
+
+def is_regex_matched(pattern, field: Any) -> Optional[str]:
     """Return the field if it matches the regex, else None."""
     if isinstance(field, str) and re.match(pattern, field):
         return field
@@ -14,14 +20,11 @@ def is_regex_matched(pattern: str, field: Any) -> Optional[str]:
 
 
 def is_valid_email(field: Any) -> Optional[str]:
-    return is_regex_matched(
-        r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", field
-    )
+    return is_regex_matched(EMAIL_REGEX, field)
 
 
 def is_valid_phone_number(field: Any) -> Optional[str]:
-    # Tunisian phone numbers: +216 followed by 8 digits starting with 2,4,5,7,9
-    return is_regex_matched(r"^\+216[24579]\d{7}$", field)
+    return is_regex_matched(PHONE_NUMBER_REGEX, field)
 
 
 def check_cnss_contract_consistency(employee: dict, field: Any):
@@ -33,7 +36,7 @@ def check_cnss_contract_consistency(employee: dict, field: Any):
     if ct in {ContractTypeEnum.CDI.value, ContractTypeEnum.CDD.value}:
         if cnss == "":
             return None
-        if not re.match(r"^[0-9]{8}-[0-9]{2}$", cnss):
+        if not CNSS_REGEX.match(cnss):
             return None
         return cnss
 
@@ -44,7 +47,7 @@ def check_cnss_contract_consistency(employee: dict, field: Any):
     # Other contracts: allow empty or valid
     if cnss == "":
         return ""
-    return cnss if re.match(r"^[0-9]{8}-[0-9]{2}$", cnss) else None
+    return cnss if CNSS_REGEX.match(cnss) else None
 
 # --- Date / Integer checks ----------------------------------------------------
 
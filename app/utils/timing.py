@@ -0,0 +1,51 @@
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """Accumulates wall time, call count and row count per named phase.
+
+    Phases may be entered many times (once per chunk); their totals add up.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+
+    def _phase(self, name: str):
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = {"seconds": 0.0, "calls": 0, "rows": 0}
+        return phase
+
+    @contextmanager
+    def span(self, name: str, rows: int = 0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            phase = self._phase(name)
+            phase["seconds"] += time.perf_counter() - start
+            phase["calls"] += 1
+            phase["rows"] += rows
+
+    def timed_iter(self, name: str, iterable):
+        """Charges the time spent producing each item (e.g. parsing a chunk) to `name`."""
+        iterator = iter(iterable)
+        while True:
+            with self.span(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            self._phase(name)["rows"] += len(item) if hasattr(item, "__len__") else 1
+            yield item
+
+    def to_dict(self):
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 6),
+            "phases": [
+                {"name": name, "seconds": round(phase["seconds"], 6), "calls": phase["calls"], "rows": phase["rows"]}
+                for name, phase in self.phases.items()
+            ],
+        }
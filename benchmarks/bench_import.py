@@ -0,0 +1,187 @@
+"""Roster import throughput, compared against a saved baseline.
+
+    python -m benchmarks.bench_import --sizes 1000,10000,100000
+    python -m benchmarks.bench_import --update-baseline
+
+Runs valid_employees_data_and_upload directly and through POST /api/uploadCSV
+for every size and row mix, on a throwaway SQLite database and, when
+BENCH_POSTGRES_URL (or --database-url) points to one, on Postgres.
+Each case records wall time, rows/s and peak Python memory; the run exits
+with status 1 when a case is slower or heavier than its baseline by more
+than --threshold. Timings depend on the machine: regenerate the baseline
+with --update-baseline before comparing on a new one.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Settings and mail configuration are read at import time
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "import.db"))
+os.environ.setdefault("MAIL_USERNAME", "bench")
+os.environ.setdefault("MAIL_PASSWORD", "bench")
+os.environ.setdefault("MAIL_FROM", "bench@example.com")
+os.environ.setdefault("MAIL_SERVER", "127.0.0.1")
+os.environ["OUTBOX_WORKER_ENABLED"] = "False"
+os.environ["TOKEN_SWEEPER_ENABLED"] = "False"
+os.environ["ERROR_RETENTION_ENABLED"] = "False"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import make_lines
+from app.core.database import Base, get_db
+from app.main import app
+from app.repositories.uploadcsv import valid_employees_data_and_upload
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "import.json")
+
+# Mix name -> (invalid_rate, warning_rate, forceUpload, expected status)
+mixes = {
+    "clean": (0.0, 0.0, False, 200),
+    "warnings": (0.0, 0.5, True, 200),
+    "errors": (0.2, 0.0, False, 400),
+}
+
+
+def run_function(Session, lines, force_upload):
+    with Session() as db:
+        response = asyncio.run(valid_employees_data_and_upload(lines, force_upload, db))
+    return response.status_code
+
+
+def run_route(Session, lines, force_upload):
+    def override_get_db():
+        with Session() as db:
+            yield db
+
+    payload = {"lines": [{field: cell.model_dump() for field, cell in line.items()} for line in lines], "forceUpload": force_upload}
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with TestClient(app) as client:
+            return client.post("/api/uploadCSV", json=payload).status_code
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+entries = {"function": run_function, "route": run_route}
+
+
+def measure(engine, run, lines, force_upload, expected_status):
+    """Time one import on a fresh schema, then repeat it under tracemalloc for the memory peak."""
+    Session = sessionmaker(bind=engine)
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    gc.collect()
+    start = time.perf_counter()
+    status = run(Session, lines, force_upload)
+    seconds = time.perf_counter() - start
+    if status != expected_status:
+        raise RuntimeError(f"import returned {status}, expected {expected_status}")
+
+    # tracemalloc slows allocation down, so memory gets its own run
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(Session, lines, force_upload)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": round(seconds, 4),
+        "rows_per_sec": round(len(lines) / seconds, 1),
+        "peak_mb": round(peak / 2**20, 2),
+    }
+
+
+def targets(urls):
+    for url in urls:
+        engine = create_engine(url)
+        yield engine.dialect.name, engine
+
+
+# Growth below these amounts is run-to-run noise on the small cases
+noise_floor = {"seconds": 0.05, "peak_mb": 1.0}
+
+
+def compare(results, baseline, threshold):
+    """Cases whose time or memory grew by more than `threshold` over the baseline."""
+    regressions = []
+    for case, result in results.items():
+        reference = baseline.get(case)
+        if reference is None:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            limit = max(reference[metric] * (1 + threshold), reference[metric] + noise_floor[metric])
+            if result[metric] > limit:
+                regressions.append(f"{case}: {metric} {result[metric]} > {reference[metric]} (+{threshold:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma separated row counts")
+    parser.add_argument("--mixes", default=",".join(mixes), help="comma separated subset of: " + ", ".join(mixes))
+    parser.add_argument("--entries", default=",".join(entries), help="comma separated subset of: " + ", ".join(entries))
+    parser.add_argument(
+        "--database-url", action="append", dest="urls",
+        help="database to run against, repeatable (default: a temporary SQLite file, plus BENCH_POSTGRES_URL if set)",
+    )
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed growth over the baseline, 0.25 = 25%%")
+    parser.add_argument("--update-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    urls = args.urls or ["sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")]
+    if not args.urls and os.getenv("BENCH_POSTGRES_URL"):
+        urls.append(os.getenv("BENCH_POSTGRES_URL"))
+
+    results = {}
+    for target, engine in targets(urls):
+        for size in [int(size) for size in args.sizes.split(",")]:
+            for mix in args.mixes.split(","):
+                invalid_rate, warning_rate, force_upload, expected_status = mixes[mix]
+                lines = make_lines(size, args.seed, invalid_rate, warning_rate)
+                for entry in args.entries.split(","):
+                    case = f"{target}/{entry}/{mix}/{size}"
+                    results[case] = measure(engine, entries[entry], lines, force_upload, expected_status)
+                    result = results[case]
+                    print(f"{case:<36} {result['seconds']:>9.3f}s {result['rows_per_sec']:>12,.0f} rows/s {result['peak_mb']:>9.1f} MB", flush=True)
+        engine.dispose()
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(dict(sorted(baseline.items())), f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    for regression in regressions:
+        print("REGRESSION " + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Login latency under concurrency, with a cheap endpoint measured alongside.
+
+    python -m benchmarks.bench_login --logins 200 --concurrency 10
+
+Every login costs one bcrypt verification. While they run, `/api/users/me`
+is polled with a valid token; its latency shows whether the hashing starves
+the event loop. Uses a throwaway SQLite database.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "login.db"))
+os.environ.setdefault("OUTBOX_WORKER_ENABLED", "False")
+
+import httpx
+
+from app.core.database import Base, SessionLocal, async_engine, engine
+from app.enums import GenderEnum, StatusAccountEnum
+from app.main import app
+from app.models import Employee
+from app.routes.auth import create_access_token
+from app.service.password_hashing import password_hasher, pwd_context
+
+EMAIL = "bench@example.com"
+PASSWORD = "Bench-password-1"
+
+
+def seed():
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        if not db.query(Employee).filter(Employee.email == EMAIL).first():
+            db.add(Employee(
+                first_name="Bench", last_name="User", gender=GenderEnum.Male, number="BENCH-0001",
+                email=EMAIL, password=pwd_context.hash(PASSWORD), status_account=StatusAccountEnum.Active,
+            ))
+            db.commit()
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    return f"p50 {pick(0.50):7.1f}ms  p95 {pick(0.95):7.1f}ms  p99 {pick(0.99):7.1f}ms  (n={len(samples)})"
+
+
+async def run(logins: int, concurrency: int):
+    seed()
+    token = create_access_token({"sub": EMAIL})
+    login_times, probe_times = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def login():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/api/token", data={"username": EMAIL, "password": PASSWORD})
+                login_times.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/api/users/me", headers={"Authorization": f"Bearer {token}"})
+                probe_times.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+    await async_engine.dispose()
+
+    print(f"logins:  {logins} in {elapsed:.2f}s ({logins / elapsed:,.1f}/s, concurrency {concurrency})")
+    print(f"login:   {percentiles(login_times)}")
+    print(f"probe:   {percentiles(probe_times)}")
+    print(f"hasher:  {password_hasher.metrics()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10, help="keep below the DB pool size, each login holds a session")
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.concurrency))
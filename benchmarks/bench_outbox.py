@@ -0,0 +1,70 @@
+"""Email outbox delivery throughput against a local SMTP sink.
+
+    python -m benchmarks.bench_outbox --messages 2000 --concurrency 10
+
+Uses a throwaway SQLite database; no real mail leaves the machine.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+SINK_PORT = 2526
+
+# Mail settings are read when app.service.Sending_email is imported
+os.environ.update({
+    "MAIL_SERVER": "127.0.0.1",
+    "MAIL_PORT": str(SINK_PORT),
+    "MAIL_USERNAME": "bench",
+    "MAIL_PASSWORD": "bench",
+    "MAIL_FROM": "bench@example.com",
+    "MAIL_STARTTLS": "False",
+    "MAIL_SSL_TLS": "False",
+})
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "outbox.db"))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.smtp_sink import SMTPSink
+from app.core.database import Base
+from app.models.EmailOutbox import EmailOutbox
+from app.service.email_outbox import OutboxWorker, enqueue_emails, outbox_row
+from app.service.mail_transport import metrics
+from app.service.Sending_email import transport
+
+
+async def run(messages: int, concurrency: int, latency: float):
+    engine = create_engine("sqlite:///" + os.path.join(tempfile.mkdtemp(), "outbox.db"))
+    Base.metadata.create_all(engine, tables=[EmailOutbox.__table__])
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        enqueue_emails(db, [
+            outbox_row(f"employee{i}@example.com", "Set Your Password", "set_password.html", {"token": str(i)})
+            for i in range(messages)
+        ])
+        db.commit()
+
+    sink = await SMTPSink(port=SINK_PORT, latency=latency).start()
+    worker = OutboxWorker(session_factory=Session, concurrency=concurrency, batch_size=max(100, concurrency))
+    start = time.perf_counter()
+    await worker.drain()
+    elapsed = time.perf_counter() - start
+    await transport.close()
+    await sink.stop()
+
+    print(f"messages:    {messages} (sent {worker.sent}, failed {worker.failed}, received {sink.messages})")
+    print(f"connections: {sink.connections}")
+    print(f"elapsed:     {elapsed:.2f}s ({worker.sent / elapsed:,.0f} messages/s)")
+    print(f"transport:   {metrics.snapshot()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="delay of each SMTP reply, in seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.messages, args.concurrency, args.latency))
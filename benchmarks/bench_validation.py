@@ -0,0 +1,41 @@
+"""Row-by-row vs columnar validation of an uploaded roster.
+
+    python -m benchmarks.bench_validation --rows 100000
+"""
+import argparse
+import gc
+import time
+
+from benchmarks.common import make_lines
+from app.repositories.uploadcsv import validate_employee_data, validate_employees_batch
+
+
+def timed(run):
+    # Results are dropped before the next run so both start from the same heap
+    gc.collect()
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--invalid-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    lines = make_lines(args.rows, invalid_rate=args.invalid_rate)
+
+    row_time = timed(lambda: [validate_employee_data(line) for line in lines])
+    batch_time = timed(lambda: validate_employees_batch(lines))
+
+    row_results = [validate_employee_data(line) for line in lines]
+    assert row_results == validate_employees_batch(lines), "batch validation differs from validate_employee_data"
+    print(f"rows: {args.rows}")
+    print(f"row by row: {row_time:.3f}s ({args.rows / row_time:,.0f} rows/s)")
+    print(f"columnar:   {batch_time:.3f}s ({args.rows / batch_time:,.0f} rows/s)")
+    print(f"speedup:    x{row_time / batch_time:.2f}")
+
+
+if __name__ == "__main__":
+    main()
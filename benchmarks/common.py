@@ -0,0 +1,34 @@
+import random
+
+from app.schemas.csvschema import Matchycell
+from benchmarks.roster import employee_values, fields
+
+# Fields whose invalid values are reported as warnings rather than errors
+optional_fields = ["phone_number", "birth_date"]
+
+
+def make_line(index: int, rng: random.Random, invalid_rate: float = 0.0, warning_rate: float = 0.0):
+    """One `uploadCSV.lines` entry.
+
+    `invalid_rate` is the chance of each cell being wrong; `warning_rate` the
+    chance of each optional cell being wrong, which only raises a warning.
+    """
+    values = employee_values(index, rng)
+    if invalid_rate:
+        for field in fields:
+            if rng.random() < invalid_rate:
+                values[field] = "not valid"
+    if warning_rate:
+        for field in optional_fields:
+            if rng.random() < warning_rate:
+                # Distinct per row so phone numbers are not also reported as duplicates
+                values[field] = f"not valid {index}"
+    return {
+        field: Matchycell.model_construct(value=value, rowIndex=index, columnIndex=col)
+        for col, (field, value) in enumerate(values.items())
+    }
+
+
+def make_lines(count: int, seed: int = 42, invalid_rate: float = 0.0, warning_rate: float = 0.0):
+    rng = random.Random(seed)
+    return [make_line(i, rng, invalid_rate, warning_rate) for i in range(count)]
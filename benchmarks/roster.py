@@ -0,0 +1,202 @@
+"""Seeded synthetic employee rosters for load tests and benchmarks.
+
+    python -m benchmarks.roster --rows 1000000 --format csv -o roster.csv
+    python -m benchmarks.roster --rows 10000 --invalid-rate 0.01 --duplicate-rate 0.01 \\
+        --collision-rate 0.01 --database-url sqlite:///./app.db -o upload.json
+
+Rows follow the upload rules: +216 phone numbers, XXXXXXXX-XX CNSS numbers
+for CDI/CDD contracts only, RoleEnum job positions and unique employee
+numbers. Output is either the POST /api/uploadCSV body or a CSV file for
+/api/uploadCSVFile. Rows are written as they are generated, so memory use
+does not depend on --rows, and the same arguments always give the same output.
+"""
+import argparse
+import csv
+import json
+import random
+import sys
+from collections import deque
+
+from sqlalchemy import column, create_engine, select, table
+
+from app.enums.ContractTypeEnum import ContractTypeEnum
+from app.enums.GenderEnum import GenderEnum
+from app.enums.RoleEnum import RoleEnum
+
+fields = [
+    "first_name", "last_name", "email", "job_position", "contract_type",
+    "gender", "number", "phone_number", "birth_date", "cnss_number",
+]
+# CSV header: the display names the upload form shows
+headers = [
+    "First Name", "Last Name", "Email", "Job Position", "Contract Type",
+    "Gender", "Employee Number", "Phone Number", "Birth Date", "CNSS Number",
+]
+unique_fields = ["email", "number", "phone_number", "cnss_number"]
+
+first_names = [
+    "Mohamed", "Ahmed", "Ali", "Youssef", "Amine", "Karim", "Hamza", "Sami", "Walid", "Omar",
+    "Fatma", "Amira", "Mariem", "Salma", "Ines", "Nour", "Rania", "Sarra", "Yasmine", "Leila",
+]
+last_names = [
+    "Ben Ali", "Trabelsi", "Jaziri", "Gharbi", "Hammami", "Bouazizi", "Mejri", "Chaabane",
+    "Ayari", "Sassi", "Ben Salah", "Khelifi", "Dridi", "Zouari", "Masmoudi", "Jlassi",
+]
+contracts = [contract.value for contract in ContractTypeEnum]
+cnss_contracts = {ContractTypeEnum.CDI.value, ContractTypeEnum.CDD.value}
+roles = [role.value for role in RoleEnum]
+genders = [gender.value for gender in GenderEnum]
+
+
+def employee_values(index: int, rng: random.Random):
+    """Valid field values of employee `index`; unique fields are derived from the index."""
+    first_name = first_names[index % len(first_names)]
+    last_name = last_names[index // len(first_names) % len(last_names)]
+    contract = rng.choice(contracts)
+    return {
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": f"{first_name}.{last_name.replace(' ', '')}{index}@example.com".lower(),
+        "job_position": rng.choice(roles),
+        "contract_type": contract,
+        "gender": rng.choice(genders),
+        "number": str(index),
+        "phone_number": f"+216{rng.choice('24579')}{index % 10_000_000:07d}",
+        "birth_date": f"{rng.randint(1960, 2004)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "cnss_number": f"{index % 100_000_000:08d}-{rng.randint(0, 99):02d}" if contract in cnss_contracts else "",
+    }
+
+
+def invalid_value(field: str, values: dict, index: int):
+    """A value of `field` that fails its upload check."""
+    if field in ("first_name", "last_name"):
+        return ""
+    if field == "email":
+        return values["email"].replace("@", ".")
+    if field == "job_position":
+        return "Manager"
+    if field == "contract_type":
+        return "Freelance"
+    if field == "gender":
+        return "Unknown"
+    if field == "number":
+        return f"N{index}"
+    if field == "phone_number":
+        return f"+2161{index % 10_000_000:07d}"
+    if field == "birth_date":
+        year, month, day = values["birth_date"].split("-")
+        return f"{day}/{month}/{year}"
+    # cnss_number: missing the dash, or set on a contract that must not have one
+    return f"{index % 100_000_000:08d}00"
+
+
+def existing_unique_values(database_url: str, limit: int):
+    """Unique field values of up to `limit` employees already in the database."""
+    employee = table("employee", *(column(field) for field in unique_fields))
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(select(employee).order_by(employee.c.number).limit(limit)).all()
+    finally:
+        engine.dispose()
+    existing = [
+        {field: str(value) for field, value in zip(unique_fields, row) if value not in (None, "")}
+        for row in rows
+    ]
+    return [values for values in existing if values]
+
+
+def iter_roster(
+    rows: int,
+    seed: int = 42,
+    start: int = 1,
+    invalid_rate: float = 0.0,
+    duplicate_rate: float = 0.0,
+    collision_rate: float = 0.0,
+    existing: list = (),
+    window: int = 1024,
+):
+    """Yield `rows` dicts of field values, one employee at a time.
+
+    `invalid_rate` is the chance of each cell failing its check,
+    `duplicate_rate` the chance of a row reusing a unique value of one of the
+    `window` previous rows, and `collision_rate` the chance of a row reusing a
+    unique value of an `existing` employee.
+    """
+    rng = random.Random(seed)
+    recent = deque(maxlen=window)
+    for index in range(start, start + rows):
+        values = employee_values(index, rng)
+        recent.append({field: values[field] for field in unique_fields if values[field]})
+
+        if duplicate_rate and len(recent) > 1 and rng.random() < duplicate_rate:
+            source = recent[rng.randrange(len(recent) - 1)]
+            field = rng.choice(sorted(source))
+            values[field] = source[field]
+        if collision_rate and existing and rng.random() < collision_rate:
+            source = existing[rng.randrange(len(existing))]
+            field = rng.choice(sorted(source))
+            values[field] = source[field]
+
+        if invalid_rate:
+            for field in fields:
+                if rng.random() < invalid_rate:
+                    values[field] = invalid_value(field, values, index)
+        yield values
+
+
+def write_json(out, roster, force_upload: bool = False):
+    """Write the POST /api/uploadCSV body, one line per employee."""
+    out.write('{"forceUpload": %s, "lines": [' % json.dumps(force_upload))
+    for row_index, values in enumerate(roster):
+        line = {
+            field: {"value": values[field], "rowIndex": row_index, "columnIndex": col}
+            for col, field in enumerate(fields)
+        }
+        out.write(("\n" if row_index == 0 else ",\n") + json.dumps(line))
+    out.write("\n]}\n")
+
+
+def write_csv(out, roster):
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(headers)
+    for values in roster:
+        writer.writerow([values[field] for field in fields])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("-o", "--output", help="file to write (default: stdout)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--start", type=int, default=1, help="first employee number; move it past existing employees")
+    parser.add_argument("--invalid-rate", type=float, default=0.0, help="chance of each cell being invalid")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0, help="chance of a row repeating a unique value of an earlier row")
+    parser.add_argument("--collision-rate", type=float, default=0.0, help="chance of a row reusing a unique value of an existing employee")
+    parser.add_argument("--database-url", help="database the collisions are taken from")
+    parser.add_argument("--collision-pool", type=int, default=10_000, help="existing employees loaded for collisions")
+    parser.add_argument("--force-upload", action="store_true", help="set forceUpload in the JSON body")
+    args = parser.parse_args()
+
+    if args.collision_rate and not args.database_url:
+        parser.error("--collision-rate needs --database-url")
+    existing = existing_unique_values(args.database_url, args.collision_pool) if args.collision_rate else []
+
+    roster = iter_roster(
+        args.rows, args.seed, args.start,
+        args.invalid_rate, args.duplicate_rate, args.collision_rate, existing,
+    )
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            write_csv(out, roster)
+        else:
+            write_json(out, roster, args.force_upload)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
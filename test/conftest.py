@@ -1,6 +1,110 @@
 # back_end/test/conftest.py
 import sys
 import os
+from collections import Counter
+
+import pytest
 
 # أضف مجلد back_end للمسار
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Settings and mail configuration are read at import time
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("MAIL_USERNAME", "test")
+os.environ.setdefault("MAIL_PASSWORD", "test")
+os.environ.setdefault("MAIL_FROM", "noreply@example.com")
+os.environ.setdefault("MAIL_SERVER", "localhost")
+os.environ.setdefault("OUTBOX_WORKER_ENABLED", "False")
+os.environ.setdefault("TOKEN_SWEEPER_ENABLED", "False")
+os.environ.setdefault("ERROR_RETENTION_ENABLED", "False")
+
+
+@pytest.fixture(scope="module")
+def client():
+    """TestClient on a fresh schema; the lifespan runs so the async engine is disposed at the end."""
+    from fastapi.testclient import TestClient
+    from app.core.database import Base, engine
+    from app.main import app
+    from app.service.principal_cache import principal_cache
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    principal_cache.clear()
+    with TestClient(app) as test_client:
+        yield test_client
+    Base.metadata.drop_all(bind=engine)
+
+
+def make_roster_line(row, number, **values):
+    """One /api/uploadCSV line of a valid employee `number`; `values` override fields."""
+    values = {
+        "first_name": "Mohamed", "last_name": "Briki", "email": f"employee{number}@example.com",
+        "job_position": "Vendor", "contract_type": "CDI", "gender": "Male", "number": str(number),
+        "address": "Tunis", "cnss_number": f"{number:08d}-10", **values,
+    }
+    return {
+        field: {"value": value, "rowIndex": row, "columnIndex": col}
+        for col, (field, value) in enumerate(values.items())
+    }
+
+
+@pytest.fixture
+def roster_line():
+    """`roster_line(0, 301, address="Sfax")`"""
+    return make_roster_line
+
+
+# ------------------- QUERY BUDGETS -------------------
+class QueryBudget:
+    """Counts the SQL statements run on both engines inside a `with` block.
+
+    Fails the test when more than `limit` statements ran, or when the same
+    statement ran more than `max_repeats` times (the usual sign of an N+1).
+    executemany counts as a single statement.
+    """
+
+    def __init__(self, limit: int, max_repeats: int = 1, label: str = ""):
+        from app.core.database import async_engine, engine
+
+        self.limit = limit
+        self.max_repeats = max_repeats
+        self.label = label
+        self.engines = [engine, async_engine.sync_engine]
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(" ".join(statement.split()))
+
+    def __enter__(self):
+        from sqlalchemy import event
+
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        from sqlalchemy import event
+
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._record)
+        if exc_type is not None:
+            return False
+
+        listing = "\n".join(f"  {i}. {statement}" for i, statement in enumerate(self.statements, 1))
+        if len(self.statements) > self.limit:
+            pytest.fail(f"{self.label}: {len(self.statements)} queries, budget is {self.limit}\n{listing}")
+        repeated = {s: n for s, n in Counter(self.statements).items() if n > self.max_repeats}
+        if repeated:
+            details = "\n".join(f"  {n}x {statement}" for statement, n in repeated.items())
+            pytest.fail(f"{self.label}: repeated queries (possible N+1)\n{details}")
+        return False
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@pytest.fixture
+def query_budget():
+    """`with query_budget(3, label="GET /api/employees"): client.get(...)`"""
+    return QueryBudget
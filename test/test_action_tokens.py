@@ -0,0 +1,72 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.enums import GenderEnum, StatusAccountEnum
+from app.models import ChangePasword, EmailOutbox, Employee
+from app.service import action_tokens
+from app.service.action_tokens import ACTIVATION, RESET, issue_token, read_token, token_expired
+from app.service.password_hashing import pwd_context
+
+
+@pytest.fixture
+def signed_tokens(monkeypatch):
+    monkeypatch.setattr(settings, "SIGNED_ACTION_TOKENS", True)
+
+
+def add_employee(number, password=None):
+    with SessionLocal() as db:
+        employee = Employee(
+            first_name="Mohamed", last_name="Briki", gender=GenderEnum.Male, number=str(number),
+            email=f"employee{number}@example.com", password=password and pwd_context.hash(password),
+            status_account=StatusAccountEnum.Active if password else StatusAccountEnum.Inactive,
+        )
+        db.add(employee)
+        db.commit()
+        return employee.id
+
+
+def test_token_is_bound_to_its_purpose_and_signature():
+    token = issue_token(7, RESET, "$2b$12$abcdefghijklmnopqrstuvHASH")
+    claims = read_token(token, RESET)
+
+    assert claims["sub"] == 7 and claims["fp"] == "$2b$12$abcdefghijklmnopqrstuv"
+    assert read_token(token, ACTIVATION) is None
+    assert read_token(token[:-2] + "xx", RESET) is None
+    assert read_token("e30." + token.split(".")[1], RESET) is None
+
+
+def test_token_expires(monkeypatch):
+    token = issue_token(7, RESET)
+    assert not token_expired(read_token(token, RESET))
+
+    later = time.time() + settings.RESET_TOKEN_TTL_MINUTES * 60 + 1
+    monkeypatch.setattr(action_tokens, "time", SimpleNamespace(time=lambda: later))
+    assert token_expired(read_token(token, RESET))
+
+
+def test_signed_reset_writes_no_row_and_works_once(client, signed_tokens):
+    employee_id = add_employee(101, "123456")
+
+    assert client.post("/api/employees/reset_password", json={"email": "employee101@example.com"}).status_code == 201
+    with SessionLocal() as db:
+        assert db.query(ChangePasword).filter_by(Employee_id=employee_id).count() == 0
+        token = db.query(EmailOutbox).filter_by(recipient="employee101@example.com").one().body["token"]
+
+    body = {"token": token, "password": "654321", "confirm_password": "654321"}
+    assert client.patch("/api/employees/confirm_reset_password", json=body).status_code == 200
+    assert client.patch("/api/employees/confirm_reset_password", json=body).json()["detail"] == "Confirmation code expired"
+    assert client.post("/api/token", data={"username": "employee101@example.com", "password": "654321"}).status_code == 200
+
+
+def test_signed_activation_sets_password_once(client, signed_tokens):
+    employee_id = add_employee(102)
+    body = {"token": issue_token(employee_id, ACTIVATION), "password": "123456", "confirm_password": "123456"}
+
+    assert client.post("/api/employees/set_password", json=body).status_code == 200
+    assert client.post("/api/employees/set_password", json=body).status_code == 400
+    with SessionLocal() as db:
+        assert db.get(Employee, employee_id).status_account == StatusAccountEnum.Active
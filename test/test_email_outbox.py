@@ -0,0 +1,131 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, update
+
+from app.core.database import SessionLocal
+from app.enums import OutboxStatusEnum
+from app.models.EmailOutbox import EmailOutbox
+from app.service import email_outbox
+from app.service.email_outbox import OutboxWorker, enqueue_email
+
+
+class FakeTransport:
+    """Stands in for send_email_with_template; fails the recipients listed in `failing`."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.sent = []
+
+    async def __call__(self, emails, body, subject, template_name):
+        if emails[0] in self.failing:
+            return {"error": f"relay refused {emails[0]}"}
+        self.sent.append((emails[0], subject, template_name, body))
+        return {"message": "Email envoyé avec succès"}
+
+
+@pytest.fixture
+def transport(client, monkeypatch):
+    with SessionLocal() as db:
+        db.execute(delete(EmailOutbox))
+        db.commit()
+    fake = FakeTransport()
+    monkeypatch.setattr(email_outbox, "send_email_with_template", fake)
+    return fake
+
+
+def enqueue(*recipients):
+    with SessionLocal() as db:
+        for recipient in recipients:
+            enqueue_email(db, recipient, "Set Your Password", "set_password.html", {"token": recipient})
+        db.commit()
+
+
+def outbox_rows():
+    with SessionLocal() as db:
+        return {row.recipient: row for row in db.query(EmailOutbox)}
+
+
+def make_due():
+    with SessionLocal() as db:
+        db.execute(update(EmailOutbox).values(next_attempt_at=datetime.utcnow() - timedelta(seconds=1)))
+        db.commit()
+
+
+def test_claim_leases_messages_to_one_worker(transport):
+    enqueue("a@example.com", "b@example.com", "c@example.com")
+    worker = OutboxWorker(batch_size=2, lease=300)
+
+    first = worker._claim()
+    second = worker._claim()
+
+    assert [m["recipient"] for m in first] == ["a@example.com", "b@example.com"]
+    # Leased messages are skipped until the lease runs out
+    assert [m["recipient"] for m in second] == ["c@example.com"]
+    assert worker._claim() == []
+    rows = outbox_rows()
+    assert all(row.next_attempt_at > datetime.utcnow() + timedelta(seconds=290) for row in rows.values())
+    assert all(row.status == OutboxStatusEnum.Pending for row in rows.values())
+
+
+def test_delivered_messages_are_marked_sent(transport):
+    enqueue("a@example.com", "b@example.com")
+
+    assert asyncio.run(OutboxWorker().drain()) == 2
+
+    assert sorted(sent[0] for sent in transport.sent) == ["a@example.com", "b@example.com"]
+    assert transport.sent[0][1:3] == ("Set Your Password", "set_password.html")
+    for row in outbox_rows().values():
+        assert row.status == OutboxStatusEnum.Sent
+        assert row.attempts == 1
+        assert row.sent_at is not None
+
+
+def test_failed_messages_back_off_exponentially(transport):
+    transport.failing.add("b@example.com")
+    enqueue("a@example.com", "b@example.com")
+    worker = OutboxWorker(retry_backoff=30, max_attempts=5)
+
+    asyncio.run(worker.drain_once())
+    before = datetime.utcnow()
+    row = outbox_rows()["b@example.com"]
+    assert (row.status, row.attempts, row.last_error) == (OutboxStatusEnum.Pending, 1, "relay refused b@example.com")
+    assert before + timedelta(seconds=25) < row.next_attempt_at <= before + timedelta(seconds=30)
+    # Not due yet: nothing to send
+    assert asyncio.run(worker.drain_once()) == 0
+
+    make_due()
+    asyncio.run(worker.drain_once())
+    before = datetime.utcnow()
+    row = outbox_rows()["b@example.com"]
+    assert row.attempts == 2
+    assert before + timedelta(seconds=55) < row.next_attempt_at <= before + timedelta(seconds=60)
+    assert (worker.sent, worker.failed) == (1, 2)
+
+
+def test_messages_fail_for_good_after_max_attempts(transport):
+    transport.failing.add("a@example.com")
+    enqueue("a@example.com")
+    worker = OutboxWorker(max_attempts=2)
+
+    for _ in range(2):
+        make_due()
+        assert asyncio.run(worker.drain_once()) == 1
+
+    row = outbox_rows()["a@example.com"]
+    assert (row.status, row.attempts) == (OutboxStatusEnum.Failed, 2)
+    make_due()
+    assert asyncio.run(worker.drain_once()) == 0
+
+
+def test_enqueue_follows_the_caller_transaction(transport):
+    with SessionLocal() as db:
+        enqueue_email(db, "rolled-back@example.com", "Set Your Password", "set_password.html", {"token": "x"})
+        db.rollback()
+    assert asyncio.run(OutboxWorker().drain()) == 0
+    assert outbox_rows() == {}
+
+    enqueue("committed@example.com")
+    assert asyncio.run(OutboxWorker().drain()) == 1
+    assert [sent[0] for sent in transport.sent] == ["committed@example.com"]
@@ -0,0 +1,101 @@
+import base64
+from datetime import date
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.enums import ContractTypeEnum, GenderEnum, RoleEnum, StatusAccountEnum
+from app.models import Employee, Employee_role
+
+# number: (contract type, account status, disabled, created_at, roles)
+roster = {
+    "1": (ContractTypeEnum.CDI, StatusAccountEnum.Active, False, date(2026, 1, 10), [RoleEnum.admin, RoleEnum.Vendor]),
+    "2": (ContractTypeEnum.CDD, StatusAccountEnum.Inactive, True, date(2026, 3, 5), [RoleEnum.Vendor]),
+    "3": (ContractTypeEnum.SIVP, StatusAccountEnum.Inactive, None, date(2026, 5, 20), []),
+    "4": (ContractTypeEnum.CDI, StatusAccountEnum.Inactive, False, date(2026, 7, 1), [RoleEnum.Inventory_Manager]),
+    "5": (ContractTypeEnum.APPRNTI, StatusAccountEnum.Active, False, date(2026, 9, 15), [RoleEnum.Vendor]),
+}
+
+
+@pytest.fixture(scope="module")
+def employees(client):
+    with SessionLocal() as db:
+        for number, (contract_type, status_account, disabled, created_at, roles) in roster.items():
+            employee = Employee(
+                first_name="Mohamed", last_name="Briki", gender=GenderEnum.Male, number=number,
+                email=f"employee{number}@example.com", contract_type=contract_type,
+                status_account=status_account, disabled=disabled, created_at=created_at,
+            )
+            db.add(employee)
+            db.flush()
+            db.add_all(Employee_role(Employee_id=employee.id, role=role) for role in roles)
+        db.commit()
+    return client
+
+
+def numbers(page):
+    return [item["number"] for item in page["items"]]
+
+
+def test_cursor_walks_every_page_once(employees):
+    pages = [employees.get("/api/employees", params={"limit": 2}).json()]
+    while pages[-1]["next_cursor"]:
+        pages.append(employees.get("/api/employees", params={"limit": 2, "cursor": pages[-1]["next_cursor"]}).json())
+
+    assert [numbers(page) for page in pages] == [["1", "2"], ["3", "4"], ["5"]]
+    assert all(page["limit"] == 2 for page in pages)
+
+
+def test_last_full_page_has_no_cursor(employees):
+    page = employees.get("/api/employees", params={"limit": 5}).json()
+
+    assert numbers(page) == ["1", "2", "3", "4", "5"]
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.parametrize("params, expected", [
+    ({"contract_type": "CDI"}, ["1", "4"]),
+    ({"contract_type": ["CDD", "SIVP"]}, ["2", "3"]),
+    ({"status_account": "Active"}, ["1", "5"]),
+    ({"role": "Vendor"}, ["1", "2", "5"]),
+    ({"role": ["admin", "Inventory_Manager"]}, ["1", "4"]),
+    ({"disabled": "true"}, ["2"]),
+    ({"disabled": "false"}, ["1", "3", "4", "5"]),
+    ({"created_from": "2026-03-05"}, ["2", "3", "4", "5"]),
+    ({"created_to": "2026-05-20"}, ["1", "2", "3"]),
+    ({"created_from": "2026-02-01", "created_to": "2026-07-01", "contract_type": "CDI"}, ["4"]),
+])
+def test_filters(employees, params, expected):
+    response = employees.get("/api/employees", params=params)
+
+    assert response.status_code == 200
+    assert numbers(response.json()) == expected
+
+
+def test_filters_apply_across_pages(employees):
+    first = employees.get("/api/employees", params={"role": "Vendor", "limit": 2}).json()
+    second = employees.get("/api/employees", params={"role": "Vendor", "limit": 2, "cursor": first["next_cursor"]}).json()
+
+    assert (numbers(first), numbers(second), second["next_cursor"]) == (["1", "2"], ["5"], None)
+
+
+def test_fields_selects_the_returned_keys(employees):
+    items = employees.get("/api/employees", params={"fields": "number, role", "limit": 2}).json()["items"]
+
+    assert [sorted(item) for item in items] == [["number", "role"], ["number", "role"]]
+    assert [(item["number"], sorted(item["role"])) for item in items] == [("1", ["Vendor", "admin"]), ("2", ["Vendor"])]
+
+
+def test_unknown_fields_are_rejected(employees):
+    response = employees.get("/api/employees", params={"fields": "number,password"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: password"
+
+
+@pytest.mark.parametrize("cursor", ["abc", base64.urlsafe_b64encode(b"last").decode()])
+def test_invalid_cursor_is_400(employees, cursor):
+    response = employees.get("/api/employees", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
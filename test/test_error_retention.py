@@ -0,0 +1,81 @@
+from datetime import date, datetime
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app.core.database import SessionLocal
+from app.enums import GenderEnum, RoleEnum, StatusAccountEnum
+from app.models import Employee, Employee_role
+from app.models.error import Error, ErrorDailyStats
+from app.service.error_retention import apply_error_retention
+from app.service.error_sink import ErrorSink, error_fingerprint
+from app.service.password_hashing import pwd_context
+
+
+def admin_headers(client):
+    with SessionLocal() as db:
+        employee = Employee(
+            first_name="Mohamed", last_name="Briki", gender=GenderEnum.Male, number="201",
+            email="employee201@example.com", password=pwd_context.hash("123456"),
+            status_account=StatusAccountEnum.Active,
+        )
+        db.add(employee)
+        db.flush()
+        db.add(Employee_role(Employee_id=employee.id, role=RoleEnum.admin))
+        db.commit()
+    token = client.post("/api/token", data={"username": "employee201@example.com", "password": "123456"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_flushes_add_up_in_daily_stats(client):
+    sink = ErrorSink()
+    for employee_id in range(3):
+        sink.record(f"Employee {employee_id} not found", now=datetime(2026, 9, 1, 8))
+    sink.flush()
+    sink.record("Employee 4 not found", now=datetime(2026, 9, 1, 18))
+    sink.flush()
+    sink.record("Employee 9 not found", now=datetime(2026, 9, 2, 8))
+    sink.flush()
+
+    fingerprint = error_fingerprint("Employee 1 not found")
+    headers = admin_headers(client)
+    response = client.get(
+        "/api/errors/stats", params={"from": "2026-09-01", "to": "2026-09-02", "fingerprint": fingerprint},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == 5
+    assert [(item["day"], item["occurrences"]) for item in response.json()["items"]] == [("2026-09-02", 1), ("2026-09-01", 4)]
+
+    response = client.get(
+        "/api/errors/stats", params={"from": "2026-09-01", "to": "2026-09-02", "fingerprint": fingerprint, "limit": 1},
+        headers=headers,
+    )
+    assert response.json()["total"] == 5
+    assert len(response.json()["items"]) == 1
+
+
+def test_retention_drops_old_months_and_stats(client):
+    with SessionLocal() as db:
+        db.add_all([
+            Error(error_message="old", fingerprint="a" * 40, occurrences=1, created_at=datetime(2025, 1, 5)),
+            Error(error_message="kept", fingerprint="b" * 40, occurrences=1, created_at=datetime(2026, 10, 1)),
+            ErrorDailyStats(day=date(2025, 1, 5), fingerprint="a" * 40, error_message="old", occurrences=1),
+        ])
+        db.commit()
+
+        result = apply_error_retention(db, now=datetime(2026, 10, 17))
+
+        assert result["rows_deleted"] >= 1 and result["stats_deleted"] == 1
+        assert db.query(Error).filter_by(error_message="old").count() == 0
+        assert db.query(Error).filter_by(error_message="kept").count() == 1
+
+
+def test_error_stats_need_an_admin(client):
+    assert client.get("/api/errors/stats").status_code == 401
+
+
+def test_error_primary_key_matches_the_partitioned_table():
+    assert [column.name for column in Error.__table__.primary_key] == ["id", "created_at"]
+    ddl = str(CreateTable(Error.__table__).compile(dialect=postgresql.dialect()))
+    assert "PRIMARY KEY (id, created_at)" in ddl
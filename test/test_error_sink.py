@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from app.core.database import SessionLocal
+from app.models.error import Error
+from app.service.error_sink import ErrorSink, error_fingerprint
+
+
+def test_fingerprint_ignores_ids_and_values():
+    first = error_fingerprint("duplicate key value violates unique constraint: Key (email)=('a@example.com') already exists, id 12")
+    second = error_fingerprint("duplicate key value violates unique constraint: Key (email)=('b@example.com') already exists, id 7")
+    other = error_fingerprint("null value in column \"email\" violates not-null constraint")
+
+    assert first == second
+    assert first != other
+
+
+def test_storm_is_written_as_one_row_per_error(client):
+    sink = ErrorSink(batch_size=10, max_pending=2)
+    for employee_id in range(500):
+        sink.record(f"Employee {employee_id} not found", now=datetime(2026, 10, 17, 12, 0, employee_id % 60))
+    sink.record("Connection refused")
+    sink.record("Disk full")
+
+    assert sink.flush() == 2
+    assert sink.stats() == {"recorded": 502, "written": 2, "dropped": 1, "pending": 0}
+    with SessionLocal() as db:
+        row = db.query(Error).filter_by(fingerprint=error_fingerprint("Employee 1 not found")).one()
+    assert row.error_message == "Employee 0 not found"
+    assert row.occurrences == 500
+    assert (row.created_at, row.last_seen_at) == (datetime(2026, 10, 17, 12, 0, 0), datetime(2026, 10, 17, 12, 0, 19))
+
+
+def test_failed_flush_keeps_rows_for_the_next_one():
+    class BrokenSession:
+        def execute(self, *args):
+            raise RuntimeError("database is down")
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    sink = ErrorSink(session_factory=BrokenSession)
+    sink.record("Employee 1 not found")
+    assert sink.flush() == 0
+
+    sink.record("Employee 2 not found")
+    assert sink.stats()["pending"] == 1
+    assert sink._pending[error_fingerprint("Employee 3 not found")]["occurrences"] == 2
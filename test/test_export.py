@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.enums import GenderEnum, RoleEnum
+from app.models import Employee, Employee_role
+from app.repositories.export import export_fields, iter_employee_records, stream_employees_csv, stream_employees_ndjson
+from app.schemas.csvschema import options
+
+
+def read_csv(text):
+    return list(csv.reader(io.StringIO(text)))
+
+
+def test_empty_roster_exports_headers_only(client):
+    assert read_csv(client.get("/api/employees/export").text) == [[opt.display_value for opt in options]]
+    assert client.get("/api/employees/export?format=ndjson").text == ""
+
+
+@pytest.fixture(scope="module")
+def roster(client):
+    with SessionLocal() as db:
+        for number in range(1, 6):
+            employee = Employee(
+                first_name="Mohamed", last_name="Briki", gender=GenderEnum.Male, number=str(number),
+                email=f"export{number}@example.com",
+            )
+            db.add(employee)
+            db.flush()
+            roles = [RoleEnum.Vendor, RoleEnum.admin] if number == 1 else [RoleEnum.Vendor]
+            db.add_all([Employee_role(Employee_id=employee.id, role=role) for role in roles])
+        db.commit()
+
+
+def test_csv_header_and_rows(client, roster):
+    response = client.get("/api/employees/export")
+
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = read_csv(response.text)
+    assert rows[0] == [opt.display_value for opt in options]
+    first = dict(zip(export_fields, rows[1]))
+    assert (first["email"], first["job_position"], first["gender"]) == ("export1@example.com", "Vendor, admin", "Male")
+    assert len(rows) == 6
+
+
+def test_roles_are_joined_in_the_same_query(roster, query_budget):
+    with SessionLocal() as db, query_budget(1, label="export records"):
+        records = list(iter_employee_records(db))
+
+    assert [record["job_position"] for record in records] == [["Vendor", "admin"]] + [["Vendor"]] * 4
+
+
+def test_batches_split_the_stream(roster):
+    csv_chunks = list(stream_employees_csv(2))
+    ndjson_chunks = list(stream_employees_ndjson(2))
+
+    # Header + 2 rows, 2 rows, then the last row
+    assert [len(read_csv(chunk)) for chunk in csv_chunks] == [3, 2, 1]
+    assert [chunk.count("\n") for chunk in ndjson_chunks] == [2, 2, 1]
+
+
+def test_ndjson_lines_are_records(client, roster):
+    lines = client.get("/api/employees/export?format=ndjson").text.splitlines()
+
+    records = [json.loads(line) for line in lines]
+    assert len(records) == 5
+    assert all(list(record) == export_fields for record in records)
+    assert records[0]["job_position"] == ["Vendor", "admin"]
+    assert records[0]["contract_type"] is None
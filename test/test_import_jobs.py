@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Employee
+from app.service import import_jobs
+from app.service.import_jobs import ImportJob
+
+
+class GatedProgress:
+    """Forwards progress to the job, then holds the import until `release` is set."""
+
+    def __init__(self, job, reached, release):
+        self.job = job
+        self.reached = reached
+        self.release = release
+
+    def set_phase(self, phase):
+        self.job.set_phase(phase)
+
+    def update(self, validation):
+        self.job.update(validation)
+        self.reached.set()
+        assert self.release.wait(10)
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    """Imports submitted while the fixture is active wait for `gate.release` after their first chunk."""
+    reached, release = threading.Event(), threading.Event()
+    real = import_jobs.validate_and_insert_chunks
+
+    def gated(chunks, force_upload, db, progress, *args):
+        return real(chunks, force_upload, db, GatedProgress(progress, reached, release), *args)
+
+    monkeypatch.setattr(import_jobs, "validate_and_insert_chunks", gated)
+    yield reached, release
+    release.set()
+
+
+def wait_until_finished(client, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/uploadCSV/jobs/{job_id}").json()
+        if job["phase"] in ("completed", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"import job {job_id} did not finish")
+
+
+def test_job_reports_progress_then_its_result(client, roster_line, gate):
+    reached, release = gate
+    lines = [roster_line(row, number) for row, number in enumerate(range(501, 504))]
+
+    response = client.post("/api/uploadCSV/jobs", json={"lines": lines})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    assert reached.wait(10)
+    running = client.get(f"/api/uploadCSV/jobs/{job_id}").json()
+    assert running["phase"] in ("validating", "inserting")
+    assert running["rows_processed"] == 3
+    assert running["status_code"] is None
+
+    release.set()
+    job = wait_until_finished(client, job_id)
+    assert (job["phase"], job["status_code"], job["errors"]) == ("completed", 200, 0)
+    assert job["finished_at"] is not None
+    with SessionLocal() as db:
+        assert db.query(Employee).filter(Employee.number.in_(["501", "502", "503"])).count() == 3
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/api/uploadCSV/jobs/unknown").status_code == 404
+
+
+def test_submissions_beyond_the_queue_are_refused(client, roster_line, gate, monkeypatch):
+    reached, release = gate
+    monkeypatch.setattr(import_jobs, "job_slots", threading.BoundedSemaphore(1))
+
+    first = client.post("/api/uploadCSV/jobs", json={"lines": [roster_line(0, 511)]})
+    assert first.status_code == 202
+    assert reached.wait(10)
+
+    refused = client.post("/api/uploadCSV/jobs", json={"lines": [roster_line(0, 512)]})
+    assert refused.status_code == 429
+    assert refused.json()["detail"] == "Too many imports in progress, retry later"
+
+    release.set()
+    wait_until_finished(client, first.json()["job_id"])
+    # The slot is free again once the first import finished
+    second = client.post("/api/uploadCSV/jobs", json={"lines": [roster_line(0, 512)]})
+    assert second.status_code == 202
+    assert wait_until_finished(client, second.json()["job_id"])["status_code"] == 200
+
+
+def test_only_the_latest_finished_jobs_are_kept(monkeypatch):
+    monkeypatch.setattr(import_jobs, "jobs", OrderedDict())
+    monkeypatch.setattr(settings, "IMPORT_JOB_RETENTION", 2)
+    running = ImportJob()
+    import_jobs._register(running)
+    finished = []
+    for _ in range(3):
+        job = ImportJob()
+        import_jobs._register(job)
+        job.finish(200, {})
+        finished.append(job)
+
+    import_jobs._register(ImportJob())
+
+    assert import_jobs.get_import_job(finished[0].id) is None
+    assert import_jobs.get_import_job(finished[1].id) is finished[1]
+    assert import_jobs.get_import_job(finished[2].id) is finished[2]
+    # Jobs still running are never evicted
+    assert import_jobs.get_import_job(running.id) is running
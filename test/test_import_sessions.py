@@ -0,0 +1,68 @@
+from app.core.database import SessionLocal
+from app.enums import GenderEnum
+from app.models import Employee
+from app.repositories import uploadcsv
+from app.service.import_sessions import ImportSession, ImportSessionStore
+
+
+def invalid_phone_line(roster_line, row, number, **values):
+    return roster_line(row, number, phone_number=f"not a phone {number}", **values)
+
+
+def test_warnings_are_committed_from_the_token(client, roster_line):
+    lines = [invalid_phone_line(roster_line, row, number) for row, number in enumerate(range(401, 404))]
+    response = client.post("/api/uploadCSV", json={"lines": lines})
+    assert response.status_code == 400
+    token = response.json()["importToken"]
+
+    response = client.post("/api/uploadCSV/commit", json={"importToken": token})
+    assert response.status_code == 200
+    assert response.json() == {"message": "Employees added", "count": 3}
+    assert client.post("/api/uploadCSV/commit", json={"importToken": token}).status_code == 404
+
+
+def test_commit_reports_values_taken_since_validation(client, roster_line):
+    lines = [invalid_phone_line(roster_line, row, number) for row, number in enumerate(range(431, 433))]
+    token = client.post("/api/uploadCSV", json={"lines": lines}).json()["importToken"]
+    with SessionLocal() as db:
+        db.add(Employee(first_name="Sami", last_name="Ben Ali", gender=GenderEnum.Male, number="9431", email="employee432@example.com"))
+        db.commit()
+
+    response = client.post("/api/uploadCSV/commit", json={"importToken": token})
+
+    assert response.status_code == 400
+    assert response.json()["errors"] == "Line 2: Email 'employee432@example.com' already exists"
+    assert response.json()["wrongCells"][-1]["rowIndex"] == 1
+    with SessionLocal() as db:
+        assert db.query(Employee).filter_by(number="431").count() == 0
+
+
+def test_force_upload_of_the_same_payload_is_not_validated_again(client, monkeypatch, roster_line):
+    lines = [invalid_phone_line(roster_line, 0, 411)]
+    assert "importToken" in client.post("/api/uploadCSV", json={"lines": lines}).json()
+
+    def validate_again(employees):
+        raise AssertionError("validated twice")
+
+    monkeypatch.setattr(uploadcsv, "validate_employees_batch", validate_again)
+    assert client.post("/api/uploadCSV", json={"lines": lines, "forceUpload": True}).status_code == 200
+
+
+def test_errors_get_no_token(client, roster_line):
+    response = client.post("/api/uploadCSV", json={"lines": [invalid_phone_line(roster_line, 0, 421, email="wrong")]})
+    assert response.status_code == 400
+    assert "importToken" not in response.json()
+
+
+def test_store_is_bounded_by_rows_and_ttl(monkeypatch):
+    store = ImportSessionStore(ttl=60, max_rows=3)
+    first, second = ImportSession(None, [{}, {}], {}), ImportSession(None, [{}, {}], {})
+
+    assert store.put("first", first) and store.put("second", second)
+    assert not store.put("huge", ImportSession(None, [{}] * 4, {}))
+    assert store.pop("first") is None
+    assert store.stats()["evicted"] == 1
+
+    monkeypatch.setattr(second, "expires_at", 0)
+    assert store.pop("second") is None
+    assert store.stats()["rows"] == 0
@@ -0,0 +1,63 @@
+import asyncio
+
+import aiosmtplib
+import pytest
+
+from app.service.Sending_email import conf
+from app.service.mail_transport import MailTransport, PooledConnection, SMTPConnectionPool
+
+
+class FakeSMTP:
+    def __init__(self, error=None):
+        self.error = error
+        self.is_connected = True
+
+    async def send_message(self, message):
+        if self.error:
+            raise self.error
+
+    async def quit(self):
+        self.is_connected = False
+
+
+class FakePool(SMTPConnectionPool):
+    """Hands out the scripted sessions instead of connecting to a relay."""
+
+    def __init__(self, sessions):
+        super().__init__(conf)
+        self.sessions = list(sessions)
+        self.closed = []
+
+    async def _open(self):
+        return PooledConnection(self.sessions.pop(0))
+
+    async def _close(self, connection):
+        self.closed.append(connection.smtp)
+        await connection.smtp.quit()
+
+
+def test_failed_retry_closes_the_fresh_session():
+    stale = FakeSMTP(aiosmtplib.SMTPServerDisconnected("gone"))
+    fresh = FakeSMTP(aiosmtplib.SMTPDataError(554, "rejected"))
+    pool = FakePool([stale, fresh])
+
+    with pytest.raises(aiosmtplib.SMTPDataError):
+        asyncio.run(pool.send("message"))
+
+    assert pool.closed == [stale, fresh]
+    assert not fresh.is_connected
+
+
+def test_build_message_renders_the_template_as_html():
+    transport = MailTransport(conf)
+
+    message = transport.build_message(
+        ["a@example.com", "b@example.com"], {"token": "abc123"}, "Set your password", "set_password.html"
+    )
+
+    assert message["To"] == "a@example.com, b@example.com"
+    assert message["Subject"] == "Set your password"
+    assert message["From"] == conf.MAIL_FROM
+    assert message["Date"] and message["Message-ID"]
+    assert message.get_content_type() == "text/html"
+    assert "set-password?token=abc123" in message.get_content()
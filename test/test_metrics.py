@@ -0,0 +1,43 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Histogram, MetricsMiddleware, http_request_duration_seconds
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe("/a", value=value)
+
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+
+
+def test_middleware_labels_requests_with_the_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/items/x")
+
+    lines = http_request_duration_seconds.render()
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="200"} 2' in lines
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="422"} 1' in lines
+
+
+def test_service_metrics_are_scraped(client):
+    body = client.get("/metrics").text
+
+    assert "# TYPE mail_sent_total counter" in body
+    assert "mail_messages_per_second " in body
+    assert "# TYPE password_hash_queue_depth gauge" in body
+    assert "password_hash_rejected_total " in body
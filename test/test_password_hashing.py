@@ -0,0 +1,45 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.service.password_hashing import PasswordHasher
+
+
+def test_hash_and_verify_round_trip():
+    hasher = PasswordHasher(workers=2, max_queue=4)
+
+    hashed = hasher.hash_sync("s3cret-Pass")
+    assert hashed != "s3cret-Pass"
+    assert hasher.verify_sync("s3cret-Pass", hashed)
+    assert not hasher.verify_sync("wrong-Pass", hashed)
+
+    async def round_trip():
+        hashed = await hasher.hash("other-Pass")
+        return await hasher.verify("other-Pass", hashed), await hasher.verify("s3cret-Pass", hashed)
+
+    assert asyncio.run(round_trip()) == (True, False)
+    metrics = hasher.metrics()
+    assert metrics["completed"] == 6
+    assert metrics["queue_depth"] == 0
+    assert metrics["rejected"] == 0
+
+
+def test_full_queue_is_refused_with_503():
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    release = threading.Event()
+    # Holds the only slot until released
+    busy = hasher._submit(release.wait)
+    try:
+        with pytest.raises(HTTPException) as refused:
+            hasher.hash_sync("s3cret-Pass")
+        assert refused.value.status_code == 503
+        assert hasher.metrics()["rejected"] == 1
+    finally:
+        release.set()
+        busy.result()
+
+    # The slot is free again once the running operation finishes
+    assert hasher.verify_sync("s3cret-Pass", hasher.hash_sync("s3cret-Pass"))
+    assert hasher.metrics()["queue_depth"] == 0
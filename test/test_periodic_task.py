@@ -0,0 +1,51 @@
+import asyncio
+
+from app.service.periodic_task import PeriodicTask
+
+
+class ScriptedTask(PeriodicTask):
+    """Returns the scripted results of tick() in order, then nothing to do."""
+
+    def __init__(self, results, interval=60):
+        super().__init__(interval)
+        self.results = list(results)
+        self.ticks = 0
+
+    async def tick(self):
+        self.ticks += 1
+        result = self.results.pop(0) if self.results else False
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+async def settle():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+def test_busy_ticks_run_again_without_waiting():
+    async def scenario():
+        task = ScriptedTask([True, True, False])
+        task.start()
+        await settle()
+        await task.stop()
+        return task.ticks
+
+    assert asyncio.run(scenario()) == 3
+
+
+def test_wake_starts_the_next_round_and_errors_do_not_stop_the_loop():
+    async def scenario():
+        task = ScriptedTask([RuntimeError("boom")])
+        task.start()
+        await settle()
+        ticks = [task.ticks]
+        task.wake()
+        await settle()
+        ticks.append(task.ticks)
+        await task.stop()
+        await task.stop()
+        return ticks
+
+    assert asyncio.run(scenario()) == [1, 2]
@@ -0,0 +1,51 @@
+import time
+
+from app.enums import GenderEnum, RoleEnum, StatusAccountEnum
+from app.service.principal_cache import Principal, PrincipalCache
+
+
+def make_principal(id, roles=()):
+    return Principal(
+        id=id, first_name="Mohamed", last_name="Briki", gender=GenderEnum.Male, birth_date=None,
+        number=str(id), phone_number=None, address=None, email=f"employee{id}@example.com",
+        contract_type=None, status_account=StatusAccountEnum.Active, cnss_number=None,
+        created_at=None, disabled=False, roles=tuple(roles),
+    )
+
+
+def test_invalidate_drops_every_token_of_the_employee():
+    cache = PrincipalCache(ttl=60, max_size=10)
+    cache.put("a1", make_principal(1, [RoleEnum.admin]))
+    cache.put("a2", make_principal(1))
+    cache.put("b1", make_principal(2))
+
+    assert cache.get("a1").is_admin
+    cache.invalidate(1)
+
+    assert cache.get("a1") is None
+    assert cache.get("a2") is None
+    assert cache.get("b1").id == 2
+
+
+def test_entries_expire_with_ttl_or_token():
+    cache = PrincipalCache(ttl=60, max_size=10)
+    cache.put("expired", make_principal(1), token_expires_at=time.time() - 1)
+    assert cache.get("expired") is None
+
+    cache = PrincipalCache(ttl=0.01, max_size=10)
+    cache.put("short", make_principal(1))
+    time.sleep(0.02)
+    assert cache.get("short") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PrincipalCache(ttl=60, max_size=2)
+    cache.put("a", make_principal(1))
+    cache.put("b", make_principal(2))
+    cache.get("a")
+    cache.put("c", make_principal(3))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["size"] == 2
@@ -0,0 +1,54 @@
+import pytest
+
+from app.core.database import SessionLocal
+from app.enums import GenderEnum, RoleEnum, StatusAccountEnum
+from app.models import Employee, Employee_role
+from app.service.password_hashing import pwd_context
+from app.service.principal_cache import principal_cache
+
+
+@pytest.fixture(scope="module")
+def admin(client):
+    with SessionLocal() as db:
+        for i in range(1, 6):
+            employee = Employee(
+                first_name="Mohamed", last_name="Briki", gender=GenderEnum.Male, number=str(i),
+                email=f"employee{i}@example.com", password=pwd_context.hash("123456"),
+                status_account=StatusAccountEnum.Active,
+            )
+            db.add(employee)
+            db.flush()
+            db.add_all([
+                Employee_role(Employee_id=employee.id, role=RoleEnum.Vendor),
+                Employee_role(Employee_id=employee.id, role=RoleEnum.admin),
+            ])
+        db.commit()
+    token = client.post("/api/token", data={"username": "employee1@example.com", "password": "123456"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+# Declared budgets: raise one only with a reason, lower it when a route gets cheaper
+@pytest.mark.parametrize("method, path, kwargs, budget", [
+    ("GET", "/api/employees", {}, 2),
+    ("GET", "/api/employees?fields=email,role&role=admin", {}, 2),
+    ("GET", "/api/employees/2", {}, 1),
+    ("GET", "/api/users/me", {}, 2),
+    ("PUT", "/api/employees/profile", {"json": {"first_name": "Med", "last_name": "Briki", "gender": "Male"}}, 4),
+    ("PUT", "/api/employees/3/admin-update", {"json": {"number": "33", "role": ["Vendor"]}}, 6),
+    ("POST", "/api/employees", {"json": {
+        "first_name": "Sami", "last_name": "Ben Ali", "gender": "Male", "number": "99",
+        "email": "sami@example.com", "role": ["Vendor", "Inventory_Manager"],
+    }}, 4),
+])
+def test_route_query_budget(client, admin, query_budget, method, path, kwargs, budget):
+    # Cold principal cache: the authenticated lookup is part of the budget
+    principal_cache.clear()
+    with query_budget(budget, label=f"{method} {path}"):
+        response = client.request(method, path, headers=admin, **kwargs)
+    assert response.status_code < 400, response.text
+
+
+def test_cached_principal_needs_no_query(client, admin, query_budget):
+    client.get("/api/users/me", headers=admin)
+    with query_budget(0, label="GET /api/users/me (cached)"):
+        assert client.get("/api/users/me", headers=admin).status_code == 200
@@ -0,0 +1,79 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.enums import GenderEnum, StatusAccountEnum, TokenStatusEnum
+from app.models import Acount_Activation, ChangePasword, EmailChangeToken, Employee
+from app.service.token_sweeper import TokenSweeper
+
+NOW = datetime(2026, 10, 17, 12, 0)
+
+
+@pytest.fixture(scope="module")
+def employee_id(client):
+    with SessionLocal() as db:
+        employee = Employee(
+            first_name="Mohamed", last_name="Briki", gender=GenderEnum.Male, number="1",
+            email="employee1@example.com", status_account=StatusAccountEnum.Inactive,
+        )
+        db.add(employee)
+        db.commit()
+        return employee.id
+
+
+def add_tokens(employee_id):
+    with SessionLocal() as db:
+        db.add_all([
+            ChangePasword(Employee_id=employee_id, token="reset-live", expired_date=NOW + timedelta(minutes=30), token_status_id=TokenStatusEnum.Valid),
+            ChangePasword(Employee_id=employee_id, token="reset-stale", expired_date=NOW - timedelta(minutes=1), token_status_id=TokenStatusEnum.Valid),
+            ChangePasword(Employee_id=employee_id, token="reset-old", expired_date=NOW - timedelta(days=60), token_status_id=TokenStatusEnum.Expired),
+            Acount_Activation(Employee_id=employee_id, Email="a@example.com", token="act-live", created_on=date(2026, 10, 1), token_status_id=TokenStatusEnum.Valid),
+            Acount_Activation(Employee_id=employee_id, Email="a@example.com", token="act-stale", created_on=date(2026, 9, 1), token_status_id=TokenStatusEnum.Valid),
+            Acount_Activation(Employee_id=employee_id, Email="a@example.com", token="act-old", created_on=date(2026, 6, 1), token_status_id=TokenStatusEnum.Expired),
+            EmailChangeToken(Employee_id=employee_id, new_email="new@example.com", token="email-live", created_at=NOW - timedelta(hours=1)),
+            EmailChangeToken(Employee_id=employee_id, new_email="new@example.com", token="email-old", created_at=NOW - timedelta(days=2)),
+        ])
+        db.commit()
+
+
+def token_states():
+    with SessionLocal() as db:
+        states = {token: status.value for token, status in db.query(ChangePasword.token, ChangePasword.token_status_id)}
+        states.update({token: status.value for token, status in db.query(Acount_Activation.token, Acount_Activation.token_status_id)})
+        states.update({token: "Valid" for (token,) in db.query(EmailChangeToken.token)})
+        return states
+
+
+def test_sweep_expires_then_purges_in_batches(employee_id):
+    add_tokens(employee_id)
+    sweeper = TokenSweeper(batch_size=1, retention_days=30)
+
+    counts = sweeper.sweep(NOW)
+
+    assert counts == {
+        "reset_expired": 1, "activation_expired": 1,
+        "reset_purged": 1, "activation_purged": 1, "email_change_purged": 1,
+    }
+    assert token_states() == {
+        "reset-live": "Valid", "reset-stale": "Expired",
+        "act-live": "Valid", "act-stale": "Expired",
+        "email-live": "Valid",
+    }
+    assert sweeper.sweep(NOW) == dict.fromkeys(counts, 0)
+
+
+def test_reset_token_is_refused_after_its_expiry(client, employee_id):
+    with SessionLocal() as db:
+        db.add(ChangePasword(
+            Employee_id=employee_id, token="reset-past", expired_date=datetime.utcnow() - timedelta(seconds=1),
+            token_status_id=TokenStatusEnum.Valid,
+        ))
+        db.commit()
+
+    response = client.patch("/api/employees/confirm_reset_password", json={
+        "token": "reset-past", "password": "123456", "confirm_password": "123456",
+    })
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Confirmation code expired"
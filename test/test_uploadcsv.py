@@ -0,0 +1,223 @@
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Employee
+from app.repositories import uploadcsv
+from app.schemas.csvschema import Matchycell
+from app.utils.csvreader import iter_csv_chunks
+from app.repositories.uploadcsv import (
+    UploadValidation, shutdown_validation_pool, validate_employee_data, validate_employees_batch, validate_rows,
+)
+
+
+def make_line(row, **values):
+    return {
+        field: Matchycell(value=value, rowIndex=row, columnIndex=col)
+        for col, (field, value) in enumerate(values.items())
+    }
+
+
+valid = dict(
+    first_name="Mohamed", last_name="Briki", email="mohamed@example.com",
+    job_position="Vendor", contract_type="CDI", gender="Male", number="12",
+    phone_number="+21620123456", birth_date="1990-05-17", cnss_number="12345678-90",
+)
+
+lines = [
+    make_line(0, **valid),
+    make_line(1, **{**valid, "email": " not-an-email ", "gender": "female", "number": "-3"}),
+    make_line(2, **{**valid, "contract_type": "sivp", "cnss_number": "12345678-90"}),
+    make_line(3, **{**valid, "contract_type": "CDD", "cnss_number": ""}),
+    make_line(4, **{**valid, "contract_type": "APPRNTI", "cnss_number": "", "phone_number": "55123456"}),
+    make_line(5, **{**valid, "birth_date": "1990-2-30", "job_position": "admin, Vendor"}),
+    make_line(6, **{**valid, "birth_date": "1990-1-5", "number": "٣"}),
+    make_line(7, **{k: v for k, v in valid.items() if k not in ("gender", "cnss_number")}),
+    make_line(8, **{**valid, "contract_type": "", "gender": "", "address": "  "}),
+    make_line(9, **{**valid, "contract_type": "Freelance", "cnss_number": "1234"}),
+    make_line(10, **{**valid, "employee_roles": "admin"}),
+]
+
+
+@pytest.mark.parametrize("index", range(len(lines)))
+def test_batch_validation_matches_row_validation(index):
+    assert validate_employees_batch([lines[index]]) == [validate_employee_data(lines[index])]
+
+
+def test_batch_validation_keeps_row_order():
+    assert validate_employees_batch(lines) == [validate_employee_data(line) for line in lines]
+
+
+def test_missing_first_field_is_reported_like_row_validation():
+    line = make_line(0, **{k: v for k, v in valid.items() if k != "first_name"})
+
+    employee, errors, warnings, wrong_cells = validate_employee_data(line)
+
+    assert errors == ["Missing mandatory field: First Name"]
+    assert (wrong_cells[0].rowIndex, wrong_cells[0].colIndex) == (0, 0)
+    assert validate_employees_batch([line]) == [validate_employee_data(line)]
+
+
+@pytest.mark.parametrize("contract_type", ["CDI", "CDD"])
+def test_missing_conditional_field_is_named_by_its_display_name(contract_type):
+    line = make_line(0, **{**{k: v for k, v in valid.items() if k != "cnss_number"}, "contract_type": contract_type})
+
+    employee, errors, warnings, wrong_cells = validate_employee_data(line)
+
+    assert errors == ["Missing mandatory field: CNSS Number"]
+    assert validate_employees_batch([line]) == [validate_employee_data(line)]
+
+
+def test_upload_reports_a_row_missing_its_first_field(client, roster_line):
+    second = roster_line(1, 512)
+    del second["first_name"]
+
+    response = client.post("/api/uploadCSV", json={"lines": [roster_line(0, 511), second]})
+
+    assert response.status_code == 400
+    assert response.json()["errors"] == "Line 2: Missing mandatory field: First Name"
+
+
+def test_chunked_validation_matches_single_pass():
+    duplicated = lines + [make_line(11, **valid), make_line(12, **{**valid, "email": "other@example.com"})]
+
+    single = UploadValidation()
+    single.validate_chunk(duplicated)
+
+    chunked = UploadValidation()
+    for start in range(0, len(duplicated), 4):
+        chunked.validate_chunk(duplicated[start:start + 4])
+
+    assert chunked.error_response().body == single.error_response().body
+    assert b"Line 12: Email 'mohamed@example.com' is duplicated" in single.error_response().body
+
+
+def test_parallel_validation_matches_single_pass(monkeypatch):
+    monkeypatch.setattr(settings, "VALIDATION_WORKERS", 2)
+    rows = lines * 3
+    try:
+        assert validate_rows(rows, chunk_size=4, min_rows=0) == validate_employees_batch(rows)
+    finally:
+        shutdown_validation_pool()
+
+
+def test_upload_validation_leaves_the_event_loop_free(client, monkeypatch, roster_line):
+    validating, answered = threading.Event(), threading.Event()
+
+    def slow_validate_rows(employees):
+        validating.set()
+        # Only set if an async route was served while this upload validates
+        assert answered.wait(10)
+        return validate_employees_batch(employees)
+
+    monkeypatch.setattr(uploadcsv, "validate_rows", slow_validate_rows)
+    lines = [roster_line(row, number) for row, number in enumerate(range(501, 503))]
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        upload = pool.submit(client.post, "/api/uploadCSV", json={"lines": lines})
+        assert validating.wait(10)
+        assert client.get("/api/employees/999999").status_code == 404
+        answered.set()
+        assert upload.result(timeout=20).status_code == 200
+
+
+def test_invalid_optional_cell_is_a_warning_stored_as_null(client, roster_line):
+    line = roster_line(0, 521, birth_date="1990-2-30", phone_number="12")
+    cells = make_line(0, **{field: cell["value"] for field, cell in line.items()})
+    employee, errors, warnings, wrong_cells = validate_employee_data(cells)
+    assert errors == [] and (employee["birth_date"], employee["phone_number"]) == (None, None)
+    assert validate_employees_batch([cells]) == [validate_employee_data(cells)]
+
+    response = client.post("/api/uploadCSV", json={"lines": [line]})
+    assert response.status_code == 400
+    assert response.json()["warnings"] == (
+        "Line 1: Phone number is not valid for Tunisia. It should be of 8 digits; Date format should be dd/mm/yyyy"
+    )
+
+    assert client.post("/api/uploadCSV", json={"lines": [line], "forceUpload": True}).status_code == 200
+    with SessionLocal() as db:
+        stored = db.query(Employee).filter_by(number="521").one()
+    assert (stored.birth_date, stored.phone_number) == (None, None)
+
+
+# ------------------- CSV FILE -------------------
+def csv_file(text: str):
+    return io.BytesIO(text.encode("utf-8"))
+
+
+def cell_values(chunks):
+    return [{field: cell.value for field, cell in row.items()} for chunk in chunks for row in chunk]
+
+
+@pytest.mark.parametrize("delimiter", [",", ";"])
+def test_csv_dialect_is_sniffed_from_the_header(delimiter):
+    text = delimiter.join(["first_name", "last_name", "number"]) + "\n" + delimiter.join(["Mohamed", "Briki", "7"]) + "\n"
+
+    rows = cell_values(iter_csv_chunks(csv_file(text), chunk_size=10))
+
+    assert rows == [{"first_name": "Mohamed", "last_name": "Briki", "number": "7"}]
+
+
+def test_csv_headers_accept_display_names_and_skip_unknown_columns():
+    text = " First Name ;EMAIL;Notes;Employee Number\nMohamed;m@example.com;ignored;7\n"
+
+    chunk = next(iter_csv_chunks(csv_file(text), chunk_size=10))
+
+    assert {field: (cell.value, cell.columnIndex) for field, cell in chunk[0].items()} == {
+        "first_name": ("Mohamed", 0), "email": ("m@example.com", 1), "number": ("7", 3),
+    }
+
+
+def test_csv_chunks_keep_row_indexes_across_boundaries():
+    text = "first_name,number\n" + "".join(f"Employee,{n}\n" for n in range(5)) + ",\n"
+
+    chunks = list(iter_csv_chunks(csv_file(text), chunk_size=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [row["number"].rowIndex for chunk in chunks for row in chunk] == [0, 1, 2, 3, 4]
+    assert [row["number"].value for chunk in chunks for row in chunk] == ["0", "1", "2", "3", "4"]
+
+
+def test_empty_csv_file_has_no_chunks():
+    assert list(iter_csv_chunks(csv_file(""), chunk_size=10)) == []
+    assert list(iter_csv_chunks(csv_file("\n"), chunk_size=10)) == []
+
+
+roster_header = "First Name;Last Name;Email;Job Position;Contract Type;Gender;Employee Number;Address;CNSS Number\n"
+
+
+def roster_row(number):
+    return f"Mohamed;Briki;employee{number}@example.com;Vendor;CDI;Male;{number};Tunis;{number:08d}-10\n"
+
+
+def test_file_upload_inserts_every_chunk(client, monkeypatch):
+    monkeypatch.setattr(settings, "CSV_IMPORT_CHUNK_SIZE", 2)
+    text = roster_header + "".join(roster_row(number) for number in range(601, 606))
+
+    response = client.post("/api/uploadCSVFile", files={"file": ("roster.csv", text.encode(), "text/csv")})
+
+    assert response.status_code == 200
+    assert response.json()["count"] == 5
+    with SessionLocal() as db:
+        assert db.query(Employee).filter(Employee.number.in_([str(n) for n in range(601, 606)])).count() == 5
+
+
+def test_file_upload_of_an_empty_file_is_rejected(client):
+    response = client.post("/api/uploadCSVFile", files={"file": ("roster.csv", b"", "text/csv")})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "CSV file is empty"
+
+
+def test_file_upload_without_a_mandatory_column_is_rejected(client):
+    text = roster_header.replace(";Gender", "") + roster_row(611).replace(";Male", "")
+
+    response = client.post("/api/uploadCSVFile", files={"file": ("roster.csv", text.encode(), "text/csv")})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Missing mandatory fields: gender"
+    with SessionLocal() as db:
+        assert db.query(Employee).filter_by(number="611").count() == 0
@@ -0,0 +1,50 @@
+from app.core.database import SessionLocal
+from app.enums import RoleEnum
+from app.models import Employee, Employee_role
+
+
+def sync(client, lines, **options):
+    return client.post("/api/uploadCSV", json={"lines": lines, "mode": "upsert", **options})
+
+
+def test_upsert_writes_only_changes(client, query_budget, roster_line):
+    roster = [roster_line(row, number) for row, number in enumerate(range(301, 305))]
+    assert client.post("/api/uploadCSV", json={"lines": roster}).status_code == 200
+    assert client.post("/api/uploadCSV", json={"lines": roster}).status_code == 400
+
+    roster[1] = roster_line(1, 302, address="Sfax")
+    roster[2] = roster_line(2, 303, job_position="admin")
+    roster.append(roster_line(4, 305))
+    # Validation (one lookup per unique field), matched rows and their roles, then the writes
+    with query_budget(11, label="upsert 5 rows, 2 changes, 1 new"):
+        response = sync(client, roster)
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {"message": "Employees synchronized", "count": 5, "inserted": 1, "updated": 2, "unchanged": 2}
+    with SessionLocal() as db:
+        assert db.query(Employee.address).filter_by(number="302").scalar() == "Sfax"
+        employee_id = db.query(Employee.id).filter_by(number="303").scalar()
+        assert [role for role, in db.query(Employee_role.role).filter_by(Employee_id=employee_id)] == [RoleEnum.admin]
+        assert db.query(Employee).filter_by(number="305").count() == 1
+
+    assert sync(client, roster).json()["unchanged"] == 5
+
+
+def test_upsert_by_email_updates_the_number(client, roster_line):
+    assert client.post("/api/uploadCSV", json={"lines": [roster_line(0, 311)]}).status_code == 200
+
+    response = sync(client, [roster_line(0, 312, email="employee311@example.com", cnss_number="00000311-10")], matchBy="email")
+
+    assert response.json()["updated"] == 1
+    with SessionLocal() as db:
+        assert db.query(Employee.number).filter_by(email="employee311@example.com").scalar() == "312"
+
+
+def test_upsert_rejects_values_of_another_employee(client, roster_line):
+    roster = [roster_line(row, number) for row, number in enumerate(range(321, 323))]
+    assert client.post("/api/uploadCSV", json={"lines": roster}).status_code == 200
+
+    response = sync(client, [roster_line(0, 321, email="employee322@example.com")])
+
+    assert response.status_code == 400
+    assert response.json()["errors"] == "Line 1: Email 'employee322@example.com' already exists"